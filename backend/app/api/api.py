@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import config, executions, documents, stats, versions, upload
+from app.api.v1.endpoints import config, executions, documents, stats, versions, upload, search, duplicates
 
 api_router = APIRouter()
 api_router.include_router(config.router, prefix="/config", tags=["config"])
@@ -8,3 +8,5 @@ api_router.include_router(documents.router, prefix="/documents", tags=["document
 api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
 api_router.include_router(versions.router, prefix="/versions", tags=["versions"])
 api_router.include_router(upload.router, prefix="/upload", tags=["upload"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(duplicates.router, prefix="/duplicates", tags=["duplicates"])
@@ -1,6 +1,7 @@
+from typing import Dict, List, Tuple
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import literal_column
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.api import deps
@@ -9,6 +10,9 @@ from app.db.models import Document
 
 router = APIRouter()
 
+# 4 bound parameters per row; asyncpg allows 32767 per statement
+IMPORT_CHUNK_SIZE = 1000
+
 @router.post("/import")
 async def import_config(
     config: ConfigImport,
@@ -16,34 +20,55 @@ async def import_config(
 ):
     """
     Import or update document configurations.
+
+    Documents are matched on (application_name, url) and written with one
+    INSERT ... ON CONFLICT DO UPDATE per chunk, in a single transaction.
     """
+    # Last entry wins for duplicates in the payload (ON CONFLICT cannot touch a row twice per statement)
+    rows: Dict[Tuple[str, str], dict] = {}
+    for doc_config in config.documents:
+        url = str(doc_config.url)
+        rows[(doc_config.application_name, url)] = {
+            "application_name": doc_config.application_name,
+            "name": doc_config.document_name,
+            "url": url,
+            "schedule": doc_config.schedule,
+        }
+    rows_list = list(rows.values())
+
     imported_count = 0
     updated_count = 0
-    
-    for doc_config in config.documents:
-        # Check if exists
-        stmt = select(Document).where(
-            Document.url == str(doc_config.url),
-            Document.application_name == doc_config.application_name
+    affected: List = []
+
+    for start in range(0, len(rows_list), IMPORT_CHUNK_SIZE):
+        chunk = rows_list[start:start + IMPORT_CHUNK_SIZE]
+        stmt = pg_insert(Document).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_documents_application_name_url",
+            set_={"name": stmt.excluded.name, "schedule": stmt.excluded.schedule},
+        ).returning(
+            Document.id,
+            Document.name,
+            Document.schedule,
+            # xmax is 0 only for freshly inserted tuples
+            literal_column("(xmax = 0)").label("inserted"),
         )
         result = await session.execute(stmt)
-        existing_doc = result.scalar_one_or_none()
-        
-        if existing_doc:
-            existing_doc.name = doc_config.document_name
-            existing_doc.schedule = doc_config.schedule
-            updated_count += 1
-        else:
-            new_doc = Document(
-                application_name=doc_config.application_name,
-                name=doc_config.document_name,
-                url=str(doc_config.url),
-                schedule=doc_config.schedule
-            )
-            session.add(new_doc)
-            imported_count += 1
-            
+        for row in result:
+            affected.append(row)
+            if row.inserted:
+                imported_count += 1
+            else:
+                updated_count += 1
+
     await session.commit()
+
+    from app.services.scheduler import SchedulerService
+    try:
+        SchedulerService().schedule_documents(affected)
+    except Exception as e:
+        # Don't fail the import if scheduling fails, just log it
+        print(f"Failed to schedule imported documents: {e}")
     
     return {
         "message": "Configuration imported successfully",
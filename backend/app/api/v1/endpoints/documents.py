@@ -1,31 +1,53 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, tuple_
+from sqlalchemy.exc import IntegrityError
 
 from app.api import deps
+from app.api.pagination import decode_cursor, set_next_cursor
 from app.db.models import Document
 from app.schemas.config import DocumentConfig, DocumentResponse
 
 router = APIRouter()
 
+async def _commit_or_conflict(session: AsyncSession):
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="A document with this application name and URL already exists")
+
+def _rules_json(doc_in: DocumentConfig):
+    # Custom rules are stored as plain dicts (JSONB)
+    return doc_in.model_dump(exclude_none=True).get("normalization_rules")
+
 @router.get("/", response_model=List[DocumentResponse])
 async def get_documents(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
     session: AsyncSession = Depends(deps.get_session),
     current_user: Any = Depends(deps.check_permissions([deps.Role.ADMIN, deps.Role.MANAGER, deps.Role.OWNER, deps.Role.VIEWER]))
 ):
+    """
+    List documents in creation order with keyset pagination: pass the
+    X-Next-Cursor header of a page as `cursor` to get the next one.
+    """
     from app.core.security import Role
-    stmt = select(Document).offset(skip).limit(limit)
+    stmt = select(Document).order_by(Document.created_at, Document.id).limit(limit)
     
     # Filter for OWNER role
     if current_user.role == Role.OWNER:
         stmt = stmt.where(Document.owner_id == current_user.id)
+
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Document.created_at, Document.id) > tuple_(created_at, last_id))
         
     result = await session.execute(stmt)
     docs = result.scalars().all()
-    # Pydantic v2 from_attributes handles ORM objects
+    set_next_cursor(response, docs, limit, "created_at")
     # Pydantic v2 from_attributes handles ORM objects
     return docs
 
@@ -61,9 +83,15 @@ async def create_document(
         # Update existing document
         doc.url = str(doc_in.url)
         doc.keywords = doc_in.keywords
+        doc.keyword_mode = doc_in.keyword_mode
+        doc.context_pages = doc_in.context_pages
         doc.schedule = doc_in.schedule
+        doc.pdf_extractor = doc_in.pdf_extractor
+        doc.normalization_rules = _rules_json(doc_in)
+        # Force a full run: the source may be unchanged but the analysis inputs are not
+        doc.last_source_digest = None
         session.add(doc)
-        await session.commit()
+        await _commit_or_conflict(session)
         await session.refresh(doc)
     else:
         # Create new document
@@ -72,13 +100,17 @@ async def create_document(
             name=doc_in.document_name, # Map Pydantic 'document_name' to DB 'name'
             url=str(doc_in.url),
             keywords=doc_in.keywords,
+            keyword_mode=doc_in.keyword_mode,
+            context_pages=doc_in.context_pages,
             schedule=doc_in.schedule,
+            pdf_extractor=doc_in.pdf_extractor,
+            normalization_rules=_rules_json(doc_in),
             owner_id=current_user.id,
             owner_email=current_user.email,
             owner_username=current_user.username
         )
         session.add(doc)
-        await session.commit()
+        await _commit_or_conflict(session)
         await session.refresh(doc)
     
     # Auto-trigger execution
@@ -131,10 +163,16 @@ async def update_document(
     doc.name = doc_in.document_name
     doc.url = str(doc_in.url)
     doc.keywords = doc_in.keywords
+    doc.keyword_mode = doc_in.keyword_mode
+    doc.context_pages = doc_in.context_pages
     doc.schedule = doc_in.schedule
+    doc.pdf_extractor = doc_in.pdf_extractor
+    doc.normalization_rules = _rules_json(doc_in)
+    # Force a full run: the source may be unchanged but the analysis inputs are not
+    doc.last_source_digest = None
     
     session.add(doc)
-    await session.commit()
+    await _commit_or_conflict(session)
     await session.refresh(doc)
     
     # Update Scheduler
@@ -0,0 +1,59 @@
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.config import settings
+from app.db.models import Document, Version
+from app.services.sketch import DuplicateService
+
+router = APIRouter()
+
+@router.get("/versions/{id}")
+async def get_version_duplicates(
+    id: uuid.UUID,
+    threshold: float = Query(settings.DUPLICATE_SIMILARITY_THRESHOLD, ge=0.0, le=1.0),
+    session: AsyncSession = Depends(deps.get_session)
+):
+    """
+    Segments of a version that have near-duplicates in other documents.
+    """
+    version = await session.get(Version, id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Version not found")
+
+    segments = await DuplicateService(session).version_duplicates(id, threshold)
+    return {"version_id": id, "threshold": threshold, "segments": segments}
+
+@router.get("/documents/{id}")
+async def get_similar_documents(
+    id: uuid.UUID,
+    threshold: float = Query(settings.DUPLICATE_SIMILARITY_THRESHOLD, ge=0.0, le=1.0),
+    session: AsyncSession = Depends(deps.get_session)
+):
+    """
+    Documents sharing clauses with the latest version of a document, ranked by overlap.
+    """
+    doc = await session.get(Document, id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    version_id = doc.latest_version_id
+    if not version_id:
+        return {"document_id": id, "version_id": None, "documents": []}
+
+    documents = await DuplicateService(session).similar_documents(version_id, threshold)
+    return {"document_id": id, "version_id": version_id, "documents": documents}
+
+@router.get("/clauses")
+async def get_shared_clauses(
+    min_documents: int = Query(2, ge=2),
+    limit: int = Query(50, ge=1, le=500),
+    session: AsyncSession = Depends(deps.get_session)
+):
+    """
+    Clauses (normalized segments) that appear, verbatim or nearly, in several
+    documents. Clusters are recomputed periodically, not on every index.
+    """
+    clauses = await DuplicateService(session).shared_clauses(min_documents, limit)
+    return {"clauses": clauses}
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, BackgroundTasks, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from typing import Any, List, Optional
+from sqlalchemy import select, desc, tuple_
+from typing import Any, List, Literal, Optional, Union
 import uuid
 
 from app.api import deps
+from app.api.pagination import decode_cursor, set_next_cursor
 from app.db.models import Execution, ExecutionStatus, Document, Version
-from app.services.pipeline import PipelineService
 from app.db.session import AsyncSessionLocal
 
 router = APIRouter()
@@ -39,24 +39,45 @@ async def trigger_run(
     
     return {"execution_id": execution.id, "status": "pending"}
 
-from app.schemas.config import ExecutionSchema
+from app.schemas.config import ExecutionSchema, ExecutionSummarySchema
 
-@router.get("/", response_model=List[ExecutionSchema])
+@router.get("/", response_model=List[Union[ExecutionSummarySchema, ExecutionSchema]])
 async def list_executions(
-    skip: int = 0,
-    limit: int = 20,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    view: Literal["summary", "full"] = "summary",
     session: AsyncSession = Depends(deps.get_session)
 ):
-    from sqlalchemy.orm import selectinload
-    stmt = (
-        select(Execution)
-        .options(selectinload(Execution.versions).selectinload(Version.document))
-        .order_by(desc(Execution.start_time))
-        .offset(skip)
-        .limit(limit)
-    )
+    """
+    List executions, newest first, with keyset pagination: pass the
+    X-Next-Cursor header of a page as `cursor` to get the next one.
+    The default summary view omits the `logs` and `steps` payloads.
+    """
+    from sqlalchemy.orm import selectinload, load_only
+    versions_loader = selectinload(Execution.versions)
+    stmt = select(Execution).order_by(desc(Execution.start_time), desc(Execution.id)).limit(limit)
+    if view == "summary":
+        stmt = stmt.options(
+            load_only(Execution.id, Execution.status, Execution.start_time, Execution.end_time),
+            versions_loader.load_only(Version.document_id, Version.execution_id)
+            .selectinload(Version.document)
+            .load_only(Document.id, Document.application_name, Document.name, Document.url)
+        )
+    else:
+        stmt = stmt.options(versions_loader.selectinload(Version.document))
+
+    if cursor:
+        start_time, last_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Execution.start_time, Execution.id) < tuple_(start_time, last_id))
+
     result = await session.execute(stmt)
-    return result.scalars().all()
+    executions = result.scalars().all()
+    set_next_cursor(response, executions, limit, "start_time")
+
+    if view == "summary":
+        return [ExecutionSummarySchema.model_validate(e) for e in executions]
+    return [ExecutionSchema.model_validate(e) for e in executions]
 
 @router.get("/{id}", response_model=ExecutionSchema)
 async def get_execution(
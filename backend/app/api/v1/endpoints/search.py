@@ -0,0 +1,54 @@
+from typing import Optional
+import uuid
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.schemas.search import SearchResponse, SemanticSearchResponse
+from app.services.search import SearchService
+from app.services.analysis import get_analysis_engine
+
+router = APIRouter()
+
+@router.get("/", response_model=SearchResponse)
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    document_id: Optional[uuid.UUID] = None,
+    latest_only: bool = False,
+    session: AsyncSession = Depends(deps.get_session)
+):
+    """
+    Full-text search across the extracted text of all documents and versions.
+    Supports web-search syntax: "quoted phrases", OR, and -exclusions.
+    """
+    hits = await SearchService(session).search(
+        q, limit=limit, offset=offset, document_id=document_id, latest_only=latest_only
+    )
+    return {"query": q, "hits": hits}
+
+@router.get("/semantic", response_model=SemanticSearchResponse)
+async def semantic_search(
+    q: str = Query(..., min_length=1, max_length=2000),
+    limit: int = Query(10, ge=1, le=100),
+    document_id: Optional[uuid.UUID] = None,
+    latest_only: bool = False,
+    session: AsyncSession = Depends(deps.get_session)
+):
+    """
+    Natural-language search: embeds the query and returns the most similar
+    segments across all documents. Each clause is returned once per
+    document; `latest_only` restricts hits to current versions.
+    """
+    engine = get_analysis_engine()
+    loop = asyncio.get_running_loop()
+    embeddings = await loop.run_in_executor(None, engine.compute_embeddings, [q])
+    if not embeddings:
+        raise HTTPException(status_code=503, detail="Embedding provider unavailable")
+
+    hits = await SearchService(session).semantic_search(
+        embeddings[0], limit=limit, document_id=document_id, model=engine.model_id, latest_only=latest_only
+    )
+    return {"query": q, "hits": hits}
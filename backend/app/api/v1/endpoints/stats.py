@@ -1,38 +1,57 @@
+import datetime
 from typing import Any, Dict
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter
 from sqlalchemy import select, func
 
-from app.api import deps
-from app.db.models import Document, Execution, Version
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models import Execution, ExecutionStatus, StatsCounter, StatsCounterDelta
+from app.db.session import AsyncSessionLocal, pool_status
 
 router = APIRouter()
 
-@router.get("/")
-async def get_stats(session: AsyncSession = Depends(deps.get_session)):
-    # Count Documents
-    docs_stmt = select(func.count(Document.id))
-    docs_count = (await session.execute(docs_stmt)).scalar() or 0
-    
-    # Count Executions
-    execs_stmt = select(func.count(Execution.id))
-    execs_count = (await session.execute(execs_stmt)).scalar() or 0
-    
-    import datetime
-    
-    # Count Recent Executions (last 24h)
-    cutoff = datetime.datetime.utcnow() - datetime.timedelta(hours=24)
-    execs_recent_stmt = select(func.count(Execution.id)).where(Execution.start_time >= cutoff)
-    execs_recent_count = (await session.execute(execs_recent_stmt)).scalar() or 0
-
-    # Count Total Versions
-    vers_stmt = select(func.count(Version.id))
-    vers_count = (await session.execute(vers_stmt)).scalar() or 0
-    
+# Dashboard polls this endpoint; a short TTL absorbs bursts from many clients
+_stats_cache = TTLCache(ttl=settings.STATS_CACHE_TTL_SECONDS, max_size=1)
+
+def _counter(name: str):
+    # Counter plus the deltas the scheduler has not folded in yet (a handful of rows)
+    pending = select(func.coalesce(func.sum(StatsCounterDelta.delta), 0)).where(StatsCounterDelta.name == name).scalar_subquery()
+    return select(StatsCounter.value + pending).where(StatsCounter.name == name).scalar_subquery()
+
+async def _load_stats() -> Dict[str, Any]:
+    now = datetime.datetime.utcnow()
+    cutoff = now - datetime.timedelta(hours=24)
+    # Executions of crashed or restarted workers stay RUNNING; only count those still reporting progress
+    stale = now - datetime.timedelta(seconds=settings.EXECUTION_STALE_SECONDS)
+
+    # One round trip: trigger-maintained counters plus two index-backed counts
+    stmt = select(
+        _counter("documents").label("documents_count"),
+        _counter("executions").label("executions_count"),
+        _counter("versions").label("versions_count"),
+        select(func.count(Execution.id)).where(Execution.start_time >= cutoff).scalar_subquery().label("recent_updates_count"),
+        select(func.count(Execution.id)).where(
+            Execution.status == ExecutionStatus.RUNNING,
+            func.coalesce(Execution.heartbeat_at, Execution.start_time) >= stale
+        ).scalar_subquery().label("active_workers"),
+    )
+    # Own session: the single-flight load outlives the request that started it
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(stmt)).one()
+
     return {
-        "documents_count": docs_count,
-        "executions_count": execs_count,
-        "versions_count": vers_count,
-        "recent_updates_count": execs_recent_count,
-        "active_workers": "IDLE" # Placeholder
+        "documents_count": row.documents_count or 0,
+        "executions_count": row.executions_count or 0,
+        "versions_count": row.versions_count or 0,
+        "recent_updates_count": row.recent_updates_count or 0,
+        "active_workers": row.active_workers or 0,
     }
+
+@router.get("/")
+async def get_stats():
+    return await _stats_cache.get_or_load("stats", _load_stats)
+
+@router.get("/pool")
+async def get_pool_stats():
+    """Database connection pool utilization for this API process."""
+    return pool_status()
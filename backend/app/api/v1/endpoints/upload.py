@@ -1,31 +1,153 @@
-from typing import Any
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from collections import deque
+from typing import Any, AsyncIterator, Deque, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.services.storage import StorageService
+from app.core.config import settings
+from app.services.storage import StorageService, UploadTooLargeError
 from app.db.models import Document
 from datetime import datetime
 
 router = APIRouter()
 
-@router.post("/upload", response_model=Any)
+# Multipart boundaries, part headers and small form fields on top of the file itself
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+class _MultipartFileStream:
+    """
+    Streams one file field of a multipart/form-data request body as it is
+    received, instead of letting Starlette spool the whole body to a
+    temporary file before the handler runs. Other fields are skipped.
+    """
+
+    def __init__(self, request: Request, field: str = "file"):
+        _, params = parse_options_header(request.headers.get("content-type", ""))
+        if b"boundary" not in params:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+        self.field = field
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self._body = request.stream()
+        self._chunks: Deque[bytes] = deque()
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._header_name = b""
+        self._header_value = b""
+        self._in_file = False
+        self._done = False
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self) -> None:
+        self._headers = []
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers.append((self._header_name.lower(), self._header_value))
+        self._header_name = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        headers = dict(self._headers)
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        if self.filename is None and options.get(b"name") == self.field.encode() and b"filename" in options:
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            self.content_type = headers.get(b"content-type", b"").decode("latin-1") or None
+            self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._chunks.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self._done = True
+
+    async def _feed(self) -> bool:
+        """Parse the next body chunk; False once the body is exhausted."""
+        async for chunk in self._body:
+            if chunk:
+                try:
+                    self._parser.write(chunk)
+                except MultipartParseError as e:
+                    raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+                return True
+        return False
+
+    async def start(self) -> None:
+        """Read up to the start of the file part (its name and content type)."""
+        while self.filename is None:
+            if not await self._feed():
+                raise HTTPException(status_code=400, detail=f"Missing file field '{self.field}'")
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        while True:
+            while self._chunks:
+                yield self._chunks.popleft()
+            if self._done or not await self._feed():
+                break
+        while self._chunks:
+            yield self._chunks.popleft()
+
+@router.post(
+    "/upload",
+    response_model=Any,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": {
+                "type": "object", "required": ["file"], "properties": {"file": {"type": "string", "format": "binary"}}
+            }}},
+        }
+    },
+)
 async def upload_document(
-    file: UploadFile = File(...),
+    request: Request,
     session: AsyncSession = Depends(deps.get_session)
 ):
     """
     Upload a file to internal storage and return its internal URL.
+    The body is streamed to storage in parts as it is received (never fully
+    buffered or spooled to disk) and limited to UPLOAD_MAX_BYTES: a larger
+    declared Content-Length is rejected before reading, and a body that
+    grows past the limit is rejected as soon as it does.
     """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.UPLOAD_MAX_BYTES + _MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds the limit of {settings.UPLOAD_MAX_BYTES} bytes")
+
+    file = _MultipartFileStream(request)
+    await file.start()
+
     try:
         storage = StorageService()
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         filename = f"{timestamp}_{file.filename}"
         path = f"uploads/{filename}"
         
-        content = await file.read()
-        await storage.upload(path, content, file.content_type or "application/octet-stream")
+        result = await storage.upload_stream(
+            path,
+            file.chunks(),
+            file.content_type or "application/octet-stream",
+            max_bytes=settings.UPLOAD_MAX_BYTES
+        )
         
         internal_url = f"internal://{path}"
-        return {"url": internal_url, "filename": file.filename}
+        return {"url": internal_url, "filename": file.filename, "size": result["size"], "sha256": result["sha256"]}
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
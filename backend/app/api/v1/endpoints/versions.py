@@ -1,5 +1,6 @@
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -8,18 +9,31 @@ from app.db.models import Version, Document
 from app.api.deps import get_session as get_db
 import uuid
 import json
-from app.services.storage import StorageService
+from app.services.storage import get_storage_service
+from app.services.segments import SegmentIndex, parse_segment_slice
+from app.services.keywords import KeywordMatcher, expand_match_index
 
 router = APIRouter()
-storage_service = StorageService()
+
+MAX_SEGMENTS_PER_REQUEST = 5000
 
 @router.get("/{id}/content", response_model=Any)
 async def get_version_content(
     id: str,
+    page_start: Optional[int] = Query(None, ge=1),
+    page_end: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_SEGMENTS_PER_REQUEST),
+    stream: bool = False,
     session: AsyncSession = Depends(deps.get_session)
 ):
     """
     Retrieve the textual content of a specific version.
+
+    Without parameters the whole extracted JSON is returned (legacy behaviour).
+    `page_start`/`page_end` restrict the response to a page range and
+    `offset`/`limit` select segments within it. `stream=true` streams the raw
+    JSON array instead of wrapping it in an object.
     """
     stmt = select(Version).where(Version.id == id)
     result = await session.execute(stmt)
@@ -30,13 +44,107 @@ async def get_version_content(
         
     if not version.extracted_text_path:
         raise HTTPException(status_code=404, detail="No extracted text available for this version")
-        
+
+    ranged = page_start is not None or page_end is not None or offset > 0 or limit is not None
+    if page_start is not None and page_end is not None and page_end < page_start:
+        raise HTTPException(status_code=400, detail="page_end must be greater than or equal to page_start")
+
+    if not ranged:
+        if stream:
+            return StreamingResponse(
+                get_storage_service().stream(version.extracted_text_path),
+                media_type="application/json"
+            )
+        try:
+            content_bytes = await get_storage_service().download(version.extracted_text_path)
+            return {"content": content_bytes.decode("utf-8")}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to retrieve content: {str(e)}")
+
     try:
-        content_bytes = await storage_service.download(version.extracted_text_path)
-        return {"content": content_bytes.decode("utf-8")}
+        index = await _load_segment_index(version)
+        if index is None:
+            # Versions created before segment indexes existed: slice in memory
+            content_bytes = await get_storage_service().download(version.extracted_text_path)
+            segments = [
+                seg for seg in json.loads(content_bytes)
+                if (page_start is None or seg["page"] >= page_start) and (page_end is None or seg["page"] <= page_end)
+            ]
+            selected = segments[offset:offset + limit] if limit is not None else segments[offset:]
+            total_pages = None
+            total_segments = None
+        else:
+            span = index.resolve(page_start, page_end, offset, limit)
+            if span is None:
+                selected = []
+            else:
+                byte_start, byte_end, skip, take = span
+                if stream and skip == 0 and take == _segments_between(index, byte_start, byte_end):
+                    return StreamingResponse(
+                        _wrap_array(get_storage_service().stream(version.extracted_text_path, byte_start, byte_end)),
+                        media_type="application/json"
+                    )
+                chunk = await get_storage_service().download_range(version.extracted_text_path, byte_start, byte_end)
+                selected = parse_segment_slice(chunk)[skip:skip + take]
+            total_pages = index.total_pages
+            total_segments = index.total_segments
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve content: {str(e)}")
 
+    if stream:
+        return Response(content=json.dumps(selected), media_type="application/json")
+
+    return {
+        "content": json.dumps(selected),
+        "page_start": page_start,
+        "page_end": page_end,
+        "offset": offset,
+        "count": len(selected),
+        "total_pages": total_pages,
+        "total_segments": total_segments,
+    }
+
+@router.get("/{id}/index")
+async def get_version_segment_index(
+    id: uuid.UUID,
+    session: AsyncSession = Depends(deps.get_session)
+):
+    """
+    Get the page -> byte offset index of a version's extracted text.
+    """
+    version = await session.get(Version, id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Version not found")
+
+    index = await _load_segment_index(version)
+    if index is None:
+        raise HTTPException(status_code=404, detail="No segment index available for this version")
+
+    return {
+        "total_pages": index.total_pages,
+        "total_segments": index.total_segments,
+        "total_bytes": index.total_bytes,
+        "pages": [
+            {"page": page, "byte_start": start, "byte_end": end, "first_segment": first, "segment_count": count}
+            for page, start, end, first, count in index.pages
+        ]
+    }
+
+async def _load_segment_index(version: Version) -> Optional[SegmentIndex]:
+    if not version.segment_index_path:
+        return None
+    content = await get_storage_service().download(version.segment_index_path)
+    return SegmentIndex.from_json(content)
+
+def _segments_between(index: SegmentIndex, byte_start: int, byte_end: int) -> int:
+    return sum(p[4] for p in index.pages if p[1] >= byte_start and p[2] <= byte_end)
+
+async def _wrap_array(chunks):
+    yield b"["
+    async for chunk in chunks:
+        yield chunk
+    yield b"]"
+
 @router.get("/{id}/matches")
 async def get_version_matches(
     id: uuid.UUID,
@@ -56,28 +164,28 @@ async def get_version_matches(
     if not doc.keywords:
          return {"matches": [], "keywords": []}
 
-    if not version.extracted_text_path:
-         raise HTTPException(status_code=400, detail="No extracted text available for this version")
-
+    matcher = KeywordMatcher(doc.keywords, doc.keyword_mode)
     try:
-        content = await storage_service.download(version.extracted_text_path)
+        # Fast path: match index precomputed by the pipeline for the same keyword set
+        if version.matches_path:
+            content = await get_storage_service().download(version.matches_path)
+            match_index = json.loads(content)
+            if matcher.is_current(match_index):
+                return {"matches": expand_match_index(match_index), "keywords": doc.keywords}
+
+        # Keywords changed since the version was processed (or legacy version): match on the fly
+        if not version.extracted_text_path:
+             raise HTTPException(status_code=400, detail="No extracted text available for this version")
+
+        content = await get_storage_service().download(version.extracted_text_path)
         if not content:
              raise HTTPException(status_code=404, detail="Extracted text file missing")
              
         segments = json.loads(content)
-        
-        matches = []
-        for seg in segments:
-            text_lower = seg["normalized_text"].lower()
-            for kw in doc.keywords:
-                if kw.lower() in text_lower:
-                    matches.append({
-                        "page": seg["page"],
-                        "keyword": kw,
-                        "text": seg["text"][:300] + "..." if len(seg["text"]) > 300 else seg["text"]
-                    })
-        
-        return {"matches": matches, "keywords": doc.keywords}
+        match_index = matcher.build_index(segments)
+        return {"matches": expand_match_index(match_index), "keywords": doc.keywords}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
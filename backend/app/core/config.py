@@ -41,15 +41,31 @@ class Settings(BaseSettings):
             path=f"{info.data.get('POSTGRES_DB') or ''}",
         ).unicode_string()
 
+    # Connection pool (per process). Each pipeline run holds up to three
+    # connections at once (main, step status, version write).
+    SQL_ECHO: bool = False # log every statement; independent of DEBUG
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0 # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800 # seconds; replace connections before server/LB idle timeouts
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100 # asyncpg prepared statements per connection; 0 behind pgbouncer (transaction mode)
+
     # Storage
     GCS_BUCKET_NAME: str = "documents"
     USE_MINIO: bool = True
     MINIO_ENDPOINT: str = "localhost:9000"
     MINIO_ACCESS_KEY: str = "minioadmin"
     MINIO_SECRET_KEY: str = "minioadminpassword"
+    STORAGE_LOCAL_PATH: Optional[str] = None # store objects on this directory instead of MinIO/GCS
+    STORAGE_PART_SIZE: int = 10 * 1024 * 1024 # multipart/resumable chunk; MinIO minimum is 5 MiB
+    UPLOAD_MAX_BYTES: int = 200 * 1024 * 1024
 
     # Authentication
     USERINFO_URL: str = "http://dummy-userinfo/userinfo"
+    USERINFO_TIMEOUT_SECONDS: float = 5.0
+    AUTH_CACHE_TTL_SECONDS: float = 60.0 # how long a validated token is trusted without re-checking UserInfo
+    AUTH_CACHE_MAX_SIZE: int = 10000
     AD_GROUP_MAPPING: dict = {
         "CN=GraphIntell_Admins,OU=Groups,DC=example,DC=com": "admin",
         "CN=GraphIntell_Managers,OU=Groups,DC=example,DC=com": "manager",
@@ -57,9 +73,65 @@ class Settings(BaseSettings):
         "CN=GraphIntell_Users,OU=Groups,DC=example,DC=com": "viewer"
     }
 
+    # Stats
+    STATS_CACHE_TTL_SECONDS: float = 5.0
+    EXECUTION_STALE_SECONDS: float = 900.0 # RUNNING executions without a heartbeat for this long are not counted as active
+
+    # Pipeline
+    PIPELINE_QUEUE_PAGES: int = 8 # extracted pages buffered ahead of normalization/embedding
+    PIPELINE_INDEX_PAGES: int = 200 # spooled pages read back at a time for search, embedding and sketch indexing
+    EMBEDDING_BATCH_SIZE: int = 64 # unique segments per embedding call while streaming
+    EMBEDDING_INCREMENTAL: bool = True # reuse the previous version's vectors for pages whose fingerprint is unchanged
+    KEYWORD_CONTEXT_PAGES: int = 2 # pages kept on each side of a keyword match; per-document override on Document.context_pages
+
+    # Extraction
+    PDF_EXTRACTOR: str = "pypdfium2" # "pypdfium2", "pymupdf" or "pdfplumber" (layout-sensitive); per-document override on Document.pdf_extractor
+    HTML_SECTION_HEADING_LEVEL: int = 2 # h1..hN start a new section ("page") in HTML documents
+    # Masks applied before hashing/diffing/embedding (see normalizer.BUILTIN_RULES); per-document override on Document.normalization_rules
+    NORMALIZATION_RULES: List[str] = ["iso_date", "numeric_date", "long_date", "version", "revision", "tracking_params"]
+    # Running headers/footers: top/bottom segments recurring on this many pages are ignored
+    BOILERPLATE_MIN_PAGES: int = 3
+    BOILERPLATE_LOOKAHEAD_PAGES: int = 4 # pages held back so first occurrences are caught before matching/embedding
+
+    # OCR (pages without a text layer)
+    OCR_DPI: int = 200
+    OCR_LANGUAGE: str = "eng" # Tesseract language(s), e.g. "eng+deu"
+    OCR_WORKERS: int = 2 # Tesseract processes
+    OCR_CACHE_SIZE: int = 512 # page results kept in memory, keyed by page-image hash
+    OCR_CACHE_DIR: Optional[str] = None # optional on-disk cache shared across restarts
+
+    # Search
+    SEARCH_LANGUAGE: str = "english" # Postgres text search configuration
+    VECTOR_SEARCH_EF_SEARCH: int = 64 # HNSW candidate list size; higher = better recall, slower
+    VECTOR_SEARCH_OVERFETCH: int = 10 # nearest neighbours fetched per requested hit, so filtering and de-duplication still fill the page
+
+    # Near-duplicate detection (changing these invalidates stored sketches)
+    SKETCH_NUM_PERM: int = 128
+    SKETCH_BANDS: int = 16 # 16 bands x 8 rows: candidates above ~0.7 Jaccard
+    SKETCH_MIN_TOKENS: int = 8 # shorter segments are not sketched
+    DUPLICATE_SIMILARITY_THRESHOLD: float = 0.8
+    SHARED_CLAUSES_REFRESH_MINUTES: int = 15 # shared clause clusters are recomputed from the sketches this often
+
     # Embedding
-    EMBEDDING_PROVIDER: str = "huggingface" # "huggingface" or "google"
+    EMBEDDING_PROVIDER: str = "huggingface" # "huggingface", "google" or "http" (see embedding_providers.EMBEDDING_PROVIDERS)
     GOOGLE_API_KEY: Optional[str] = None
+    EMBEDDING_DIMENSION: int = 384 # all-MiniLM-L6-v2 = 384, text-embedding-004 = 768
+    GOOGLE_API_BASE_URL: str = "https://generativelanguage.googleapis.com/v1beta"
+    GOOGLE_EMBED_BATCH_SIZE: int = 100 # texts per batchEmbedContents request (API maximum is 100)
+    GOOGLE_EMBED_CONCURRENCY: int = 4 # requests in flight at once
+    GOOGLE_EMBED_REQUESTS_PER_MINUTE: int = 1500 # token-bucket rate shared by the whole process; match the project quota
+    GOOGLE_EMBED_MAX_ATTEMPTS: int = 5 # per batch, with exponential backoff on 429/5xx/network errors
+    GOOGLE_EMBED_TIMEOUT_SECONDS: float = 30.0
+    EMBEDDING_CHECKPOINT_DIR: Optional[str] = None # persist completed batches of failed runs across restarts
+    # Self-hosted embedding server (EMBEDDING_PROVIDER="http")
+    EMBEDDING_HTTP_URL: Optional[str] = None # e.g. "http://localhost:8080/v1" (OpenAI-compatible) or "http://localhost:8080" (TEI)
+    EMBEDDING_HTTP_API: str = "openai" # "openai" (POST /embeddings) or "tei" (POST /embed)
+    EMBEDDING_HTTP_MODEL: str = "all-MiniLM-L6-v2" # sent as "model" and part of the stored model id
+    EMBEDDING_HTTP_API_KEY: Optional[str] = None # sent as a Bearer token
+    EMBEDDING_HTTP_BATCH_SIZE: int = 32 # texts per request (TEI's default max_client_batch_size)
+    EMBEDDING_HTTP_CONCURRENCY: int = 4 # requests in flight (and pooled connections) per process and event loop
+    EMBEDDING_HTTP_MAX_ATTEMPTS: int = 3
+    EMBEDDING_HTTP_TIMEOUT_SECONDS: float = 60.0
 
     model_config = SettingsConfigDict(case_sensitive=True, env_file=".env")
 
@@ -17,28 +17,31 @@ class User(BaseModel):
     groups: List[str] = []
 
 from app.core.config import settings
+from app.core.cache import TTLCache
+import hashlib
 import httpx
 
-async def get_current_user(
-    authorization: str = Header(..., alias="Authorization"),
-    x_user_role: Optional[str] = Header(None, alias="X-User-Role") # Fallback for local testing if needed
-) -> User:
-    """
-    Authenticate via Bearer token validation against UserInfo endpoint.
-    Retrieves AD groups and maps to application roles.
-    """
-    
-    # 1. Extract Token
-    if not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
+# Validated token -> User. Keyed by a hash so raw tokens are not kept in memory.
+_token_cache = TTLCache(ttl=settings.AUTH_CACHE_TTL_SECONDS, max_size=settings.AUTH_CACHE_MAX_SIZE)
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared pooled client for UserInfo calls (keeps connections alive across requests)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.USERINFO_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
         )
-    
-    token = authorization.split(" ")[1]
-    
-    # 2. Call UserInfo Endpoint (or Mock)
+    return _http_client
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+async def _fetch_user_info(token: str) -> dict:
     user_info = {}
     if "dummy-userinfo" in settings.USERINFO_URL:
         # Mock logic for local testing/dev when real gateway isn't reachable
@@ -82,19 +85,22 @@ async def get_current_user(
     else:
         # Real UserInfo Call
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(
-                    settings.USERINFO_URL, 
-                    headers={"Authorization": f"Bearer {token}"}
-                )
-                resp.raise_for_status()
-                user_info = resp.json()
+            resp = await get_http_client().get(
+                settings.USERINFO_URL, 
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            resp.raise_for_status()
+            user_info = resp.json()
         except Exception as e:
             print(f"Auth Error: {e}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials"
             )
+    return user_info
+
+async def _validate_token(token: str) -> User:
+    user_info = await _fetch_user_info(token)
 
     # 3. Map Groups to Role
     groups = user_info.get("groups", [])
@@ -129,3 +135,30 @@ async def get_current_user(
         role=assigned_role,
         groups=groups
     )
+
+async def get_current_user(
+    authorization: str = Header(..., alias="Authorization"),
+    x_user_role: Optional[str] = Header(None, alias="X-User-Role") # Fallback for local testing if needed
+) -> User:
+    """
+    Authenticate via Bearer token validation against UserInfo endpoint.
+    Retrieves AD groups and maps to application roles.
+
+    Validated tokens are cached for AUTH_CACHE_TTL_SECONDS; concurrent
+    requests with the same uncached token share one UserInfo call.
+    Failed validations are not cached.
+    """
+    
+    # 1. Extract Token
+    if not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    token = authorization.split(" ")[1]
+    
+    # 2. Call UserInfo Endpoint (or Mock), once per token per TTL
+    key = hashlib.sha256(token.encode()).hexdigest()
+    return await _token_cache.get_or_load(key, lambda: _validate_token(token))
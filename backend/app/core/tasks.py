@@ -3,7 +3,6 @@ from typing import List, Optional
 from sqlalchemy import select, update
 from app.db.session import AsyncSessionLocal
 from app.db.models import Execution, ExecutionStatus, Document
-from app.services.pipeline import PipelineService
 
 import logging
 import traceback
@@ -12,6 +11,9 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 async def run_pipeline_task(execution_id: uuid.UUID, document_ids: Optional[List[uuid.UUID]] = None):
+    # Imported here so API workers load the PDF/ML stack only once a pipeline actually runs
+    from app.services.pipeline import PipelineService
+
     # Create a new session for the background task
     async with AsyncSessionLocal() as session:
         try:
@@ -30,11 +32,14 @@ async def run_pipeline_task(execution_id: uuid.UUID, document_ids: Optional[List
             execution = await session.get(Execution, execution_id)
             if not execution:
                 print(f"[TASK] Creating NEW execution record {execution_id}")
-                execution = Execution(id=execution_id, status=ExecutionStatus.RUNNING, start_time=datetime.utcnow())
+                execution = Execution(
+                    id=execution_id, status=ExecutionStatus.RUNNING, start_time=datetime.utcnow(), heartbeat_at=datetime.utcnow()
+                )
                 session.add(execution)
             else:
                 print(f"[TASK] Updating existing execution record {execution_id}")
                 execution.status = ExecutionStatus.RUNNING
+                execution.heartbeat_at = datetime.utcnow()
             
             await session.commit()
             print(f"[TASK] Execution {execution_id} committed.")
@@ -2,4 +2,4 @@
 # to ensure all models are imported when autogenerating migrations.
 
 from app.db.session import Base
-from app.db.models import Document, Version, Execution
+from app.db.models import Document, Version, Execution, SearchPage, SegmentEmbedding, SegmentSketch, StatsCounter, StatsCounterDelta
@@ -1,11 +1,13 @@
 import uuid
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import String, DateTime, ForeignKey, Float, Text, Enum
+from sqlalchemy import String, DateTime, ForeignKey, Float, Text, Enum, Integer, BigInteger, LargeBinary, Computed, Identity, Index, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR, ARRAY
+from pgvector.sqlalchemy import Vector
 import enum
 
+from app.core.config import settings
 from app.db.session import Base
 
 class ExecutionStatus(str, enum.Enum):
@@ -27,8 +29,32 @@ class Document(Base):
     owner_email: Mapped[Optional[str]] = mapped_column(String)
     owner_username: Mapped[Optional[str]] = mapped_column(String)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    pdf_extractor: Mapped[Optional[str]] = mapped_column(String) # overrides settings.PDF_EXTRACTOR
+    normalization_rules: Mapped[Optional[list]] = mapped_column(JSONB) # overrides settings.NORMALIZATION_RULES
+    keyword_mode: Mapped[Optional[str]] = mapped_column(String) # "substring" (default) or "word"
+    context_pages: Mapped[Optional[int]] = mapped_column(Integer) # overrides settings.KEYWORD_CONTEXT_PAGES
+
+    # Denormalized summary of the most recent version, maintained by PipelineService
+    latest_version_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("versions.id", ondelete="SET NULL", use_alter=True, name="fk_documents_latest_version_id")
+    )
+    last_score: Mapped[Optional[float]] = mapped_column(Float)
+    last_hash: Mapped[Optional[str]] = mapped_column(String)
+    last_checked_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    last_changed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    # Identity of the raw source the latest version was built from (sha256, or etag:<etag>)
+    last_source_digest: Mapped[Optional[str]] = mapped_column(String)
     
-    versions: Mapped[List["Version"]] = relationship("Version", back_populates="document", cascade="all, delete-orphan")
+    versions: Mapped[List["Version"]] = relationship(
+        "Version", back_populates="document", cascade="all, delete-orphan", foreign_keys="Version.document_id"
+    )
+
+    __table_args__ = (
+        # Documents list keyset
+        Index("ix_documents_created_at_id", "created_at", "id"),
+        # Natural key for config import upserts
+        UniqueConstraint("application_name", "url", name="uq_documents_application_name_url"),
+    )
 
 class Version(Base):
     __tablename__ = "versions"
@@ -42,12 +68,22 @@ class Version(Base):
     # Analysis results
     semantic_score: Mapped[Optional[float]] = mapped_column(Float)
     extracted_text_path: Mapped[Optional[str]] = mapped_column(String)
+    segment_index_path: Mapped[Optional[str]] = mapped_column(String)
+    matches_path: Mapped[Optional[str]] = mapped_column(String)
     embeddings_path: Mapped[Optional[str]] = mapped_column(String)
+    # {"model": ..., "pages": [[page, fingerprint, first_vector, vector_count], ...]}; vectors index embeddings.json
+    page_fingerprints: Mapped[Optional[dict]] = mapped_column(JSONB)
     
-    document: Mapped["Document"] = relationship("Document", back_populates="versions")
+    document: Mapped["Document"] = relationship("Document", back_populates="versions", foreign_keys=[document_id])
     execution_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("executions.id"))
     execution: Mapped["Execution"] = relationship("Execution", back_populates="versions")
 
+    __table_args__ = (
+        # Latest version per document (ORDER BY timestamp DESC LIMIT 1) and per-document history
+        Index("ix_versions_document_id_timestamp", "document_id", "timestamp"),
+        Index("ix_versions_execution_id", "execution_id"),
+    )
+
 class Execution(Base):
     __tablename__ = "executions"
 
@@ -55,11 +91,20 @@ class Execution(Base):
     status: Mapped[ExecutionStatus] = mapped_column(Enum(ExecutionStatus), default=ExecutionStatus.PENDING)
     start_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     end_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Last progress reported by the running pipeline; RUNNING rows that stop beating belong to a dead worker
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     logs: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     steps: Mapped[Optional[List[dict]]] = mapped_column(JSONB, default=[])
     
     versions: Mapped[List["Version"]] = relationship("Version", back_populates="execution")
 
+    __table_args__ = (
+        # Executions list keyset (start_time DESC, id DESC) and 24h stats count
+        Index("ix_executions_start_time_id", "start_time", "id"),
+        # In-flight pipelines (stats), kept tiny by only indexing running rows
+        Index("ix_executions_running", "status", postgresql_where=text("status = 'RUNNING'")),
+    )
+
     @property
     def targets(self) -> List[dict]:
         seen = set()
@@ -74,3 +119,83 @@ class Execution(Base):
                     "url": v.document.url
                 })
         return targets
+
+class SearchPage(Base):
+    """Full-text search row: the normalized text of one page of one version."""
+    __tablename__ = "search_pages"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    version_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("versions.id", ondelete="CASCADE"), index=True)
+    document_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), index=True)
+    page: Mapped[int] = mapped_column(Integer)
+    content: Mapped[str] = mapped_column(Text)
+    search_vector = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{settings.SEARCH_LANGUAGE}', content)", persisted=True)
+    )
+
+    __table_args__ = (
+        Index("ix_search_pages_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+class SegmentEmbedding(Base):
+    """Segment embedding indexed for approximate nearest-neighbour search (pgvector HNSW)."""
+    __tablename__ = "segment_embeddings"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    version_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("versions.id", ondelete="CASCADE"), index=True)
+    document_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), index=True)
+    page: Mapped[int] = mapped_column(Integer)
+    segment_index: Mapped[int] = mapped_column(Integer)
+    content: Mapped[str] = mapped_column(Text)
+    # sketch.exact_text_hash of the embedded text: stored vectors are reused for identical text
+    text_hash: Mapped[Optional[str]] = mapped_column(String(40), index=True)
+    model: Mapped[Optional[str]] = mapped_column(String)
+    embedding = mapped_column(Vector(settings.EMBEDDING_DIMENSION))
+
+    __table_args__ = (
+        Index(
+            "ix_segment_embeddings_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+class SegmentSketch(Base):
+    """MinHash signature and LSH band hashes of a segment, for near-duplicate detection."""
+    __tablename__ = "segment_sketches"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    version_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("versions.id", ondelete="CASCADE"), index=True)
+    document_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), index=True)
+    page: Mapped[int] = mapped_column(Integer)
+    segment_index: Mapped[int] = mapped_column(Integer)
+    text_hash: Mapped[str] = mapped_column(String(40), index=True)
+    snippet: Mapped[str] = mapped_column(Text)
+    band_hashes: Mapped[List[int]] = mapped_column(ARRAY(BigInteger))
+    signature: Mapped[bytes] = mapped_column(LargeBinary)
+
+    __table_args__ = (
+        Index("ix_segment_sketches_band_hashes", "band_hashes", postgresql_using="gin"),
+    )
+
+class StatsCounter(Base):
+    """
+    Row counts maintained by triggers (see migrations 0005 and 0015), so stats
+    never COUNT(*) full tables. The current count is `value` plus the pending
+    StatsCounterDelta rows for the same name.
+    """
+    __tablename__ = "stats_counters"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, default=0)
+
+class StatsCounterDelta(Base):
+    """Append-only counter changes written by the triggers; folded into StatsCounter by the scheduler."""
+    __tablename__ = "stats_counter_deltas"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+    delta: Mapped[int] = mapped_column(BigInteger)
@@ -1,13 +1,31 @@
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
 
-engine = create_async_engine(
-    settings.DATABASE_URI,
-    echo=settings.DEBUG,
-    future=True
-)
+def _engine_options() -> Dict[str, Any]:
+    options: Dict[str, Any] = {"echo": settings.SQL_ECHO, "future": True}
+    if settings.DATABASE_URI.startswith("postgresql+asyncpg"):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            connect_args={
+                # asyncpg's own cache and SQLAlchemy's adapter cache must both be off behind pgbouncer
+                "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "server_settings": {"application_name": settings.PROJECT_NAME},
+            },
+        )
+    return options
+
+engine = create_async_engine(settings.DATABASE_URI, **_engine_options())
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -22,3 +40,53 @@ Base = declarative_base()
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
+
+# Pool utilization counters, updated from pool events (sync, cheap)
+_pool_metrics: Dict[str, Any] = {
+    "connects": 0,
+    "checkouts": 0,
+    "invalidations": 0,
+    "peak_checked_out": 0,
+    "max_checkout_seconds": 0.0,
+}
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    _pool_metrics["connects"] += 1
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    _pool_metrics["checkouts"] += 1
+    connection_record.info["checkout_at"] = time.monotonic()
+    pool = engine.sync_engine.pool
+    checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+    if checked_out > _pool_metrics["peak_checked_out"]:
+        _pool_metrics["peak_checked_out"] = checked_out
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    started = connection_record.info.pop("checkout_at", None)
+    if started is not None:
+        held = time.monotonic() - started
+        if held > _pool_metrics["max_checkout_seconds"]:
+            _pool_metrics["max_checkout_seconds"] = held
+
+@event.listens_for(engine.sync_engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    _pool_metrics["invalidations"] += 1
+
+def pool_status() -> Dict[str, Any]:
+    """Snapshot of the connection pool for monitoring."""
+    pool = engine.sync_engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__, **_pool_metrics}
+    if hasattr(pool, "checkedout"):
+        capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        status.update(
+            size=pool.size(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            utilization=round(pool.checkedout() / capacity, 3) if capacity else None,
+        )
+    return status
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.api.pagination import NEXT_CURSOR_HEADER
 
 def get_application() -> FastAPI:
     application = FastAPI(
@@ -15,6 +16,7 @@ def get_application() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     from app.api.api import api_router
@@ -27,6 +29,11 @@ def get_application() -> FastAPI:
         scheduler.start()
         await scheduler.load_jobs()
 
+    @application.on_event("shutdown")
+    async def shutdown_event():
+        from app.core.security import close_http_client
+        await close_http_client()
+
     return application
 
 app = get_application()
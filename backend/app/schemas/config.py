@@ -1,14 +1,47 @@
-from typing import List, Optional, Any
+from typing import List, Literal, Optional, Any, Union
 from uuid import UUID
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+class NormalizationRuleConfig(BaseModel):
+    name: Optional[str] = None
+    pattern: str # regular expression; numbered backreferences are not supported
+    replacement: str = "[MASK]"
+    ignore_case: bool = False
 
 class DocumentConfig(BaseModel):
     application_name: str
     document_name: str
     url: str # Allow internal:// scheme
+    # Substrings by default; "quoted phrase" or "re:<pattern>" per keyword
     keywords: Optional[List[str]] = []
+    keyword_mode: Optional[Literal["substring", "word"]] = None # "word": plain keywords match whole words
+    context_pages: Optional[int] = Field(None, ge=0, le=50) # pages around a match; None uses the server default
     schedule: Optional[str] = "weekly"
+    pdf_extractor: Optional[Literal["pypdfium2", "pymupdf", "pdfplumber"]] = None # None uses the server default
+    # Built-in rule names and/or custom rules; None uses the server default
+    normalization_rules: Optional[List[Union[str, NormalizationRuleConfig]]] = None
+
+    @field_validator("keywords")
+    def validate_keywords(cls, v):
+        if v:
+            from app.services.keywords import KeywordMatcher
+            try:
+                KeywordMatcher(v)
+            except Exception as e:
+                raise ValueError(f"Invalid keyword: {e}")
+        return v
+
+    @field_validator("normalization_rules")
+    def validate_normalization_rules(cls, v):
+        if v is not None:
+            from app.services.normalizer import TextNormalizer
+            try:
+                # Compiles the combined pattern the pipeline uses, not only each rule
+                TextNormalizer([r.model_dump() if isinstance(r, NormalizationRuleConfig) else r for r in v])
+            except Exception as e:
+                raise ValueError(f"Invalid normalization rule: {e}")
+        return v
 
 class ConfigImport(BaseModel):
     documents: List[DocumentConfig]
@@ -19,12 +52,21 @@ class DocumentResponse(BaseModel):
     name: str # map 'document_name' or just 'name' from DB
     url: str
     keywords: Optional[List[str]] = []
+    keyword_mode: Optional[str] = None
+    context_pages: Optional[int] = None
     schedule: Optional[str]
+    pdf_extractor: Optional[str] = None
+    normalization_rules: Optional[List[Any]] = None
     owner_id: Optional[str] = None
     owner_email: Optional[str] = None
     owner_username: Optional[str] = None
     created_at: Optional[Any] = None
     latest_execution_id: Optional[UUID] = None
+    latest_version_id: Optional[UUID] = None
+    last_score: Optional[float] = None
+    last_hash: Optional[str] = None
+    last_checked_at: Optional[datetime] = None
+    last_changed_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -37,6 +79,8 @@ class VersionSchema(BaseModel):
     gcs_path: str
     semantic_score: Optional[float] = None
     extracted_text_path: Optional[str] = None
+    segment_index_path: Optional[str] = None
+    matches_path: Optional[str] = None
     embeddings_path: Optional[str] = None
     execution_id: Optional[UUID] = None
 
@@ -49,6 +93,16 @@ class ExecutionTarget(BaseModel):
     document_name: str
     url: str
 
+class ExecutionSummarySchema(BaseModel):
+    id: UUID
+    status: str
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    targets: Optional[List[ExecutionTarget]] = []
+
+    class Config:
+        from_attributes = True
+
 class ExecutionSchema(BaseModel):
     id: UUID
     status: str
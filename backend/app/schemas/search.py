@@ -0,0 +1,33 @@
+from typing import List
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel
+
+class SearchHit(BaseModel):
+    document_id: UUID
+    application_name: str
+    document_name: str
+    version_id: UUID
+    timestamp: datetime
+    page: int
+    rank: float
+    snippet: str
+
+class SearchResponse(BaseModel):
+    query: str
+    hits: List[SearchHit]
+
+class SemanticSearchHit(BaseModel):
+    document_id: UUID
+    application_name: str
+    document_name: str
+    version_id: UUID
+    timestamp: datetime
+    page: int
+    segment_index: int
+    score: float
+    text: str
+
+class SemanticSearchResponse(BaseModel):
+    query: str
+    hits: List[SemanticSearchHit]
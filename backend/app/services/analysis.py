@@ -1,35 +1,30 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional
 import difflib
+import functools
 import logging
-import time
 
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
-import google.generativeai as genai
-from app.core.config import settings
+from app.services.embedding_providers import get_embedding_provider
 
 logger = logging.getLogger(__name__)
 
 class AnalysisEngine:
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
-        self.provider = settings.EMBEDDING_PROVIDER.lower()
-        self.hf_model = None
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', provider: Optional[str] = None):
+        self.embedder = get_embedding_provider(provider, model_name)
+        self.provider = self.embedder.name
+        self.model_name = model_name
         
         logger.info(f"Initializing AnalysisEngine with provider: {self.provider}")
-        
-        if self.provider == "huggingface":
-            try:
-                self.hf_model = SentenceTransformer(model_name)
-            except Exception as e:
-                logger.error(f"Failed to load definition model {model_name}: {e}")
-                
-        elif self.provider == "google":
-            if not settings.GOOGLE_API_KEY:
-                logger.error("GOOGLE_API_KEY is missing but provider is set to 'google'. Falling back to HuggingFace.")
-                self.provider = "huggingface"
-                self.hf_model = SentenceTransformer(model_name)
-            else:
-                genai.configure(api_key=settings.GOOGLE_API_KEY)
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the vector space embeddings come from; vectors are only comparable within one."""
+        return self.embedder.model_id
+
+    @property
+    def embed_concurrency(self) -> int:
+        """Embedding calls worth running at once: API requests overlap, local inference does not."""
+        return self.embedder.concurrency
 
     def compute_text_diff(self, old_text: str, new_text: str) -> List[Dict[str, Any]]:
         """
@@ -52,65 +47,13 @@ class AnalysisEngine:
     def compute_embeddings(self, texts: List[str]) -> List[List[float]]:
         if not texts:
             return []
-            
-        if self.provider == "google":
-            return self._compute_google_embeddings(texts)
-        else:
-            return self._compute_hf_embeddings(texts)
-
-    def _compute_hf_embeddings(self, texts: List[str]) -> List[List[float]]:
-        if not self.hf_model:
-            logger.error("HuggingFace model not initialized")
-            return []
-        embeddings = self.hf_model.encode(texts)
-        return embeddings.tolist()
+        return self.embedder.embed(texts)
 
-    def _compute_google_embeddings(self, texts: List[str]) -> List[List[float]]:
-        embeddings = []
-        # Google API might have rate limits, process in batches if necessary
-        # text-embedding-004 is a good default
-        model = 'models/text-embedding-004' 
-        
-        try:
-            # Batch processing for API efficiency
-            # Verify batch size limits for Google API (often 100 or 250)
-            batch_size = 100 
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                result = genai.embed_content(
-                    model=model,
-                    content=batch,
-                    task_type="semantic_similarity"
-                )
-                if 'embedding' in result:
-                    data = result['embedding']
-                    # Check if it's a list of floats (single) or list of lists (batch)
-                    if isinstance(data, list):
-                        if len(data) > 0 and isinstance(data[0], float):
-                            # It's a single embedding (unexpected for batch request but possible if batch size=1 or API quirk)
-                            embeddings.append(data)
-                        elif len(data) > 0 and isinstance(data[0], list):
-                            # Correct batch response
-                            embeddings.extend(data)
-                        else:
-                            logger.warning(f"Unexpected embedding format: {type(data)} - {data[:5]}...")
-                    else:
-                        logger.warning(f"Unexpected embedding data type: {type(data)}")
-                        
-                elif 'embeddings' in result:
-                     logger.info("Received 'embeddings' key.")
-                     embeddings.extend(result['embeddings'])
-                
-                logger.info(f"Batch processed. Input size: {len(batch)}. Result embeddings: {len(embeddings) - (len(texts) - len(batch) if i > 0 else 0)}")
-
-                    
-                time.sleep(0.1) # Brief pause to be nice to rate limits
-                
-            return embeddings
-        except Exception as e:
-            logger.error(f"Google Embedding API failed: {e}")
-            # Fallback? Or fail? Fail for now so user knows.
+    async def compute_embeddings_async(self, texts: List[str]) -> List[List[float]]:
+        """Embed from a running event loop; errors from remote providers propagate."""
+        if not texts:
             return []
+        return await self.embedder.embed_async(texts)
 
     def compute_semantic_similarity(self, emp1: List[float], emp2: List[float]) -> float:
         """
@@ -118,6 +61,12 @@ class AnalysisEngine:
         """
         if not emp1 or not emp2:
             return 0.0
-        # Use util.cos_sim from sentence_transformers as it is efficient
-        # Ensure imports are available or use numpy manual calc
-        return float(util.cos_sim(emp1, emp2)[0][0])
+        a = np.asarray(emp1, dtype=np.float64)
+        b = np.asarray(emp2, dtype=np.float64)
+        norm = np.linalg.norm(a) * np.linalg.norm(b)
+        return float(a @ b / norm) if norm else 0.0
+
+@functools.lru_cache(maxsize=1)
+def get_analysis_engine() -> AnalysisEngine:
+    """Process-wide engine for request-time embedding (e.g. search queries), loaded once."""
+    return AnalysisEngine()
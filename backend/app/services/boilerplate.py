@@ -0,0 +1,133 @@
+import re
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WS_RE = re.compile(r"\s+")
+# Page labels: "page 3", "p. 3", "3 / 40", "3 of 40", or a bare "- 3 -"
+_PAGE_LABEL_RE = re.compile(
+    r"\b(?:page|pg|p)\.?\s*(\d+)"
+    r"|\b(\d+)\s*(?:/|of)\s*\d+\b"
+    r"|^[-\u2013\u2014\s]*(\d+)[-\u2013\u2014\s]*$"
+)
+# Printed page labels may be offset from the PDF page index (unnumbered cover pages)
+_MAX_LABEL_OFFSET = 5
+
+def _fingerprint(text: str, page: int) -> str:
+    """
+    Lower-cased text with the page counter (the first page label close to
+    the page number) replaced by its offset, so "Page 3 of 40" on page 3 and
+    "Page 4 of 40" on page 4 share a fingerprint. Other numbers are kept:
+    "Article 5" and "Article 6" differ even when they open pages 5 and 6.
+    """
+    text = _WS_RE.sub(" ", text.lower()).strip()
+    for m in _PAGE_LABEL_RE.finditer(text):
+        group = m.lastindex
+        offset = int(m.group(group)) - page
+        if abs(offset) <= _MAX_LABEL_OFFSET:
+            return f"{text[:m.start(group)]}#{offset:+d}{text[m.end(group):]}"
+    return text
+
+class BoilerplateDetector:
+    """
+    Flags running headers, footers and watermarks: short segments among the
+    first or last `edge` segments of a page whose normalized text (page
+    counters masked) recurs at the same position on at least `min_pages` pages.
+
+    Each segment is hashed once under its position key, so detection is
+    linear in the number of segments. Pages are held back for `lookahead`
+    pages before `push` releases them, so the first occurrences of a running
+    header are flagged before anything downstream (keyword matching,
+    embedding) sees them. `segments` only needs to hold the segments of
+    pages not yet released; flags for segments the caller has already dropped
+    are collected in `late_flags` (segment id -> reason) so it can still apply
+    them for storage, search and sketches.
+
+    Only meaningful for paginated sources: HTML "pages" are heading sections,
+    which have no running headers, so `enabled=False` releases every page
+    as is.
+    """
+
+    def __init__(
+        self,
+        segments: Mapping[int, Dict[str, Any]],
+        min_pages: int = settings.BOILERPLATE_MIN_PAGES,
+        lookahead: int = settings.BOILERPLATE_LOOKAHEAD_PAGES,
+        edge: int = 2,
+        max_length: int = 200,
+        enabled: bool = True
+    ):
+        self.segments = segments
+        self.min_pages = min_pages
+        self.lookahead = lookahead
+        self.edge = edge
+        self.max_length = max_length
+        self.enabled = enabled
+        self.flagged = 0
+        self.late_flags: Dict[int, str] = {}
+        # position key -> segment ids, until the key reaches min_pages
+        self._occurrences: Dict[Tuple[int, str], List[int]] = {}
+        self._pages: Dict[Tuple[int, str], int] = {}
+        self._last_page: Dict[Tuple[int, str], int] = {}
+        self._pending: Deque[Tuple[int, range]] = deque()
+
+    def push(self, page: int, segment_ids: range) -> List[Tuple[int, range]]:
+        """Add a page's segments; returns the (page, segment_ids) now decided."""
+        if not self.enabled:
+            return [(page, segment_ids)]
+        count = len(segment_ids)
+        for offset, i in enumerate(segment_ids):
+            # Top positions are 0, 1, ...; bottom positions -1, -2, ...
+            positions = []
+            if offset < self.edge:
+                positions.append(offset)
+            if count - offset <= self.edge:
+                positions.append(offset - count)
+            text = self.segments[i]["normalized_text"]
+            if positions and len(text) <= self.max_length:
+                text = _fingerprint(text, page)
+                if text:
+                    for position in positions:
+                        self._observe((position, text), page, i)
+
+        self._pending.append((page, segment_ids))
+        released = []
+        while self._pending and self._pending[0][0] <= page - self.lookahead:
+            released.append(self._pending.popleft())
+        return released
+
+    def flush(self) -> List[Tuple[int, range]]:
+        released = list(self._pending)
+        self._pending.clear()
+        return released
+
+    def _observe(self, key: Tuple[int, str], page: int, segment_id: int) -> None:
+        if self._pages.get(key, 0) >= self.min_pages:
+            self._flag(segment_id, key[0])
+            return
+        self._occurrences.setdefault(key, []).append(segment_id)
+        if self._last_page.get(key) != page:
+            self._last_page[key] = page
+            self._pages[key] = self._pages.get(key, 0) + 1
+        if self._pages[key] >= self.min_pages:
+            for i in self._occurrences.pop(key):
+                self._flag(i, key[0])
+
+    def _flag(self, segment_id: int, position: int) -> None:
+        reason = "repeated_header" if position >= 0 else "repeated_footer"
+        seg = self.segments.get(segment_id)
+        if seg is None:
+            self.late_flags[segment_id] = reason
+            return
+        self.mark(seg, reason)
+
+    def mark(self, seg: Dict[str, Any], reason: str) -> None:
+        if seg.get("ignored"):
+            return
+        seg["ignored"] = True
+        seg["reason"] = reason
+        self.flagged += 1
@@ -1,5 +1,5 @@
 import aiohttp
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 import logging
 from app.services.storage import StorageService
 
@@ -9,24 +9,44 @@ class DocumentDownloader:
     def __init__(self, storage_service: StorageService = None):
         self.storage = storage_service or StorageService()
 
-    async def download(self, url: str) -> Tuple[Optional[bytes], Optional[str]]:
+    async def probe(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Storage metadata (size, content_type, etag, sha256) of an internal://
+        document, without transferring its content. None for other schemes
+        or when the object cannot be found.
+        """
+        if not url.startswith("internal://"):
+            return None
+        try:
+            return await self.storage.stat(url.replace("internal://", ""))
+        except Exception as e:
+            logger.warning(f"Could not stat {url}: {e}")
+            return None
+
+    async def download(self, url: str, info: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Any], Optional[str]]:
         """
         Download document from URL. 
         Supports http(s):// and internal:// schemes.
         Returns (content, content_type) or (None, None) on failure.
+        For internal:// on the filesystem backend, content is a read-only
+        mmap of the stored file instead of a copy in memory.
         """
         try:
             if url.startswith("internal://"):
                 # Handle internal storage
                 path = url.replace("internal://", "")
-                content = await self.storage.download(path)
-                # Guess content type or store it with file metadata? 
-                # For now assuming PDF as that's the primary use case, or rely on file extension
-                content_type = "application/pdf" 
-                if path.endswith(".json"):
-                    content_type = "application/json"
-                elif path.endswith(".html"):
-                    content_type = "text/html"
+                content = self.storage.open_local(path)
+                if content is None:
+                    content = await self.storage.download(path)
+
+                # Prefer the content type recorded at upload time, fall back to the extension
+                content_type = (info or {}).get("content_type")
+                if not content_type or content_type == "application/octet-stream":
+                    content_type = "application/pdf" 
+                    if path.endswith(".json"):
+                        content_type = "application/json"
+                    elif path.endswith(".html"):
+                        content_type = "text/html"
                 
                 return content, content_type
 
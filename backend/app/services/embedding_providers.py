@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Dict, List, Optional, Type
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingProvider:
+    """
+    Embedding backend. Heavy client libraries are imported when a provider is
+    instantiated, never at module load, so only the configured one is loaded.
+
+    `embed` is blocking; `embed_async` is used from the pipeline's event loop
+    (by default `embed` in the executor). `concurrency` is how many calls are
+    worth running at once.
+    """
+
+    name: str = ""
+    concurrency: int = 1
+
+    @classmethod
+    def is_available(cls) -> bool:
+        raise NotImplementedError
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the vector space embeddings come from; vectors are only comparable within one."""
+        raise NotImplementedError
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    async def embed_async(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.embed, texts)
+
+class HuggingFaceProvider(EmbeddingProvider):
+    """Local sentence-transformers model, run in-process."""
+
+    name = "huggingface"
+    concurrency = 2
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        self.model_name = model_name
+        self.model = None
+        try:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(model_name)
+        except Exception as e:
+            logger.error(f"Failed to load definition model {model_name}: {e}")
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import sentence_transformers  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    @property
+    def model_id(self) -> str:
+        return f"huggingface:{self.model_name}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not self.model:
+            logger.error("HuggingFace model not initialized")
+            return []
+        return self.model.encode(texts).tolist()
+
+class GoogleProvider(EmbeddingProvider):
+    """Generative Language API (see google_embeddings.GoogleEmbeddingClient)."""
+
+    name = "google"
+    MODEL = "models/text-embedding-004"
+
+    def __init__(self, model_name: Optional[str] = None):
+        from app.services.google_embeddings import GoogleEmbeddingClient
+
+        self.concurrency = settings.GOOGLE_EMBED_CONCURRENCY
+        self.client = GoogleEmbeddingClient(settings.GOOGLE_API_KEY, model=self.MODEL)
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return bool(settings.GOOGLE_API_KEY)
+
+    @property
+    def model_id(self) -> str:
+        return f"google:{self.MODEL}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        try:
+            return asyncio.run(self.client.embed(texts))
+        except Exception as e:
+            logger.error(f"Google Embedding API failed: {e}")
+            return []
+
+    async def embed_async(self, texts: List[str]) -> List[List[float]]:
+        # Errors propagate; completed batches stay checkpointed
+        return await self.client.embed(texts)
+
+class HttpProvider(EmbeddingProvider):
+    """
+    Self-hosted embedding server: any OpenAI-compatible `/embeddings`
+    endpoint (vLLM, Ollama, LocalAI, TEI's /v1) or Text Embeddings
+    Inference's native `/embed`.
+
+    Connections are pooled: one client for blocking calls, and one async
+    client per event loop (connections cannot be shared across loops).
+    Texts are sent in batches of EMBEDDING_HTTP_BATCH_SIZE with up to
+    EMBEDDING_HTTP_CONCURRENCY requests in flight, retried on 429/5xx and
+    network errors.
+    """
+
+    name = "http"
+
+    def __init__(self, model_name: Optional[str] = None, transport: "Optional[httpx.BaseTransport]" = None):
+        import httpx
+
+        self.api = settings.EMBEDDING_HTTP_API.lower()
+        if self.api not in ("openai", "tei"):
+            raise ValueError(f"Unknown EMBEDDING_HTTP_API '{settings.EMBEDDING_HTTP_API}'")
+        self.model_name = settings.EMBEDDING_HTTP_MODEL
+        self.batch_size = settings.EMBEDDING_HTTP_BATCH_SIZE
+        self.concurrency = settings.EMBEDDING_HTTP_CONCURRENCY
+        self._client_options = {
+            "base_url": settings.EMBEDDING_HTTP_URL.rstrip("/"),
+            "headers": {"Authorization": f"Bearer {settings.EMBEDDING_HTTP_API_KEY}"} if settings.EMBEDDING_HTTP_API_KEY else {},
+            "timeout": httpx.Timeout(settings.EMBEDDING_HTTP_TIMEOUT_SECONDS),
+            "limits": httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        }
+        if transport is not None:
+            # Must serve both clients, e.g. httpx.MockTransport
+            self._client_options["transport"] = transport
+        self._client: Optional[httpx.Client] = None
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return bool(settings.EMBEDDING_HTTP_URL)
+
+    @property
+    def model_id(self) -> str:
+        return f"http:{self.model_name}"
+
+    def _request(self, texts: List[str]):
+        if self.api == "tei":
+            return "/embed", {"inputs": texts, "truncate": True}
+        return "/embeddings", {"model": self.model_name, "input": texts}
+
+    def _parse(self, body, count: int) -> List[List[float]]:
+        if self.api == "tei":
+            vectors = body
+        else:
+            # OpenAI responses carry an index per item; order is not guaranteed
+            vectors = [item["embedding"] for item in sorted(body["data"], key=lambda item: item["index"])]
+        if len(vectors) != count:
+            raise ValueError(f"Expected {count} embeddings, got {len(vectors)}")
+        return vectors
+
+    def _retrying(self, retry_cls):
+        from tenacity import retry_if_exception, stop_after_attempt, wait_exponential_jitter
+        from app.services.google_embeddings import _retryable
+
+        return retry_cls(
+            stop=stop_after_attempt(settings.EMBEDDING_HTTP_MAX_ATTEMPTS),
+            wait=wait_exponential_jitter(initial=0.5, max=10),
+            retry=retry_if_exception(_retryable),
+            reraise=True,
+        )
+
+    def _sync_client(self):
+        import httpx
+
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(**self._client_options)
+            return self._client
+
+    def _async_client(self):
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = httpx.AsyncClient(**self._client_options)
+        return client
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        return [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        from tenacity import Retrying
+
+        client = self._sync_client()
+        vectors = []
+        try:
+            for batch in self._batches(texts):
+                path, payload = self._request(batch)
+                for attempt in self._retrying(Retrying):
+                    with attempt:
+                        response = client.post(path, json=payload)
+                        response.raise_for_status()
+                vectors.extend(self._parse(response.json(), len(batch)))
+            return vectors
+        except Exception as e:
+            logger.error(f"Embedding server request failed: {e}")
+            return []
+
+    async def embed_async(self, texts: List[str]) -> List[List[float]]:
+        from tenacity import AsyncRetrying
+
+        client = self._async_client()
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def run(batch: List[str]) -> List[List[float]]:
+            path, payload = self._request(batch)
+            async with slots:
+                async for attempt in self._retrying(AsyncRetrying):
+                    with attempt:
+                        response = await client.post(path, json=payload)
+                        response.raise_for_status()
+            return self._parse(response.json(), len(batch))
+
+        results = await asyncio.gather(*(run(batch) for batch in self._batches(texts)))
+        return [vector for vectors in results for vector in vectors]
+
+EMBEDDING_PROVIDERS: Dict[str, Type[EmbeddingProvider]] = {
+    provider.name: provider for provider in (HuggingFaceProvider, GoogleProvider, HttpProvider)
+}
+
+def get_embedding_provider(name: Optional[str] = None, model_name: str = "all-MiniLM-L6-v2") -> EmbeddingProvider:
+    """
+    Provider by name (else EMBEDDING_PROVIDER). Unknown or unconfigured
+    providers fall back to the local HuggingFace model.
+    """
+    name = (name or settings.EMBEDDING_PROVIDER).lower()
+    provider = EMBEDDING_PROVIDERS.get(name)
+    if provider is None:
+        logger.error(f"Unknown embedding provider '{name}'. Falling back to HuggingFace.")
+        provider = HuggingFaceProvider
+    elif not provider.is_available():
+        logger.error(f"Embedding provider '{name}' is not configured. Falling back to HuggingFace.")
+        provider = HuggingFaceProvider
+    return provider(model_name)
@@ -1,95 +1,104 @@
-import pdfplumber
-import io
 import logging
 import datetime
-from typing import List, Dict, Any
+import itertools
+from concurrent.futures import Future
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from app.core.config import settings
+from app.services.html_extractor import HtmlExtractor
+from app.services.ocr import PageOcr, ocr_available, ordered_results
+from app.services.pdf_backends import get_pdf_backend
 
 logger = logging.getLogger(__name__)
 
+def split_paragraphs(page: int, text: Optional[str], kind: str) -> List[Dict[str, Any]]:
+    """Split a page's text into paragraph segments (double newline)."""
+    if not text:
+        return []
+    return [
+        {"page": page, "text": p.strip(), "type": kind}
+        for p in text.split('\n\n')
+        if p.strip()
+    ]
+
 class TextExtractor:
-    def extract_from_pdf(self, content: bytes, progress_callback=None) -> List[Dict[str, Any]]:
+    def iter_pdf_pages(self, content: bytes, progress_callback=None, backend: Optional[str] = None) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
         """
-        Extract text from PDF bytes. Returns a list of segments (paragraphs/pages).
+        Yield (page, segments) for every page as soon as it is extracted, in
+        page order. Pages without a text layer fall back to OCR.
         """
         def log_debug(msg):
             with open("debug_trace.log", "a") as f:
                 f.write(f"[EXTRACTOR] {datetime.datetime.utcnow()} - {msg}\n")
+
+        def report(page_number, total_pages):
+            # Progress log: 
+            # If < 20 pages, log every page.
+            # Else log every 10 pages or 10%.
+            i = page_number - 1
+            should_log = (total_pages < 20) or (i % 10 == 0) or (i == total_pages - 1)
+            if progress_callback and should_log:
+                progress_callback(f"Extracting page {page_number}/{total_pages}...")
         
-        log_debug("Entered extract_from_pdf")
-        segments = []
+        pdf_backend = get_pdf_backend(backend)
+        log_debug(f"Entered iter_pdf_pages (backend: {pdf_backend.name})")
+        # Pages without a text layer are OCRed individually in the process pool;
+        # text pages keep flowing while OCR runs and are re-ordered below
+        ocr = PageOcr(content) if ocr_available() else None
+
+        def pages():
+            try:
+                log_debug(f"Opening PDF content (size: {len(content)})")
+                for page_number, text in pdf_backend.pages(content, progress_callback=report):
+                    page_segments = split_paragraphs(page_number, text, "paragraph")
+                    if page_segments or ocr is None:
+                        yield page_number, page_segments
+                    else:
+                        yield page_number, self._submit_ocr(ocr, page_number)
+            except Exception as e:
+                logger.error(f"Error extracting PDF text with {pdf_backend.name}: {e}")
+
+        try:
+            for page_number, result in ordered_results(
+                pages(), max_pending=2 * settings.OCR_WORKERS, max_buffered=settings.PIPELINE_QUEUE_PAGES
+            ):
+                if isinstance(result, Future):
+                    result = self._ocr_segments(page_number, result)
+                yield page_number, result
+        finally:
+            if ocr is not None:
+                if ocr.recognized or ocr.cache_hits:
+                    logger.info(f"OCR: {ocr.recognized} pages recognized, {ocr.cache_hits} from cache")
+                ocr.close()
+
+    def _submit_ocr(self, ocr: PageOcr, page_number: int) -> Future:
         try:
-            log_debug(f"Opening PDF content (size: {len(content)})")
-            with pdfplumber.open(io.BytesIO(content)) as pdf:
-                total_pages = len(pdf.pages)
-                log_debug(f"PDF Opened. Total pages: {total_pages}")
-                print(f"DEBUG: Extractor started, pages={total_pages}")
-                for i, page in enumerate(pdf.pages):
-                    # Progress log: 
-                    # If < 20 pages, log every page.
-                    # Else log every 10 pages or 10%.
-                    should_log = (total_pages < 20) or (i % 10 == 0) or (i == total_pages - 1)
-                    
-                    if progress_callback and should_log:
-                         print(f"DEBUG: Calling callback for page {i+1}")
-                         progress_callback(f"Extracting page {i+1}/{total_pages}...")
-                    
-                    text = page.extract_text()
-                    text = page.extract_text()
-                    if text:
-                        # Split by paragraphs (double newline)
-                        paragraphs = text.split('\n\n')
-                        for p in paragraphs:
-                            if p.strip():
-                                segments.append({
-                                    "page": i + 1,
-                                    "text": p.strip(),
-                                    "type": "paragraph"
-                                })
+            return ocr.submit(page_number)
         except Exception as e:
-            logger.error(f"Error extracting PDF text: {e}")
-        
-        # Fallback to OCR if no text found and tesseract is available
-        if not segments:
-            segments = self.extract_with_ocr(content)
+            future: Future = Future()
+            future.set_exception(e)
+            return future
 
-        return segments
+    def _ocr_segments(self, page_number: int, future: Future) -> List[Dict[str, Any]]:
+        try:
+            return split_paragraphs(page_number, future.result(), "ocr_paragraph")
+        except Exception as e:
+            logger.error(f"OCR failed on page {page_number}: {e}")
+            return []
 
-    def extract_with_ocr(self, content: bytes) -> List[Dict[str, Any]]:
+    def extract_from_html(self, content: bytes) -> List[Dict[str, Any]]:
         """
-        Extract text using OCR (Tesseract) via pdf2image and pytesseract.
+        Extract text from HTML bytes: boilerplate is removed and headings
+        split the document into sections, reported as pages.
         """
-        segments = []
         try:
-            from pdf2image import convert_from_bytes
-            import pytesseract
-            
-            try:
-                # Check if tesseract is available
-                pytesseract.get_tesseract_version()
-            except pytesseract.TesseractNotFoundError:
-                logger.warning("Tesseract not found. OCR skipped. Please install tesseract-ocr.")
-                return []
-
-            images = convert_from_bytes(content)
-            for i, image in enumerate(images):
-                text = pytesseract.image_to_string(image)
-                if text:
-                    paragraphs = text.split('\n\n')
-                    for p in paragraphs:
-                        if p.strip():
-                            segments.append({
-                                "page": i + 1,
-                                "text": p.strip(),
-                                "type": "ocr_paragraph"
-                            })
-        except ImportError:
-             logger.warning("pdf2image or pytesseract not installed.")
+            return HtmlExtractor().extract(content)
         except Exception as e:
-            logger.error(f"OCR failed: {e}")
-            
-        return segments
+            logger.error(f"Error extracting HTML text: {e}")
+            return []
 
-    def extract_from_html(self, content: bytes) -> List[Dict[str, Any]]:
-        # Placeholder for HTML extraction (BeautifulSoup)
-        # TODO: Implement HTML to PDF conversion or direct extraction
-        return []
+    def iter_html_pages(self, content: bytes) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yield (page, segments) per HTML section (parsing itself is not incremental)."""
+        segments = self.extract_from_html(content)
+        for page_number, page_segments in itertools.groupby(segments, key=lambda seg: seg["page"]):
+            yield page_number, list(page_segments)
@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingBatchError(Exception):
+    """Some batches failed after retries; completed batches are kept in the checkpoint."""
+
+    def __init__(self, message: str, completed: int, total: int):
+        super().__init__(message)
+        self.completed = completed
+        self.total = total
+
+class TokenBucket:
+    """
+    Request-rate limiter shared by all event loops and threads of the process.
+
+    Each request reserves a token up front (the balance may go negative) and
+    then sleeps until its reservation is covered, so concurrent callers are
+    served in arrival order without holding a lock while waiting.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        delay = self._reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+class EmbeddingCheckpoint:
+    """
+    Vectors of completed batches keyed by text hash, so a run that failed
+    part-way resumes without re-embedding what already succeeded. Entries are
+    dropped once the texts are embedded in a successful call (the pipeline
+    then persists them itself). With a directory the checkpoint survives
+    restarts as a JSONL file per model: saves append to it and discards
+    rewrite it with the remaining entries. Both block on file I/O, so async
+    callers run them in a worker thread.
+    """
+
+    def __init__(self, model: str, directory: Optional[str] = settings.EMBEDDING_CHECKPOINT_DIR, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._path = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._path = os.path.join(directory, f"{model.replace('/', '_').replace(':', '_')}.jsonl")
+            self._load()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def _load(self) -> None:
+        if not os.path.exists(self._path):
+            return
+        with open(self._path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write
+                    continue
+                self._remember(entry["key"], np.asarray(entry["vector"], dtype=np.float32))
+        logger.info(f"Loaded {len(self._entries)} checkpointed embeddings from {self._path}")
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._entries.get(key)
+        return vector.tolist() if vector is not None else None
+
+    def save(self, keys: List[str], vectors: List[List[float]]) -> None:
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, np.asarray(vector, dtype=np.float32))
+            if self._path:
+                with open(self._path, "a", encoding="utf-8") as f:
+                    for key, vector in zip(keys, vectors):
+                        f.write(json.dumps({"key": key, "vector": vector}) + "\n")
+
+    def discard(self, keys: List[str]) -> None:
+        with self._lock:
+            removed = [key for key in keys if self._entries.pop(key, None) is not None]
+            if not self._path or not removed:
+                return
+            if not self._entries:
+                if os.path.exists(self._path):
+                    os.remove(self._path)
+                return
+            # Rewrite with what other runs still need, so the file never outgrows
+            # the in-memory entries and a restart does not reload discarded vectors
+            tmp_path = f"{self._path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, vector in self._entries.items():
+                    f.write(json.dumps({"key": key, "vector": vector.tolist()}) + "\n")
+            os.replace(tmp_path, self._path)
+
+def _retryable(error: BaseException) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+_bucket: Optional[TokenBucket] = None
+_checkpoints: Dict[str, EmbeddingCheckpoint] = {}
+_shared_lock = threading.Lock()
+
+def _shared_bucket() -> TokenBucket:
+    # Quotas are per API key, so every client in the process draws from one bucket
+    global _bucket
+    with _shared_lock:
+        if _bucket is None:
+            rate = settings.GOOGLE_EMBED_REQUESTS_PER_MINUTE / 60
+            _bucket = TokenBucket(rate, capacity=max(1.0, float(settings.GOOGLE_EMBED_CONCURRENCY)))
+        return _bucket
+
+def _shared_checkpoint(model: str) -> EmbeddingCheckpoint:
+    with _shared_lock:
+        if model not in _checkpoints:
+            _checkpoints[model] = EmbeddingCheckpoint(model)
+        return _checkpoints[model]
+
+class GoogleEmbeddingClient:
+    """
+    Async client for the Generative Language `batchEmbedContents` endpoint.
+
+    Texts are split into batches of `batch_size`, at most `concurrency`
+    batches are in flight, every request waits for the process-wide token
+    bucket, and each batch is retried with exponential backoff on transport
+    errors, 429 and 5xx. Completed batches go to the checkpoint as they
+    finish, so a failure keeps the progress made so far.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "models/text-embedding-004",
+        base_url: str = settings.GOOGLE_API_BASE_URL,
+        batch_size: int = settings.GOOGLE_EMBED_BATCH_SIZE,
+        concurrency: int = settings.GOOGLE_EMBED_CONCURRENCY,
+        max_attempts: int = settings.GOOGLE_EMBED_MAX_ATTEMPTS,
+        bucket: Optional[TokenBucket] = None,
+        checkpoint: Optional[EmbeddingCheckpoint] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.bucket = bucket or _shared_bucket()
+        self.checkpoint = checkpoint or _shared_checkpoint(model)
+        self.transport = transport
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        keys = [EmbeddingCheckpoint.key(t) for t in texts]
+        results: List[Optional[List[float]]] = [self.checkpoint.get(k) for k in keys]
+        todo = [i for i, vector in enumerate(results) if vector is None]
+        if len(todo) < len(texts):
+            logger.info(f"Resuming from checkpoint: {len(texts) - len(todo)} of {len(texts)} embeddings already done")
+
+        batches = [todo[i:i + self.batch_size] for i in range(0, len(todo), self.batch_size)]
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async with httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"x-goog-api-key": self.api_key},
+            timeout=httpx.Timeout(settings.GOOGLE_EMBED_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            transport=self.transport,
+        ) as client:
+            async def run(batch: List[int]) -> None:
+                async with slots:
+                    vectors = await self._embed_batch(client, [texts[i] for i in batch])
+                for i, vector in zip(batch, vectors):
+                    results[i] = vector
+                await asyncio.to_thread(self.checkpoint.save, [keys[i] for i in batch], vectors)
+
+            outcomes = await asyncio.gather(*(run(b) for b in batches), return_exceptions=True)
+
+        failures = [o for o in outcomes if isinstance(o, BaseException)]
+        if failures:
+            done = sum(vector is not None for vector in results)
+            raise EmbeddingBatchError(
+                f"{len(failures)} of {len(batches)} embedding batches failed ({failures[0]}); "
+                f"{done} of {len(texts)} embeddings checkpointed",
+                completed=done, total=len(texts)
+            )
+        await asyncio.to_thread(self.checkpoint.discard, keys)
+        return results
+
+    async def _embed_batch(self, client: httpx.AsyncClient, texts: List[str]) -> List[List[float]]:
+        payload = {
+            "requests": [
+                {"model": self.model, "content": {"parts": [{"text": t}]}, "taskType": "SEMANTIC_SIMILARITY"}
+                for t in texts
+            ]
+        }
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_exponential_jitter(initial=1, max=30),
+            retry=retry_if_exception(_retryable),
+            reraise=True,
+        ):
+            with attempt:
+                await self.bucket.acquire()
+                response = await client.post(f"/{self.model}:batchEmbedContents", json=payload)
+                response.raise_for_status()
+                embeddings = response.json().get("embeddings", [])
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+        return [e["values"] for e in embeddings]
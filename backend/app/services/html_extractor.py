@@ -0,0 +1,146 @@
+import re
+import logging
+from typing import List, Dict, Any, Optional
+
+from lxml import etree, html
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Never content
+_SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object", "embed",
+    "nav", "header", "footer", "aside", "form", "button", "select", "input", "textarea", "dialog", "head",
+}
+_SKIP_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search", "menu", "menubar", "dialog", "alert"}
+# class/id tokens typical of site chrome rather than document text
+_BOILERPLATE_RE = re.compile(
+    r"(?:^|[\s_-])(?:nav|navbar|menu|breadcrumbs?|sidebar|cookie|cookies|consent|banner|footer|"
+    r"site-header|masthead|share|social|advert|ads|promo|popup|modal|skip-link|toc)(?:$|[\s_-])",
+    re.IGNORECASE,
+)
+
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+# Blocks emitted whole (their descendants are not walked)
+_TEXT_BLOCKS = {"p", "li", "pre", "blockquote", "td", "th", "dt", "dd", "figcaption", "caption", "address", "summary"}
+# Containers whose boundaries end the current run of loose text
+_CONTAINERS = {
+    "html", "body", "main", "article", "section", "div", "ul", "ol", "dl", "table", "thead", "tbody",
+    "tfoot", "figure", "details", "fieldset", "center", "br", "hr",
+}
+_WS_RE = re.compile(r"\s+")
+
+def _clean(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip()
+
+def _is_boilerplate(el) -> bool:
+    if el.get("hidden") is not None or el.get("aria-hidden") == "true":
+        return True
+    if el.get("role") in _SKIP_ROLES:
+        return True
+    marker = f"{el.get('class') or ''} {el.get('id') or ''}"
+    return bool(marker.strip()) and bool(_BOILERPLATE_RE.search(marker))
+
+def _content_root(doc):
+    """<main> / role=main, else the <article> with the most text, else <body>."""
+    for candidate in doc.iter("main"):
+        return candidate
+    for candidate in doc.iterfind(".//*[@role='main']"):
+        return candidate
+    articles = list(doc.iter("article"))
+    if articles:
+        return max(articles, key=lambda a: len(a.text_content()))
+    body = doc.find(".//body")
+    return body if body is not None else doc
+
+class HtmlExtractor:
+    """
+    Extract text segments from an HTML document.
+
+    Site chrome (navigation, headers/footers, cookie banners, scripts, ...) is
+    dropped, the main content region is walked once in document order, and
+    each heading up to `section_level` starts a new section. Sections play the
+    role of pages for the rest of the pipeline (keyword context windows,
+    search rows, content pagination).
+    """
+
+    def __init__(self, section_level: int = settings.HTML_SECTION_HEADING_LEVEL):
+        self.section_level = section_level
+
+    def parse(self, content: bytes):
+        parser = html.HTMLParser(remove_comments=True, remove_pis=True)
+        return html.document_fromstring(content, parser=parser)
+
+    def extract(self, content: bytes) -> List[Dict[str, Any]]:
+        if not isinstance(content, (bytes, str)):
+            content = bytes(content)
+        if not content.strip():
+            return []
+
+        doc = self.parse(content)
+        root = _content_root(doc)
+        skip_tags = _SKIP_TAGS
+        if root.tag != "body" and root is not doc:
+            # Inside <main>/<article>, header/footer hold the document's own title and notes
+            skip_tags = _SKIP_TAGS - {"header", "footer"}
+
+        segments: List[Dict[str, Any]] = []
+        section = 1
+        section_title: Optional[str] = None
+        buffer: List[str] = []
+
+        def emit(text: str, kind: str):
+            text = _clean(text)
+            if text:
+                segment = {"page": section, "text": text, "type": kind}
+                if section_title:
+                    segment["section"] = section_title
+                segments.append(segment)
+
+        def flush():
+            if buffer:
+                emit("".join(buffer), "paragraph")
+                buffer.clear()
+
+        walker = etree.iterwalk(root, events=("start", "end"))
+        for event, el in walker:
+            tag = el.tag if isinstance(el.tag, str) else None
+            if event == "start":
+                if tag is None or tag in skip_tags or _is_boilerplate(el):
+                    walker.skip_subtree()
+                elif tag in _HEADINGS:
+                    flush()
+                    title = _clean(el.text_content())
+                    if title and _HEADINGS[tag] <= self.section_level:
+                        # Content before the first heading keeps section 1
+                        if segments:
+                            section += 1
+                        section_title = title
+                    emit(title, "heading")
+                    walker.skip_subtree()
+                elif tag == "tr":
+                    # One segment per table row
+                    flush()
+                    emit(" | ".join(_clean(cell.text_content()) for cell in el if cell.tag in ("td", "th")), "table_row")
+                    walker.skip_subtree()
+                elif tag in _TEXT_BLOCKS:
+                    flush()
+                    emit(el.text_content(), "paragraph")
+                    walker.skip_subtree()
+                else:
+                    if tag in _CONTAINERS:
+                        # Loose text before a nested block is its own paragraph
+                        flush()
+                    if el.text:
+                        buffer.append(el.text)
+            else:
+                if tag in _CONTAINERS:
+                    flush()
+                # The root's tail lies outside the content region
+                if el.tail and el is not root:
+                    buffer.append(el.tail)
+        flush()
+
+        logger.info(f"HTML extraction: {len(segments)} segments in {section} sections")
+        return segments
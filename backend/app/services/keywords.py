@@ -0,0 +1,103 @@
+import re
+from typing import List, Dict, Any, Optional
+
+SNIPPET_LENGTH = 300
+
+KEYWORD_MODES = ("substring", "word")
+REGEX_PREFIX = "re:"
+
+def keyword_pattern(keyword: str, mode: str = "substring") -> str:
+    """
+    Regex for one configured keyword (always matched case-insensitively):
+
+    - "re:<pattern>": a regular expression
+    - "\"quoted phrase\"": whole words, any whitespace between them
+    - anything else: a substring, or whole words when the document's
+      keyword mode is "word"
+    """
+    if keyword.startswith(REGEX_PREFIX):
+        pattern = keyword[len(REGEX_PREFIX):]
+        if re.compile(pattern, re.IGNORECASE).match(""):
+            raise ValueError(f"Keyword pattern '{pattern}' matches empty text")
+        return pattern
+    quoted = len(keyword) > 2 and keyword[0] == keyword[-1] == '"'
+    if quoted or mode == "word":
+        words = (keyword[1:-1] if quoted else keyword).split()
+        return r"(?<!\w)" + r"\s+".join(re.escape(w) for w in words) + r"(?!\w)"
+    return re.escape(keyword)
+
+class KeywordMatcher:
+    """
+    Multi-keyword matcher compiled into a single regex.
+
+    All keywords are combined into one zero-width alternation, so a segment is
+    scanned once regardless of the number of keywords. Several keywords can
+    match at the same position (a keyword and a longer one starting with it);
+    only one alternative is reported there, so the keywords still missing are
+    re-checked with anchored matches at the positions the scan reports.
+    """
+
+    def __init__(self, keywords: List[str], mode: Optional[str] = None):
+        self.keywords = [kw for kw in dict.fromkeys(keywords or []) if kw and kw.strip()]
+        self.mode = mode or "substring"
+        self._patterns: List[re.Pattern] = []
+        alternatives = []
+        for i, kw in enumerate(self.keywords):
+            pattern = keyword_pattern(kw, self.mode)
+            self._patterns.append(re.compile(pattern, re.IGNORECASE))
+            alternatives.append(f"(?P<_k{i}>{pattern})")
+        self._pattern: Optional[re.Pattern] = None
+        if alternatives:
+            self._pattern = re.compile(f"(?=(?:{'|'.join(alternatives)}))", re.IGNORECASE)
+
+    def __bool__(self) -> bool:
+        return self._pattern is not None
+
+    def match(self, text: str) -> List[int]:
+        """Return the sorted indices (into `self.keywords`) of keywords found in text."""
+        if self._pattern is None or not text:
+            return []
+        found = set()
+        missing = set(range(len(self.keywords)))
+        for m in self._pattern.finditer(text):
+            # The keyword's outer group closes last, so it is reported as lastgroup
+            first = int(m.lastgroup[2:])
+            found.add(first)
+            missing.discard(first)
+            for i in list(missing):
+                if self._patterns[i].match(text, m.start()):
+                    found.add(i)
+                    missing.discard(i)
+            if not missing:
+                break
+        return sorted(found)
+
+    def build_index(self, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the per-version match index stored next to extracted.json.
+        Each entry is [segment_index, page, [keyword indices], snippet].
+        """
+        matches = []
+        for i, seg in enumerate(segments):
+            if seg.get("ignored"):
+                continue
+            hits = self.match(seg.get("normalized_text", seg.get("text", "")))
+            if hits:
+                matches.append([i, seg["page"], hits, make_snippet(seg["text"])])
+        return {"keywords": self.keywords, "mode": self.mode, "matches": matches}
+
+    def is_current(self, index: Dict[str, Any]) -> bool:
+        """Whether a stored match index was built with this keyword configuration."""
+        return index["keywords"] == self.keywords and index.get("mode", "substring") == self.mode
+
+def make_snippet(text: str) -> str:
+    return text[:SNIPPET_LENGTH] + "..." if len(text) > SNIPPET_LENGTH else text
+
+def expand_match_index(index: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Expand a stored match index into the API's one-row-per-keyword format."""
+    keywords = index["keywords"]
+    return [
+        {"page": page, "keyword": keywords[k], "text": snippet}
+        for _, page, hits, snippet in index["matches"]
+        for k in hits
+    ]
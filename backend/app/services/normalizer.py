@@ -1,25 +1,208 @@
 import re
-from typing import List, Dict, Any
+import logging
+from typing import List, Dict, Any, Callable, Iterable, Optional, Union
+from urllib.parse import parse_qsl, urlencode
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Month names (full or abbreviated): initial, rest
+_MONTHS = {
+    "J": r"an(?:uary)?|une?|uly?", "F": r"eb(?:ruary)?", "M": r"ar(?:ch)?|ay", "A": r"pr(?:il)?|ug(?:ust)?",
+    "S": r"ep(?:t(?:ember)?)?", "O": r"ct(?:ober)?", "N": r"ov(?:ember)?", "D": r"ec(?:ember)?",
+}
+# Month names match in any case ("March", "march", "MARCH")
+_MONTH = "(?i:" + "|".join(f"{c}(?:{rest})" for c, rest in _MONTHS.items()) + ")"
+# A month name whose initial has just been consumed
+_MONTH_REST = "(?i:" + "|".join(f"(?<={c})(?:{rest})" for c, rest in _MONTHS.items()) + ")"
+_TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "dclid", "mc_cid", "mc_eid", "_ga", "_gl", "yclid", "igshid"}
+
+def _strip_tracking_params(match: re.Match) -> str:
+    url = match.group(0)
+    base, _, query = url.partition("?")
+    params = [
+        (k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    ]
+    return f"{base}?{urlencode(params)}" if params else base
+
+# \1 or (?(1)...) not escaped: group numbers shift once rules are combined
+_NUMBERED_BACKREF_RE = re.compile(r"(?<!\\)(?:\\\\)*(?:\\[1-9]|\(\?\(\d)")
+
+class NormalizationRule:
+    """
+    A mask applied to segment text before hashing, diffing and embedding.
+
+    `replacement` is either literal text or a callable taking the match.
+    Patterns are combined into one alternation, so they must not use numbered
+    backreferences (named groups are fine).
+
+    `lead` optionally names the characters a match can start with (a
+    character class body such as r"\d"); `pattern` then describes the rest of
+    the match after that first character. When every rule has a lead, the
+    combined pattern starts with a single character class, which lets the
+    regex engine skip straight to candidate positions.
+
+    `requires` optionally gives a cheap pattern every match contains; texts
+    without it are normalized without the rule. Use it for rules whose lead
+    characters are common (e.g. lower-case letters).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        pattern: str,
+        replacement: Union[str, Callable[[re.Match], str]] = "[MASK]",
+        ignore_case: bool = False,
+        lead: Optional[str] = None,
+        requires: Optional[str] = None
+    ):
+        self.name = name
+        self.pattern = pattern
+        self.replacement = replacement
+        self.ignore_case = ignore_case
+        self.lead = lead
+        self.requires = requires
+        # Fail on the rule itself rather than on the combined pattern
+        re.compile(self.regex)
+        if _NUMBERED_BACKREF_RE.search(pattern):
+            raise ValueError(f"Normalization rule '{name}' uses a numbered backreference; use a named group")
+
+    @property
+    def regex(self) -> str:
+        """The rule as a standalone pattern."""
+        body = f"[{self.lead}]{self.pattern}" if self.lead else self.pattern
+        return f"(?i:{body})" if self.ignore_case else body
+
+    def apply(self, match: re.Match) -> str:
+        return self.replacement(match) if callable(self.replacement) else self.replacement
+
+# Word boundaries are checked by lookbehinds after the lead character
+BUILTIN_RULES: Dict[str, NormalizationRule] = {
+    rule.name: rule for rule in (
+        NormalizationRule("iso_date", r"\d{3}-\d{2}-\d{2}", "[DATE]", lead=r"\d"),
+        NormalizationRule("numeric_date", r"(?<=\b\d)\d?[./]\d{1,2}[./](?:\d{4}|\d{2})\b", "[DATE]", lead=r"\d"),
+        NormalizationRule(
+            "long_date", rf"(?<=\b\d)\d?(?:st|nd|rd|th)?\s+{_MONTH}\.?\s+\d{{4}}\b", "[DATE]", lead=r"\d"
+        ),
+        NormalizationRule(
+            "long_date_month_first",
+            rf"(?<=\b\w){_MONTH_REST}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}\b",
+            "[DATE]",
+            lead="".join(_MONTHS) + "".join(_MONTHS).lower(),
+            # Lower-case initials make most letters candidates; only texts with a year need the rule
+            requires=r"\d{4}"
+        ),
+        NormalizationRule("version", r"(?<=\b[vV])(?:ersion|ERSION)?\.?\s?\d+(?:\.\d+){0,3}\b", "[VERSION]", lead="vV"),
+        # A bare letter ("Rev. B", "Rev B") needs a separator, so words like "revs" are left alone
+        NormalizationRule(
+            "revision",
+            r"(?<=\b[rR])(?:ev|EV)(?:ision|ISION)?(?:\.?\s?(?::\s?)?\d+[a-zA-Z]?|(?:\.\s?|\s?:\s?|\s)[A-Za-z])\b",
+            "[REVISION]",
+            lead="rR"
+        ),
+        NormalizationRule("tracking_params", r"ttps?://[^\s<>\"'?#]+\?[^\s<>\"'#]+", _strip_tracking_params, lead="h"),
+    )
+}
+# Names accepted in rule configurations; "long_date" covers both word orders
+RULE_GROUPS: Dict[str, List[str]] = {"long_date": ["long_date", "long_date_month_first"]}
+
+RuleSpec = Union[str, Dict[str, Any], NormalizationRule]
+
+def build_rules(specs: Optional[Iterable[RuleSpec]]) -> List[NormalizationRule]:
+    """
+    Resolve a rule configuration (Document.normalization_rules, else
+    NORMALIZATION_RULES): built-in rule names and/or custom rules given as
+    {"name", "pattern", "replacement", "ignore_case"}.
+    """
+    if specs is None:
+        specs = settings.NORMALIZATION_RULES
+    rules = []
+    for spec in specs:
+        if isinstance(spec, NormalizationRule):
+            rules.append(spec)
+        elif isinstance(spec, str):
+            names = RULE_GROUPS.get(spec, [spec])
+            if any(name not in BUILTIN_RULES for name in names):
+                raise ValueError(f"Unknown normalization rule '{spec}'")
+            rules.extend(BUILTIN_RULES[name] for name in names)
+        else:
+            rules.append(NormalizationRule(
+                spec.get("name") or f"custom_{len(rules)}",
+                spec["pattern"],
+                spec.get("replacement", "[MASK]"),
+                spec.get("ignore_case", False)
+            ))
+    return rules
 
 class TextNormalizer:
+    """
+    Applies all configured rules in a single regex pass per segment: the rules
+    are compiled into one alternation of named groups, and the group that
+    matched selects the replacement. Where rules overlap, the leftmost match
+    wins, then the rule listed first.
+
+    Rules with `requires` are left out of the pass for texts that lack their
+    requirement; one pattern is compiled per combination of requirements met.
+    """
+
+    def __init__(self, rules: Optional[Iterable[RuleSpec]] = None):
+        self.rules = build_rules(rules)
+        self._by_group: Dict[str, NormalizationRule] = {}
+        for i, rule in enumerate(self.rules):
+            self._by_group[f"_r{i}"] = rule
+
+        self._requirements = {
+            requires: re.compile(requires) for requires in dict.fromkeys(r.requires for r in self.rules if r.requires)
+        }
+        self._patterns: Dict[frozenset, Optional[re.Pattern]] = {}
+        self._pattern = self._compile(frozenset(self._requirements))
+
+    def _compile(self, met: frozenset) -> Optional[re.Pattern]:
+        if met not in self._patterns:
+            groups = {g: r for g, r in self._by_group.items() if not r.requires or r.requires in met}
+            if not groups:
+                pattern = None
+            elif all(rule.lead and not rule.ignore_case for rule in groups.values()):
+                # [all leads] then, per rule, its lead re-checked by lookbehind and the rest
+                leads = "".join(dict.fromkeys(rule.lead for rule in groups.values()))
+                alternatives = [f"(?<=[{rule.lead}])(?P<{group}>{rule.pattern})" for group, rule in groups.items()]
+                pattern = re.compile(f"[{leads}](?:{'|'.join(alternatives)})")
+            else:
+                alternatives = [f"(?P<{group}>{rule.regex})" for group, rule in groups.items()]
+                pattern = re.compile("|".join(alternatives))
+            self._patterns[met] = pattern
+        return self._patterns[met]
+
+    def _replace(self, match: re.Match) -> str:
+        # The outer rule group closes last, so it is reported as lastgroup
+        return self._by_group[match.lastgroup].apply(match)
+
+    def normalize_text(self, text: str) -> str:
+        pattern = self._pattern
+        if self._requirements:
+            pattern = self._compile(frozenset(r for r, p in self._requirements.items() if p.search(text)))
+        if pattern is None:
+            return text
+        return pattern.sub(self._replace, text)
+
     def normalize(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Normalize text segments by masking dates, ignoring headers/footers etc.
+        Return normalized copies of the segments (the input is left untouched)
+        with `normalized_text` set; page numbers are flagged as ignored.
         """
         normalized = []
         for seg in segments:
             text = seg["text"]
-            
+            out = dict(seg)
+
             # Simple heuristic: Ignore short lines that look like page numbers
             if len(text) < 5 and text.isdigit():
-                 seg["ignored"] = True
-                 seg["reason"] = "page_number"
-            
-            # Mask dates (YYYY-MM-DD)
-            text = re.sub(r'\d{4}-\d{2}-\d{2}', '[DATE]', text)
-            
-            # Update text
-            seg["normalized_text"] = text
-            normalized.append(seg)
-            
+                out["ignored"] = True
+                out["reason"] = "page_number"
+
+            out["normalized_text"] = self.normalize_text(text)
+            normalized.append(out)
+
         return normalized
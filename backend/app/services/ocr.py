@@ -0,0 +1,226 @@
+import os
+import mmap
+import multiprocessing
+import hashlib
+import logging
+import functools
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from typing import Any, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+from app.core.config import settings
+from app.services.pdf_backends import PDFIUM_LOCK, _MmapReader
+
+logger = logging.getLogger(__name__)
+
+def _run_tesseract(mode: str, size: Tuple[int, int], pixels: bytes, language: str) -> str:
+    """Process-pool worker: OCR one page image."""
+    import pytesseract
+    from PIL import Image
+
+    return pytesseract.image_to_string(Image.frombytes(mode, size, pixels), lang=language)
+
+@functools.lru_cache(maxsize=1)
+def ocr_available() -> bool:
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except ImportError:
+        logger.warning("pytesseract not installed. OCR skipped.")
+    except Exception:
+        logger.warning("Tesseract not found. OCR skipped. Please install tesseract-ocr.")
+    return False
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    # One pool per process, shared by all pipeline runs. Workers are spawned
+    # rather than forked: the API process runs threads (event loop, executor)
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.OCR_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+class OcrCache:
+    """
+    Page-image hash -> OCR text. In-memory LRU, optionally backed by a
+    directory (OCR_CACHE_DIR) so scheduled re-runs of scanned documents skip
+    Tesseract across restarts.
+    """
+
+    def __init__(self, max_entries: int = settings.OCR_CACHE_SIZE, directory: Optional[str] = settings.OCR_CACHE_DIR):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.directory:
+            path = os.path.join(self.directory, f"{key}.txt")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    text = f.read()
+                self._remember(key, text)
+                return text
+        return None
+
+    def set(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        if self.directory:
+            path = os.path.join(self.directory, f"{key}.txt")
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(f"{path}.tmp", path)
+
+    def _remember(self, key: str, text: str) -> None:
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+_cache = OcrCache()
+
+class PageRasterizer:
+    """
+    Renders single PDF pages on demand (never the whole document at once).
+    Uses PDFium when installed, else poppler via pdf2image one page at a time.
+    """
+
+    def __init__(self, content, dpi: int = settings.OCR_DPI):
+        self.content = content
+        self.dpi = dpi
+        self._pdf = None
+
+    def _open(self):
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            return None
+        if self._pdf is None:
+            source = _MmapReader(self.content) if isinstance(self.content, mmap.mmap) else bytes(self.content)
+            with PDFIUM_LOCK:
+                self._pdf = pdfium.PdfDocument(source)
+        return self._pdf
+
+    def page_count(self) -> int:
+        pdf = self._open()
+        if pdf is None:
+            from pdf2image import pdfinfo_from_bytes
+            return pdfinfo_from_bytes(bytes(self.content))["Pages"]
+        with PDFIUM_LOCK:
+            return len(pdf)
+
+    def render(self, page_number: int):
+        pdf = self._open()
+        if pdf is None:
+            from pdf2image import convert_from_bytes
+            return convert_from_bytes(
+                bytes(self.content), dpi=self.dpi, first_page=page_number, last_page=page_number, grayscale=True
+            )[0]
+
+        with PDFIUM_LOCK:
+            page = pdf[page_number - 1]
+            try:
+                bitmap = page.render(scale=self.dpi / 72, grayscale=True)
+                try:
+                    # Copy out of PDFium's buffer so the bitmap is freed under the lock
+                    return bitmap.to_pil().copy()
+                finally:
+                    bitmap.close()
+            finally:
+                page.close()
+
+    def close(self) -> None:
+        if self._pdf is not None:
+            with PDFIUM_LOCK:
+                self._pdf.close()
+            self._pdf = None
+
+class PageOcr:
+    """
+    OCR for pages without a text layer, run in a process pool.
+
+    `submit` rasterizes the page in the calling thread and returns a future
+    for its text; identical page images (by pixel hash) are recognized once.
+    """
+
+    def __init__(self, content, dpi: int = settings.OCR_DPI, language: str = settings.OCR_LANGUAGE):
+        self.language = language
+        self.rasterizer = PageRasterizer(content, dpi)
+        self.cache_hits = 0
+        self.recognized = 0
+        # Repeated images within the document (blank or boilerplate scans) share one recognition
+        self._in_flight: Dict[str, Future] = {}
+
+    def submit(self, page_number: int) -> Future:
+        image = self.rasterizer.render(page_number)
+        if image.mode != "L":
+            image = image.convert("L")
+        pixels = image.tobytes()
+        key = hashlib.sha256(
+            f"{self.language}:{image.mode}:{image.size[0]}x{image.size[1]}:".encode() + pixels
+        ).hexdigest()
+
+        cached = _cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            future: Future = Future()
+            future.set_result(cached)
+            return future
+        if key in self._in_flight:
+            self.cache_hits += 1
+            return self._in_flight[key]
+
+        self.recognized += 1
+        future = _get_pool().submit(_run_tesseract, image.mode, image.size, pixels, self.language)
+        future.add_done_callback(lambda f: f.exception() is None and _cache.set(key, f.result()))
+        self._in_flight[key] = future
+        return future
+
+    def close(self) -> None:
+        self.rasterizer.close()
+
+def ordered_results(items: Iterable[Tuple[int, Any]], max_pending: int, max_buffered: Optional[int] = None) -> Iterator[Tuple[int, Any]]:
+    """
+    Re-order (page, value) pairs where some values are Futures: entries are
+    yielded in input order, futures only once done, and at most `max_pending`
+    futures are outstanding (beyond that, the oldest one is waited for).
+    `max_buffered` also caps all held entries, so pages that are ready do not
+    pile up behind one slow recognition.
+    """
+    max_buffered = max(max_buffered or 0, max_pending + 1)
+    pending: Deque[Tuple[int, Any]] = deque()
+    outstanding = 0
+
+    def release():
+        nonlocal outstanding
+        page, value = pending.popleft()
+        if isinstance(value, Future):
+            wait([value])
+            outstanding -= 1
+        return page, value
+
+    for page, value in items:
+        pending.append((page, value))
+        if isinstance(value, Future):
+            outstanding += 1
+        while pending and (
+            not isinstance(pending[0][1], Future) or pending[0][1].done()
+            or outstanding > max_pending or len(pending) > max_buffered
+        ):
+            yield release()
+    while pending:
+        yield release()
@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import concurrent.futures
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+async def iterate_in_thread(factory: Callable[[], Iterator[Any]], maxsize: int = 8) -> AsyncIterator[Any]:
+    """
+    Run a blocking generator in a worker thread and consume it from the event
+    loop. At most `maxsize` items are buffered: the producer blocks when the
+    consumer falls behind, which bounds memory for long documents.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(item) -> None:
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=0.5)
+                return
+            except concurrent.futures.TimeoutError:
+                # Poll so an abandoned consumer cannot leave the worker blocked forever
+                if stopped.is_set():
+                    future.cancel()
+                    return
+
+    def produce() -> None:
+        try:
+            for item in factory():
+                if stopped.is_set():
+                    return
+                put(item)
+            put(_DONE)
+        except BaseException as e:
+            put(_Failure(e))
+
+    worker = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        await worker
+
+class RelevanceWindow:
+    """
+    Decides page relevance for keyword filtering while pages stream in.
+
+    A page is relevant when a page within `radius` pages of it has a keyword
+    match, so it can be released once `radius` further pages have been seen.
+    Matches are kept in a boolean array indexed by page number; a page's
+    relevance is an `any` over its window slice, and the full relevance mask
+    is the match mask convolved with a (2 * radius + 1)-wide window.
+    With `radius=None` (no keywords) every page is relevant and released at once.
+    """
+
+    def __init__(self, radius: Optional[int]):
+        self.radius = radius
+        self._matched = np.zeros(64, dtype=bool)
+        self._last_page = 0
+        self._pending: Deque[Tuple[int, Any]] = deque()
+
+    def push(self, page: int, item: Any, matched: bool) -> List[Tuple[int, Any, bool]]:
+        """Add a page; returns the (page, item, relevant) entries that are now decided."""
+        if self.radius is None:
+            return [(page, item, True)]
+        if page >= len(self._matched):
+            self._matched = np.concatenate([self._matched, np.zeros(max(page + 1, len(self._matched)), dtype=bool)])
+        self._matched[page] |= matched
+        self._last_page = max(self._last_page, page)
+        self._pending.append((page, item))
+        released = []
+        while self._pending and self._pending[0][0] <= page - self.radius:
+            released.append(self._release())
+        return released
+
+    def flush(self) -> List[Tuple[int, Any, bool]]:
+        released = []
+        while self._pending:
+            released.append(self._release())
+        return released
+
+    def _release(self) -> Tuple[int, Any, bool]:
+        page, item = self._pending.popleft()
+        window = self._matched[max(page - self.radius, 0):page + self.radius + 1]
+        return page, item, bool(window.any())
+
+    @property
+    def matched_pages(self) -> List[int]:
+        return np.flatnonzero(self._matched[:self._last_page + 1]).tolist()
+
+    @property
+    def relevant_pages(self) -> List[int]:
+        """Pages (among those seen) within `radius` of a match."""
+        if self.radius is None:
+            return list(range(1, self._last_page + 1))
+        matched = self._matched[:self._last_page + 1].astype(np.int32)
+        counts = np.convolve(matched, np.ones(2 * self.radius + 1, dtype=np.int32))
+        # Centre the full convolution on the pages; index 0 is not a page
+        mask = counts[self.radius:self.radius + len(matched)] > 0
+        return (np.flatnonzero(mask[1:]) + 1).tolist()
+
+class EmbeddingBatcher:
+    """
+    Embeds segments in fixed-size batches while extraction continues.
+
+    Segments are keyed by their exact-duplicate text hash: a hash is embedded
+    at most once per document, and vectors already stored for it (looked up
+    per batch via `lookup`) are reused. `embed` is either a coroutine function
+    or blocking (run in the default executor); at most `max_in_flight`
+    batches run at once.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], Union[List[List[float]], Awaitable[List[List[float]]]]],
+        lookup: Callable[[List[str]], Awaitable[Dict[str, List[float]]]],
+        batch_size: int = 64,
+        max_in_flight: int = 2
+    ):
+        self.embed = embed
+        self.lookup = lookup
+        self.batch_size = batch_size
+        self.segment_ids: List[int] = []
+        self.text_hashes: List[str] = []
+        self.vectors: Dict[str, List[float]] = {}
+        self.embedded = 0
+        self.reused = 0
+        self.carried = 0
+        self.failed = False
+        self._batch: Dict[str, str] = {}
+        self._seen: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def add(self, segment_id: int, text_hash: str, text: str) -> None:
+        self.segment_ids.append(segment_id)
+        self.text_hashes.append(text_hash)
+        if text_hash in self._seen:
+            return
+        self._seen.add(text_hash)
+        self._batch[text_hash] = text
+        if len(self._batch) >= self.batch_size:
+            await self._dispatch()
+
+    def add_known(self, segment_id: int, text_hash: str, vector: List[float]) -> None:
+        """Add a segment whose vector is already known (carried over from the previous version)."""
+        self.segment_ids.append(segment_id)
+        self.text_hashes.append(text_hash)
+        self.carried += 1
+        self.vectors.setdefault(text_hash, vector)
+        self._seen.add(text_hash)
+        # An earlier copy of the text waiting in the open batch no longer needs embedding
+        self._batch.pop(text_hash, None)
+
+    async def _dispatch(self) -> None:
+        batch, self._batch = self._batch, {}
+        # Lookups run here, not in the background task, so the caller's DB session is never shared
+        known = await self.lookup(list(batch))
+        self.vectors.update(known)
+        self.reused += len(known)
+        pending = {h: t for h, t in batch.items() if h not in known}
+        if not pending:
+            return
+        await self._slots.acquire()
+        self._tasks.append(asyncio.create_task(self._embed(pending)))
+
+    async def _embed(self, pending: Dict[str, str]) -> None:
+        try:
+            if asyncio.iscoroutinefunction(self.embed):
+                vectors = await self.embed(list(pending.values()))
+            else:
+                loop = asyncio.get_running_loop()
+                vectors = await loop.run_in_executor(None, self.embed, list(pending.values()))
+            if len(vectors) == len(pending):
+                self.vectors.update(zip(pending.keys(), vectors))
+                self.embedded += len(pending)
+            else:
+                self.failed = True
+        except Exception as e:
+            logger.error(f"Embedding batch failed: {e}")
+            self.failed = True
+        finally:
+            self._slots.release()
+
+    async def finish(self) -> Optional[List[List[float]]]:
+        """
+        Wait for outstanding batches. Returns one vector per added segment (in
+        order), or None if any batch failed.
+        """
+        if self._batch:
+            await self._dispatch()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        if self.failed or any(h not in self.vectors for h in self.text_hashes):
+            return None
+        return [self.vectors[h] for h in self.text_hashes]
@@ -0,0 +1,172 @@
+import io
+import mmap
+import logging
+import threading
+from typing import Dict, Iterator, Optional, Tuple, Type
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# PDFium is not thread-safe and pypdfium2 does not serialize calls, while
+# concurrent pipeline runs extract from their own threads: every PDFium call
+# in the process (text extraction, OCR rasterizing) holds this lock
+PDFIUM_LOCK = threading.RLock()
+
+class _MmapReader(io.RawIOBase):
+    """Seekable read-only stream over an mmap (for libraries that do not accept mmap directly)."""
+
+    def __init__(self, data: mmap.mmap):
+        super().__init__()
+        self._view = memoryview(data)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+class PdfBackend:
+    """
+    Text extraction backend for PDFs. `pages` yields (page_number, text) in
+    order, and reports progress through `progress_callback(page_number, total)`.
+    """
+
+    name: str = ""
+
+    @classmethod
+    def is_available(cls) -> bool:
+        raise NotImplementedError
+
+    def pages(self, content, progress_callback=None) -> Iterator[Tuple[int, str]]:
+        raise NotImplementedError
+
+class PdfplumberBackend(PdfBackend):
+    """Layout-aware (character clustering) extraction: slowest, best for columns and tables."""
+
+    name = "pdfplumber"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import pdfplumber  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def pages(self, content, progress_callback=None) -> Iterator[Tuple[int, str]]:
+        import pdfplumber
+
+        if isinstance(content, mmap.mmap):
+            # A memory-mapped file is already seekable; wrapping it in BytesIO would copy it
+            content.seek(0)
+            source = content
+        else:
+            source = io.BytesIO(content)
+        with pdfplumber.open(source) as pdf:
+            total = len(pdf.pages)
+            for i, page in enumerate(pdf.pages):
+                if progress_callback:
+                    progress_callback(i + 1, total)
+                yield i + 1, page.extract_text() or ""
+                # Release parsed page objects as we go; large PDFs otherwise keep every page cached
+                page.flush_cache()
+
+class PdfiumBackend(PdfBackend):
+    """PDFium text layer (Chrome's PDF engine): an order of magnitude faster than pdfplumber."""
+
+    name = "pypdfium2"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import pypdfium2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def pages(self, content, progress_callback=None) -> Iterator[Tuple[int, str]]:
+        import pypdfium2 as pdfium
+
+        source = _MmapReader(content) if isinstance(content, mmap.mmap) else bytes(content)
+        # Locked per page, never across a yield, so concurrent runs interleave
+        with PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(source)
+            total = len(pdf)
+        try:
+            for i in range(total):
+                if progress_callback:
+                    progress_callback(i + 1, total)
+                with PDFIUM_LOCK:
+                    page = pdf[i]
+                    textpage = page.get_textpage()
+                    try:
+                        text = textpage.get_text_range()
+                    finally:
+                        textpage.close()
+                        page.close()
+                yield i + 1, text.replace("\r\n", "\n")
+        finally:
+            with PDFIUM_LOCK:
+                pdf.close()
+
+class PymupdfBackend(PdfBackend):
+    """MuPDF text extraction (PyMuPDF); AGPL-licensed, install separately."""
+
+    name = "pymupdf"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import fitz  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def pages(self, content, progress_callback=None) -> Iterator[Tuple[int, str]]:
+        import fitz
+
+        with fitz.open(stream=bytes(content), filetype="pdf") as pdf:
+            total = pdf.page_count
+            for i, page in enumerate(pdf):
+                if progress_callback:
+                    progress_callback(i + 1, total)
+                yield i + 1, page.get_text("text")
+
+PDF_BACKENDS: Dict[str, Type[PdfBackend]] = {
+    backend.name: backend for backend in (PdfiumBackend, PymupdfBackend, PdfplumberBackend)
+}
+
+def get_pdf_backend(name: Optional[str] = None) -> PdfBackend:
+    """
+    Backend by name (per-document override, else PDF_EXTRACTOR). Unknown or
+    uninstalled backends fall back to pdfplumber.
+    """
+    name = name or settings.PDF_EXTRACTOR
+    backend = PDF_BACKENDS.get(name)
+    if backend is None:
+        logger.warning(f"Unknown PDF extractor '{name}', using pdfplumber")
+        backend = PdfplumberBackend
+    elif not backend.is_available():
+        logger.warning(f"PDF extractor '{name}' is not installed, using pdfplumber")
+        backend = PdfplumberBackend
+    return backend()
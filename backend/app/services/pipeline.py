@@ -4,28 +4,55 @@ import logging
 import asyncio
 import functools
 import copy
+import hashlib
+import mmap
+from bisect import bisect_left
+from contextlib import aclosing
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import AsyncSessionLocal
-from sqlalchemy import select, desc
+from app.core.config import settings
+from sqlalchemy import select, update, case
 
 from app.db.models import Document, Version, Execution
 from app.services.downloader import DocumentDownloader
 from app.services.extractor import TextExtractor
 from app.services.normalizer import TextNormalizer
+from app.services.boilerplate import BoilerplateDetector
 from app.services.analysis import AnalysisEngine
-from app.services.storage import StorageService
+from app.services.storage import StorageService, source_key
+from app.services.segments import SegmentSpool, page_fingerprint
+from app.services.keywords import KeywordMatcher, make_snippet
+from app.services.page_stream import iterate_in_thread, RelevanceWindow, EmbeddingBatcher
+from app.services.search import SearchService
+from app.services.sketch import MinHasher, DuplicateService, exact_text_hash
 
 logger = logging.getLogger(__name__)
 
+async def _spooled(spool: SegmentSpool):
+    for chunk in spool.chunks():
+        yield chunk
+
+def _page_groups(spool: SegmentSpool, pages_per_group: int):
+    """(first segment id, segments) for consecutive groups of spooled pages."""
+    first, segments, count = 0, [], 0
+    for _, page_first, page_segments in spool.pages():
+        if count == pages_per_group:
+            yield first, segments
+            first, segments, count = page_first, [], 0
+        segments.extend(page_segments)
+        count += 1
+    if segments:
+        yield first, segments
+
 class PipelineService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.storage = StorageService()
         self.downloader = DocumentDownloader(self.storage)
         self.extractor = TextExtractor()
-        self.normalizer = TextNormalizer()
         self.analysis = AnalysisEngine()
+        self.min_hasher = MinHasher()
         self._lock = asyncio.Lock()
 
 
@@ -46,6 +73,7 @@ class PipelineService:
                 
                 if execution:
                     logger.info(f"Updating step {step_name} -> {status} (Details: {details})")
+                    execution.heartbeat_at = datetime.utcnow()
                     
                     # Append to main logs if requested
                     if log_msg:
@@ -91,6 +119,40 @@ class PipelineService:
                     execution.steps = list(current_steps) 
                     await status_session.commit()
 
+    @staticmethod
+    def _apply_late_flags(spool: SegmentSpool, boilerplate: BoilerplateDetector) -> SegmentSpool:
+        """Rewrite the spool with the boilerplate flags raised after its pages were written."""
+        flagged = SegmentSpool()
+        spool.finish()
+        for _, first, segments in spool.pages():
+            for i, seg in enumerate(segments, first):
+                reason = boilerplate.late_flags.get(i)
+                if reason:
+                    boilerplate.mark(seg, reason)
+            flagged.write_page(segments)
+        spool.close()
+        return flagged
+
+    async def _previous_page_vectors(self, prev_version: Version):
+        """
+        The previous version's embeddings and, per page fingerprint, the vectors
+        of that page's embedded segments (pages embedded by the current model only).
+        """
+        fingerprints = prev_version.page_fingerprints
+        if not fingerprints or fingerprints.get("model") != self.analysis.model_id or not prev_version.embeddings_path:
+            return None, {}
+        try:
+            content = await self.storage.download(prev_version.embeddings_path)
+            prev_embeddings = json.loads(content) if content else []
+        except Exception as e:
+            logger.warning(f"Previous embeddings unavailable, embedding all pages: {e}")
+            return None, {}
+        pages = {}
+        for _, fingerprint, first_vector, vector_count in fingerprints["pages"]:
+            if vector_count and first_vector + vector_count <= len(prev_embeddings):
+                pages.setdefault(fingerprint, prev_embeddings[first_vector:first_vector + vector_count])
+        return prev_embeddings, pages
+
     async def process_document(self, document_id: uuid.UUID, execution_id: uuid.UUID = None):
         logger.info(f"Processing document {document_id}")
         
@@ -108,139 +170,212 @@ class PipelineService:
 
         # 1. Download
         if execution_id: await self._update_step(execution_id, "Download", "running")
+
+        # Uploaded (internal://) objects are immutable: if storage metadata says the
+        # source is the one the latest version was built from, skip the whole run
+        source_info = await self.downloader.probe(doc.url)
+        source_digest = source_key(source_info) if source_info else None
+        if source_digest and doc.latest_version_id and source_digest == doc.last_source_digest:
+            logger.info(f"Source of document {document_id} unchanged ({source_digest}), skipping")
+            async with AsyncSessionLocal() as summary_session:
+                await summary_session.execute(
+                    update(Document).where(Document.id == document_id).values(last_checked_at=datetime.utcnow())
+                )
+                await summary_session.commit()
+            if execution_id: await self._update_step(execution_id, "Download", "completed", "Source unchanged since the latest version, skipped")
+            return
         
         logger.info(f"Starting download for {doc.url}")
-        content, content_type = await self.downloader.download(doc.url)
+        content, content_type = await self.downloader.download(doc.url, source_info)
         if not content:
             err = f"Failed to download {doc.url}"
             logger.error(err)
             if execution_id: await self._update_step(execution_id, "Download", "failed", err)
             return
 
+        if not source_digest:
+            source_digest = hashlib.sha256(content).hexdigest()
+
         if execution_id: await self._update_step(execution_id, "Download", "completed", f"Size: {len(content)} bytes")
 
-        # 2. Extract
+        # 2-4. Extract -> Normalize -> Filter -> Embed, streamed page by page.
+        # Pages are extracted in a worker thread while earlier pages are being
+        # normalized, matched and embedded; only a few pages are buffered.
         if execution_id: await self._update_step(execution_id, "Extraction", "running")
+        # Filtering runs page by page alongside extraction
+        if execution_id: await self._update_step(execution_id, "Filtering", "running")
         logger.info(f"Starting extraction for content type {content_type}, size: {len(content)} bytes")
         
         loop = asyncio.get_running_loop()
-        
+
+        if "pdf" in content_type:
+            def progress_bridge(msg):
+                # Bridge to async loop
+                with open("debug_trace.log", "a") as f:
+                    f.write(f"[BRIDGE] {msg}\n")
+                
+                if execution_id:
+                    future = asyncio.run_coroutine_threadsafe(
+                         self._update_step(execution_id, "Extraction", "running", msg, log_msg=msg),
+                         loop
+                    )
+                    def log_error(f):
+                        try:
+                            f.result()
+                            with open("debug_trace.log", "a") as log: log.write("[BRIDGE] Update Success\n")
+                        except Exception as e:
+                            with open("debug_trace.log", "a") as log: log.write(f"[BRIDGE] Update FAILED: {e}\n")
+                    future.add_done_callback(log_error)
+
+            pages = functools.partial(
+                self.extractor.iter_pdf_pages, content,
+                progress_callback=progress_bridge,
+                backend=doc.pdf_extractor
+            )
+        else:
+            pages = functools.partial(self.extractor.iter_html_pages, content)
+
+        normalizer = TextNormalizer(doc.normalization_rules)
+        # Segments of pages not yet released; released pages go to the spool
+        # (the future extracted.json) so memory does not grow with the document
+        held_segments = {}
+        next_segment_id = 0
+        spool = SegmentSpool()
+        match_rows = []
+        matcher = KeywordMatcher(doc.keywords, doc.keyword_mode)
+        if matcher:
+            logger.info(f"Filtering with keywords: {doc.keywords}")
+        # Context pages around a match; no keywords means every page is relevant
+        context_pages = settings.KEYWORD_CONTEXT_PAGES if doc.context_pages is None else doc.context_pages
+        window = RelevanceWindow(context_pages if matcher else None)
+        # HTML pages are heading sections: no running headers, and numbered headings must stay
+        boilerplate = BoilerplateDetector(held_segments, enabled="pdf" in content_type)
+        duplicates = DuplicateService(self.session)
+        batcher = EmbeddingBatcher(
+            self.analysis.compute_embeddings_async,
+            lambda hashes: duplicates.find_embeddings(hashes, self.analysis.model_id),
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_in_flight=self.analysis.embed_concurrency
+        )
+
+        # Incremental embedding: pages whose fingerprint matches a page of the
+        # previous version reuse its vectors instead of being embedded again
+        prev_version = await self.session.get(Version, doc.latest_version_id) if doc.latest_version_id else None
+        prev_embeddings, previous_pages = None, {}
+        if settings.EMBEDDING_INCREMENTAL and prev_version:
+            prev_embeddings, previous_pages = await self._previous_page_vectors(prev_version)
+        page_fingerprints = []
+
+        async def release(decided):
+            for page, segment_ids, relevant in decided:
+                page_segments = [held_segments.pop(i) for i in segment_ids]
+                fingerprint = page_fingerprint(page_segments)
+                first_vector = len(batcher.segment_ids)
+                if relevant:
+                    kept = [(i, seg) for i, seg in zip(segment_ids, page_segments) if not seg.get("ignored")]
+                    carried = previous_pages.get(fingerprint)
+                    if carried is not None and len(carried) == len(kept):
+                        for (i, seg), vector in zip(kept, carried):
+                            batcher.add_known(i, exact_text_hash(seg["normalized_text"]), vector)
+                    else:
+                        for i, seg in kept:
+                            await batcher.add(i, exact_text_hash(seg["normalized_text"]), seg["normalized_text"])
+                page_fingerprints.append([page, fingerprint, first_vector, len(batcher.segment_ids) - first_vector])
+                spool.write_page(page_segments)
+
+        async def admit(decided):
+            # Pages whose boilerplate is decided: keyword matching, then the relevance window
+            for page, segment_ids in decided:
+                page_matched = False
+                if matcher:
+                    # Single pass per segment; rows form the version's match index
+                    for i in segment_ids:
+                        seg = held_segments[i]
+                        if seg.get("ignored"):
+                            # A keyword in a running header would make every page relevant
+                            continue
+                        hits = matcher.match(seg.get("normalized_text", seg["text"]))
+                        if hits:
+                            match_rows.append([i, page, hits, make_snippet(seg["text"])])
+                            page_matched = True
+                await release(window.push(page, segment_ids, page_matched))
+
         try:
-            if "pdf" in content_type:
-                def progress_bridge(msg):
-                    # Bridge to async loop
-                    with open("debug_trace.log", "a") as f:
-                        f.write(f"[BRIDGE] {msg}\n")
-                    
-                    if execution_id:
-                        future = asyncio.run_coroutine_threadsafe(
-                             self._update_step(execution_id, "Extraction", "running", msg, log_msg=msg),
-                             loop
-                        )
-                        def log_error(f):
-                            try:
-                                f.result()
-                                with open("debug_trace.log", "a") as log: log.write("[BRIDGE] Update Success\n")
-                            except Exception as e:
-                                with open("debug_trace.log", "a") as log: log.write(f"[BRIDGE] Update FAILED: {e}\n")
-                        future.add_done_callback(log_error)
-
-                # Offload heavy PDF extraction
-                segments = await loop.run_in_executor(
-                    None, 
-                    functools.partial(self.extractor.extract_from_pdf, progress_callback=progress_bridge), 
-                    content
-                )
-            else:
-                segments = self.extractor.extract_from_html(content)
+            async with aclosing(iterate_in_thread(pages, settings.PIPELINE_QUEUE_PAGES)) as stream:
+                async for page, page_segments in stream:
+                    first = next_segment_id
+                    for seg in normalizer.normalize(page_segments):
+                        held_segments[next_segment_id] = seg
+                        next_segment_id += 1
+                    await admit(boilerplate.push(page, range(first, next_segment_id)))
+            await admit(boilerplate.flush())
+            await release(window.flush())
         except Exception as e:
             logger.error(f"Extraction failed: {e}")
             if execution_id: await self._update_step(execution_id, "Extraction", "failed", str(e))
+            spool.close()
             raise e
-            
-        logger.info(f"Extraction complete. Found {len(segments)} segments.")
-        if execution_id: await self._update_step(execution_id, "Extraction", "completed", f"Segments: {len(segments)}")
-            
-        # 3. Normalize
-        normalized_segments = self.normalizer.normalize(segments)
-        
-        # 4. Storage (Raw & Extracted)
+        finally:
+            if isinstance(content, mmap.mmap):
+                content.close()
+
+        if boilerplate.late_flags:
+            # Headers first recognized after their earliest pages were written out
+            spool = self._apply_late_flags(spool, boilerplate)
+        segment_index = spool.finish()
+
+        logger.info(f"Extraction complete. Found {spool.total_segments} segments, {boilerplate.flagged} repeated headers/footers ignored.")
+        if execution_id: await self._update_step(execution_id, "Extraction", "completed", f"Segments: {spool.total_segments}, repeated headers/footers: {boilerplate.flagged}")
+
+        # Storage (Raw & Extracted)
         if execution_id: await self._update_step(execution_id, "Storage", "running")
         timestamp = datetime.utcnow().strftime("%Y-%m-%d_%H%M%S")
         base_path = f"{doc.application_name}/{doc.name}/{timestamp}"
         
-        await self.storage.upload(f"{base_path}/original.pdf", content, content_type) # Assuming PDF
+        if doc.url.startswith("internal://"):
+            # The upload itself is immutable; reference it instead of storing another copy
+            original_path = doc.url.replace("internal://", "")
+        else:
+            original_path = f"{base_path}/original.pdf"
+            await self.storage.upload(original_path, content, content_type) # Assuming PDF
         
-        extracted_json = json.dumps(normalized_segments)
-        await self.storage.upload(f"{base_path}/extracted.json", extracted_json.encode(), "application/json")
+        await self.storage.upload_stream(f"{base_path}/extracted.json", _spooled(spool), "application/json")
+        await self.storage.upload(f"{base_path}/segment_index.json", segment_index.to_json(), "application/json")
         if execution_id: await self._update_step(execution_id, "Storage", "completed", f"Path: {base_path}")
 
         # 5. Analysis & Versioning
         logger.info("Starting analysis...")
         
-        # Get previous version
-        stmt = select(Version).where(Version.document_id == document_id).order_by(desc(Version.timestamp)).limit(1)
-        result = await self.session.execute(stmt)
-        prev_version = result.scalar_one_or_none()
-        
-        # KEYWORD FILTERING LOGIC
-        if execution_id: await self._update_step(execution_id, "Filtering", "running")
-        
-        relevant_pages = set()
-        matched_pages = set()
-        
-        if doc.keywords and len(doc.keywords) > 0:
-            logger.info(f"Filtering with keywords: {doc.keywords}")
-            
-            # 1. Find matches
-            for seg in normalized_segments:
-                text_lower = seg["normalized_text"].lower()
-                for kw in doc.keywords:
-                    if kw.lower() in text_lower:
-                        matched_pages.add(seg["page"])
-                        break
-            
-            # 2. Expand Context (+/- 2 pages)
-            for p in matched_pages:
-                for offset in range(-2, 3): # -2, -1, 0, 1, 2
-                    relevant_pages.add(p + offset)
-                    
-            logger.info(f"Relevant pages: {relevant_pages}")
-            if execution_id: await self._update_step(execution_id, "Filtering", "completed", f"Keywords: {doc.keywords}, Matches: {len(matched_pages)}, Context Pages: {len(relevant_pages)}")
+        # KEYWORD FILTERING (matched while streaming)
+        matches_path = None
+        if matcher:
+            matches_path = f"{base_path}/matches.json"
+            match_index = {"keywords": matcher.keywords, "mode": matcher.mode, "matches": match_rows}
+            await self.storage.upload(matches_path, json.dumps(match_index).encode(), "application/json")
+            logger.info(f"Relevant pages: {window.relevant_pages}")
+            if execution_id: await self._update_step(execution_id, "Filtering", "completed", f"Keywords: {doc.keywords}, Matches: {len(window.matched_pages)}, Context Pages: {len(window.relevant_pages)}")
         else:
-            # If no keywords, ALL pages are relevant
-            relevant_pages = None 
             if execution_id: await self._update_step(execution_id, "Filtering", "completed", "No keywords, processing all.")
-            
-        # Compute Embeddings (ONLY for relevant segments)
+
+        # Embeddings (ONLY for relevant segments), batched while streaming
         if execution_id: await self._update_step(execution_id, "Embedding", "running")
-        
-        texts_to_embed = []
-        for s in normalized_segments:
-            if s.get("ignored"):
-                continue
-            
-            # Check relevance
-            if relevant_pages is not None:
-                if s["page"] not in relevant_pages:
-                    continue
-            
-            texts_to_embed.append(s["normalized_text"])
-
-        logger.info(f"Embedding {len(texts_to_embed)} segments out of {len(normalized_segments)}")
-        
-        if texts_to_embed:
-             # Offload heavy embedding computation
-             embeddings = await loop.run_in_executor(
-                 None,
-                 self.analysis.compute_embeddings,
-                 texts_to_embed
-             )
-        else:
-             embeddings = []
-             logger.warning("No relevant segments found for embedding.")
-        
-        if execution_id: await self._update_step(execution_id, "Embedding", "completed", f"Embedded {len(texts_to_embed)} segments")
+        embeddings = await batcher.finish()
+        embedded_segment_ids = batcher.segment_ids
+        text_hashes = batcher.text_hashes
+        if embeddings is None:
+            logger.error("Embedding provider returned an incomplete result")
+            embeddings = []
+            # No vectors to point at
+            page_fingerprints = [[page, fingerprint, 0, 0] for page, fingerprint, _, _ in page_fingerprints]
+        elif not embedded_segment_ids:
+            logger.warning("No relevant segments found for embedding.")
+
+        logger.info(
+            f"Embedded {batcher.embedded} unique segments out of {spool.total_segments} "
+            f"({len(embedded_segment_ids)} relevant, {batcher.carried} carried over from unchanged pages, "
+            f"{len(embedded_segment_ids) - batcher.embedded - batcher.carried} reused)"
+        )
+        if execution_id: await self._update_step(execution_id, "Embedding", "completed", f"Embedded {batcher.embedded} segments, unchanged pages {batcher.carried}, reused {len(embedded_segment_ids) - batcher.embedded - batcher.carried}")
 
         # Save Embeddings
         embeddings_json = json.dumps(embeddings)
@@ -252,9 +387,10 @@ class PipelineService:
         semantic_score = 0.0
         if prev_version and prev_version.embeddings_path:
             try:
-                prev_emb_content = await self.storage.download(prev_version.embeddings_path)
-                if prev_emb_content:
-                    prev_embeddings = json.loads(prev_emb_content)
+                if prev_embeddings is None:
+                    prev_emb_content = await self.storage.download(prev_version.embeddings_path)
+                    prev_embeddings = json.loads(prev_emb_content) if prev_emb_content else None
+                if prev_embeddings is not None:
                     logger.info(f"Loaded previous embeddings: {len(prev_embeddings)} segments")
                     
                     if embeddings and prev_embeddings:
@@ -277,17 +413,61 @@ class PipelineService:
         if execution_id: await self._update_step(execution_id, "Scoring", "completed", f"Score: {semantic_score}")
         
         # Save Version in separate session to avoid dirtying/commiting the main session (which holds stale Execution)
+        content_hash = spool.sha256
         async with AsyncSessionLocal() as version_session:
             version = Version(
+                id=uuid.uuid4(),
                 document_id=document_id,
-                gcs_path=f"{base_path}/original.pdf",
-                content_hash=str(hash(extracted_json)), # Simple hash
+                gcs_path=original_path,
+                content_hash=content_hash,
                 semantic_score=semantic_score,
                 execution_id=execution_id,
                 extracted_text_path=f"{base_path}/extracted.json",
-                embeddings_path=embeddings_path
+                segment_index_path=f"{base_path}/segment_index.json",
+                matches_path=matches_path,
+                embeddings_path=embeddings_path,
+                page_fingerprints={"model": self.analysis.model_id, "pages": page_fingerprints}
             )
             version_session.add(version)
+            await version_session.flush()
+            # Index for full-text and semantic search and sketch segments for
+            # near-duplicate detection in the same transaction as the version,
+            # reading the spooled pages back a group at a time
+            search = SearchService(version_session)
+            duplicates = DuplicateService(version_session)
+            for first, segments in _page_groups(spool, settings.PIPELINE_INDEX_PAGES):
+                await search.index_version(version.id, document_id, segments)
+                if embeddings:
+                    lo = bisect_left(embedded_segment_ids, first)
+                    hi = bisect_left(embedded_segment_ids, first + len(segments))
+                    await search.index_embeddings(
+                        version.id, document_id,
+                        [
+                            segments[i - first] | {"segment_index": i, "text_hash": h}
+                            for i, h in zip(embedded_segment_ids[lo:hi], text_hashes[lo:hi])
+                        ],
+                        embeddings[lo:hi],
+                        self.analysis.model_id
+                    )
+                sketches = await loop.run_in_executor(None, self.min_hasher.sketch_segments, segments, first)
+                await duplicates.index_sketches(version.id, document_id, sketches)
+
+            # Maintain the document's latest-version summary in the same transaction
+            now = datetime.utcnow()
+            await version_session.execute(
+                update(Document).where(Document.id == document_id).values(
+                    latest_version_id=version.id,
+                    last_score=semantic_score,
+                    last_hash=content_hash,
+                    last_source_digest=source_digest,
+                    last_checked_at=now,
+                    last_changed_at=case(
+                        (Document.last_hash.is_distinct_from(content_hash), now),
+                        else_=Document.last_changed_at
+                    )
+                )
+            )
             await version_session.commit()
+        spool.close()
         
         logger.info(f"Processed document {document_id}, created version")
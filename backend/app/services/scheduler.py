@@ -1,13 +1,16 @@
 import logging
 import uuid
 import datetime
+from typing import Any, Iterable
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from sqlalchemy import select
+from sqlalchemy import select, text
 
+from app.core.config import settings
 from app.db.session import AsyncSessionLocal
 from app.db.models import Document
 from app.core.tasks import run_pipeline_task
+from app.services.sketch import DuplicateService
 
 logger = logging.getLogger(__name__)
 
@@ -42,9 +45,41 @@ class SchedulerService:
             )
             log_debug("Heartbeat job added")
 
+            self.scheduler.add_job(
+                self._compact_stats,
+                'interval',
+                minutes=1,
+                id='compact_stats',
+                replace_existing=True
+            )
+
+            self.scheduler.add_job(
+                self._refresh_shared_clauses,
+                'interval',
+                minutes=settings.SHARED_CLAUSES_REFRESH_MINUTES,
+                id='refresh_shared_clauses',
+                replace_existing=True
+            )
+
     async def _heartbeat(self):
         log_debug("Heartbeat: Alive")
 
+    async def _compact_stats(self):
+        """Fold committed stats counter deltas into their counters so reads stay cheap."""
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("""
+                WITH moved AS (DELETE FROM stats_counter_deltas RETURNING name, delta)
+                UPDATE stats_counters c SET value = c.value + m.total
+                FROM (SELECT name, sum(delta) AS total FROM moved GROUP BY name) m
+                WHERE c.name = m.name
+            """))
+            await session.commit()
+
+    async def _refresh_shared_clauses(self):
+        async with AsyncSessionLocal() as session:
+            await DuplicateService(session).refresh_shared_clauses()
+            await session.commit()
+
     async def load_jobs(self):
         """Load all documents with schedules from DB and schedule them."""
         log_debug("Loading scheduled jobs from database...")
@@ -53,12 +88,27 @@ class SchedulerService:
             result = await session.execute(stmt)
             documents = result.scalars().all()
             
-            for doc in documents:
-                self.schedule_document(doc)
+            self.schedule_documents(documents)
             
             log_debug(f"Loaded {len(documents)} scheduled jobs.")
 
-    def schedule_document(self, document: Document):
+    def schedule_documents(self, documents: Iterable[Any]):
+        """
+        Add, update or remove jobs for many documents in one pass. Accepts
+        Document instances or rows with `id`, `name` and `schedule`.
+        """
+        scheduled = 0
+        removed = 0
+        for document in documents:
+            if document.schedule:
+                self.schedule_document(document, verbose=False)
+                scheduled += 1
+            else:
+                self.unschedule_document(document.id)
+                removed += 1
+        log_debug(f"Bulk scheduling: {scheduled} scheduled, {removed} unscheduled")
+
+    def schedule_document(self, document: Document, verbose: bool = True):
         """Add or update a job for the document."""
         if not document.schedule:
             self.unschedule_document(document.id)
@@ -97,6 +147,8 @@ class SchedulerService:
                 args=[document.id],
                 name=f"pipeline_{document.name}"
             )
+            if not verbose:
+                return
             log_debug(f"Successfully scheduled job for doc {document.id} with schedule '{cron_expr}'")
             job = self.scheduler.get_job(job_id)
             if job:
@@ -0,0 +1,217 @@
+import uuid
+import logging
+from typing import List, Dict, Any, Optional
+from sqlalchemy import select, insert, func, desc, literal_column, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import SearchPage, SegmentEmbedding, Version, Document
+
+logger = logging.getLogger(__name__)
+
+class SearchService:
+    """
+    Full-text search over the normalized text of every version, backed by a
+    Postgres tsvector column with a GIN index (one row per page), and semantic
+    search over segment embeddings backed by a pgvector HNSW index.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def build_pages(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Group normalized segments into one searchable text per page."""
+        pages: Dict[int, List[str]] = {}
+        for seg in segments:
+            if seg.get("ignored"):
+                continue
+            content = seg.get("normalized_text") or seg.get("text")
+            if content:
+                pages.setdefault(seg["page"], []).append(content)
+        return [{"page": page, "content": "\n\n".join(texts)} for page, texts in pages.items()]
+
+    async def index_version(self, version_id: uuid.UUID, document_id: uuid.UUID, segments: List[Dict[str, Any]]) -> int:
+        """
+        Add a version's pages to the search index. Runs inside the caller's
+        transaction so the version and its search rows are committed together.
+        """
+        rows = [
+            {"version_id": version_id, "document_id": document_id, **page}
+            for page in self.build_pages(segments)
+        ]
+        if rows:
+            await self.session.execute(insert(SearchPage), rows)
+        logger.info(f"Indexed {len(rows)} pages for version {version_id}")
+        return len(rows)
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        document_id: Optional[uuid.UUID] = None,
+        latest_only: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Return page-level hits ranked by ts_rank_cd. Highlighting (the
+        expensive part) only runs on the page of results being returned.
+        """
+        language = literal_column(f"'{settings.SEARCH_LANGUAGE}'::regconfig")
+        ts_query = func.websearch_to_tsquery(language, query)
+        rank = func.ts_rank_cd(SearchPage.search_vector, ts_query).label("rank")
+
+        ranked = (
+            select(SearchPage.id, SearchPage.version_id, SearchPage.document_id, SearchPage.page, rank)
+            .where(SearchPage.search_vector.op("@@")(ts_query))
+        )
+        if document_id:
+            ranked = ranked.where(SearchPage.document_id == document_id)
+        if latest_only:
+            ranked = ranked.join(Document, Document.latest_version_id == SearchPage.version_id)
+        ranked = ranked.order_by(desc("rank")).offset(offset).limit(limit).subquery()
+
+        stmt = (
+            select(
+                ranked.c.version_id,
+                ranked.c.document_id,
+                ranked.c.page,
+                ranked.c.rank,
+                func.ts_headline(
+                    language, SearchPage.content, ts_query,
+                    "MaxFragments=2, MaxWords=35, MinWords=15, StartSel=<mark>, StopSel=</mark>"
+                ).label("snippet"),
+                Document.application_name,
+                Document.name,
+                Version.timestamp,
+            )
+            .join(SearchPage, SearchPage.id == ranked.c.id)
+            .join(Document, Document.id == ranked.c.document_id)
+            .join(Version, Version.id == ranked.c.version_id)
+            .order_by(desc(ranked.c.rank))
+        )
+        result = await self.session.execute(stmt)
+
+        return [
+            {
+                "document_id": row.document_id,
+                "application_name": row.application_name,
+                "document_name": row.name,
+                "version_id": row.version_id,
+                "timestamp": row.timestamp,
+                "page": row.page,
+                "rank": float(row.rank),
+                "snippet": row.snippet,
+            }
+            for row in result
+        ]
+
+    async def index_embeddings(
+        self,
+        version_id: uuid.UUID,
+        document_id: uuid.UUID,
+        segments: List[Dict[str, Any]],
+        embeddings: List[List[float]],
+        model: Optional[str] = None
+    ) -> int:
+        """
+        Add a version's segment embeddings to the vector index. `segments` must
+        line up with `embeddings` and carry their position as `segment_index`
+        (and optionally their exact-duplicate key as `text_hash`).
+        """
+        rows = [
+            {
+                "version_id": version_id,
+                "document_id": document_id,
+                "page": seg["page"],
+                "segment_index": seg["segment_index"],
+                "content": seg["normalized_text"],
+                "text_hash": seg.get("text_hash"),
+                "model": model,
+                "embedding": vector,
+            }
+            for seg, vector in zip(segments, embeddings)
+            if len(vector) == settings.EMBEDDING_DIMENSION
+        ]
+        if len(rows) < len(segments):
+            logger.warning(
+                f"Skipped {len(segments) - len(rows)} embeddings whose dimension does not match "
+                f"EMBEDDING_DIMENSION={settings.EMBEDDING_DIMENSION}"
+            )
+        if rows:
+            await self.session.execute(insert(SegmentEmbedding), rows)
+        return len(rows)
+
+    async def semantic_search(
+        self,
+        query_embedding: List[float],
+        limit: int = 10,
+        document_id: Optional[uuid.UUID] = None,
+        model: Optional[str] = None,
+        latest_only: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the segments closest to `query_embedding` by cosine similarity,
+        using the HNSW index (approximate, ordered by distance).
+
+        Unchanged clauses are indexed again for every version, so hits are
+        de-duplicated per document and text, keeping the newest version's
+        copy. The index scan fetches VECTOR_SEARCH_OVERFETCH candidates per
+        hit because filters and de-duplication apply to its output.
+        """
+        candidates = limit * settings.VECTOR_SEARCH_OVERFETCH
+        # pgvector caps ef_search at 1000; the scan returns at most ef_search rows
+        ef_search = min(1000, max(settings.VECTOR_SEARCH_EF_SEARCH, candidates))
+        # Applies to the current transaction only
+        await self.session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+
+        distance = SegmentEmbedding.embedding.cosine_distance(query_embedding)
+        nearest = select(
+            SegmentEmbedding.version_id,
+            SegmentEmbedding.document_id,
+            SegmentEmbedding.page,
+            SegmentEmbedding.segment_index,
+            SegmentEmbedding.content,
+            func.coalesce(SegmentEmbedding.text_hash, SegmentEmbedding.content).label("text_key"),
+            distance.label("distance"),
+        )
+        if document_id:
+            nearest = nearest.where(SegmentEmbedding.document_id == document_id)
+        if model:
+            # Vectors from another model live in a different space
+            nearest = nearest.where(SegmentEmbedding.model == model)
+        nearest = nearest.order_by(distance).limit(candidates).subquery()
+
+        # One hit per (document, text): the copy from the newest version
+        unique = (
+            select(nearest, Version.timestamp)
+            .join(Version, Version.id == nearest.c.version_id)
+            .distinct(nearest.c.document_id, nearest.c.text_key)
+            .order_by(nearest.c.document_id, nearest.c.text_key, desc(Version.timestamp))
+        )
+        if latest_only:
+            unique = unique.join(Document, Document.latest_version_id == nearest.c.version_id)
+        unique = unique.subquery()
+
+        stmt = (
+            select(unique, Document.application_name, Document.name)
+            .join(Document, Document.id == unique.c.document_id)
+            .order_by(unique.c.distance)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+
+        return [
+            {
+                "document_id": row.document_id,
+                "application_name": row.application_name,
+                "document_name": row.name,
+                "version_id": row.version_id,
+                "timestamp": row.timestamp,
+                "page": row.page,
+                "segment_index": row.segment_index,
+                "score": 1.0 - float(row.distance),
+                "text": row.content,
+            }
+            for row in result
+        ]
@@ -0,0 +1,157 @@
+import json
+import hashlib
+import tempfile
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+class SegmentIndex:
+    """
+    Page -> byte offset index over a version's extracted.json.
+
+    extracted.json is a JSON array of segments ordered by page, so every page
+    occupies one contiguous byte range of the file. Each entry in `pages` is
+    [page, byte_start, byte_end, first_segment, segment_count] with byte_end
+    exclusive, which lets the API fetch only the pages a client is viewing.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, pages: List[List[int]], total_segments: int, total_bytes: int):
+        self.pages = pages
+        self.total_segments = total_segments
+        self.total_bytes = total_bytes
+        self._page_numbers = [p[0] for p in pages]
+        self._first_segments = [p[3] for p in pages]
+
+    @property
+    def total_pages(self) -> int:
+        return len(self.pages)
+
+    def to_json(self) -> bytes:
+        return json.dumps({
+            "format": self.FORMAT_VERSION,
+            "total_segments": self.total_segments,
+            "total_bytes": self.total_bytes,
+            "pages": self.pages,
+        }).encode()
+
+    @classmethod
+    def from_json(cls, content: bytes) -> "SegmentIndex":
+        data = json.loads(content)
+        return cls(data["pages"], data["total_segments"], data["total_bytes"])
+
+    def resolve(
+        self,
+        page_start: Optional[int] = None,
+        page_end: Optional[int] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Map a page range plus a segment offset/limit inside it to a byte range.
+        Returns (byte_start, byte_end, skip, take): the byte range covers whole
+        pages, `skip`/`take` select the requested segments out of that slice.
+        Returns None if nothing matches.
+        """
+        lo = bisect_left(self._page_numbers, page_start) if page_start is not None else 0
+        hi = bisect_right(self._page_numbers, page_end) if page_end is not None else len(self.pages)
+        if lo >= hi:
+            return None
+
+        first_segment = self.pages[lo][3] + offset
+        last_segment = self.pages[hi - 1][3] + self.pages[hi - 1][4]  # exclusive
+        if limit is not None:
+            last_segment = min(last_segment, first_segment + limit)
+        if first_segment >= last_segment:
+            return None
+
+        # Narrow down to the pages actually holding the requested segments
+        start_page = bisect_right(self._first_segments, first_segment) - 1
+        end_page = bisect_right(self._first_segments, last_segment - 1) - 1
+
+        byte_start = self.pages[start_page][1]
+        byte_end = self.pages[end_page][2]
+        skip = first_segment - self.pages[start_page][3]
+        return byte_start, byte_end, skip, last_segment - first_segment
+
+class SegmentSpool:
+    """
+    Writes extracted.json page by page, as pages are finalized, to a local
+    temporary file, so a run never holds the whole document's segments. The
+    file is byte-identical to json.dumps(segments); its SHA-256 and the
+    SegmentIndex of where each page lands are built on the fly.
+
+    Pages must be written in order. After `finish`, `pages` reads them back
+    one at a time and `chunks` streams the file for upload.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._hash = hashlib.sha256()
+        self._pages: List[List[int]] = []
+        self._position = 0
+        self.total_segments = 0
+        self.index: Optional[SegmentIndex] = None
+        self._write(b"[")
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+        self._hash.update(data)
+        self._position += len(data)
+
+    def write_page(self, segments: Iterable[Dict[str, Any]]) -> None:
+        for seg in segments:
+            if self.total_segments > 0:
+                self._write(b", ")
+            start = self._position
+            self._write(json.dumps(seg).encode())
+
+            page = seg.get("page", 0)
+            if self._pages and self._pages[-1][0] == page:
+                self._pages[-1][2] = self._position
+                self._pages[-1][4] += 1
+            else:
+                self._pages.append([page, start, self._position, self.total_segments, 1])
+            self.total_segments += 1
+
+    def finish(self) -> SegmentIndex:
+        self._write(b"]")
+        self._file.flush()
+        self.index = SegmentIndex(self._pages, self.total_segments, self._position)
+        return self.index
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def pages(self) -> Iterator[Tuple[int, int, List[Dict[str, Any]]]]:
+        """Yield (page, first_segment, segments) for every written page."""
+        for page, byte_start, byte_end, first_segment, _ in self.index.pages:
+            self._file.seek(byte_start)
+            yield page, first_segment, parse_segment_slice(self._file.read(byte_end - byte_start))
+
+    def chunks(self, size: int = 1024 * 1024) -> Iterator[bytes]:
+        self._file.seek(0)
+        while True:
+            chunk = self._file.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        self._file.close()
+
+def page_fingerprint(segments: Iterable[Dict[str, Any]]) -> str:
+    """Identity of a page's normalized content (texts and ignored flags), used to reuse its embeddings."""
+    h = hashlib.sha1()
+    for seg in segments:
+        h.update(b"\x00" if seg.get("ignored") else b"\x01")
+        h.update(seg["normalized_text"].encode())
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+def parse_segment_slice(content: bytes) -> List[Dict[str, Any]]:
+    """Parse a byte range cut from extracted.json along segment boundaries."""
+    if not content:
+        return []
+    return json.loads(b"[" + content + b"]")
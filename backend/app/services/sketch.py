@@ -0,0 +1,262 @@
+import re
+import uuid
+import zlib
+import hashlib
+import logging
+from typing import List, Dict, Any, Iterable
+
+import numpy as np
+from sqlalchemy import select, insert, func, desc, text, table, column
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import SegmentSketch, SegmentEmbedding, Document
+from app.services.keywords import make_snippet
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Materialized view created by migration 0016; not part of the ORM metadata
+_clusters = table(
+    "shared_clause_clusters",
+    column("text_hash"),
+    column("documents"),
+    column("document_ids", ARRAY(UUID(as_uuid=True))),
+    column("variants"),
+    column("snippet"),
+)
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+def hash_tokens(tokens: List[str]) -> str:
+    return hashlib.sha1(" ".join(tokens).encode()).hexdigest()
+
+def exact_text_hash(text: str) -> str:
+    """
+    Vector reuse key: hash of the exact normalized text. Stricter than the
+    token-stream hash used for duplicate detection, which ignores case and
+    punctuation, so segments only share an embedding when the model input
+    is identical.
+    """
+    return hashlib.sha1(text.encode()).hexdigest()
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles plus LSH banding.
+
+    Two segments land in the same bucket for at least one band with high
+    probability once their Jaccard similarity exceeds roughly
+    (1 / bands) ** (1 / rows), so candidates are found with index lookups on
+    band hashes instead of comparing against the whole corpus.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = settings.SKETCH_NUM_PERM,
+        bands: int = settings.SKETCH_BANDS,
+        shingle_size: int = 3,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Fixed seed: signatures are persisted and must be comparable across processes
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, tokens: List[str]) -> np.ndarray:
+        n = self.shingle_size
+        if len(tokens) <= n:
+            grams = [" ".join(tokens)]
+        else:
+            grams = [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+        return np.fromiter((zlib.crc32(g.encode()) for g in set(grams)), dtype=np.uint64)
+
+    def signature(self, tokens: List[str]) -> np.ndarray:
+        hashes = self.shingles(tokens)
+        # (shingles x permutations); a, b and hashes are < 2**32 so a * h + b fits in uint64
+        permuted = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME
+        return (permuted.min(axis=0) & _MAX_HASH).astype(np.uint32)
+
+    def band_hashes(self, signature: np.ndarray) -> List[int]:
+        hashes = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(bytes([band]) + chunk, digest_size=8).digest()
+            hashes.append(int.from_bytes(digest, "big", signed=True))  # fits BIGINT
+        return hashes
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.mean(sig_a == sig_b))
+
+    def sketch_segments(self, segments: List[Dict[str, Any]], start: int = 0) -> List[Dict[str, Any]]:
+        """
+        Sketch every non-ignored segment long enough to be a meaningful clause.
+        `start` is the position of the first segment in the version.
+        Returns rows for `segment_sketches` (without version/document ids).
+        """
+        rows = []
+        for i, seg in enumerate(segments, start):
+            if seg.get("ignored"):
+                continue
+            tokens = tokenize(seg.get("normalized_text") or seg["text"])
+            if len(tokens) < settings.SKETCH_MIN_TOKENS:
+                continue
+            signature = self.signature(tokens)
+            rows.append({
+                "page": seg["page"],
+                "segment_index": i,
+                "text_hash": hash_tokens(tokens),
+                "snippet": make_snippet(seg["text"]),
+                "band_hashes": self.band_hashes(signature),
+                "signature": signature.tobytes(),
+            })
+        return rows
+
+class DuplicateService:
+    """Corpus-wide near-duplicate lookups over persisted segment sketches."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def index_sketches(self, version_id: uuid.UUID, document_id: uuid.UUID, sketches: List[Dict[str, Any]]) -> int:
+        rows = [{"version_id": version_id, "document_id": document_id, **row} for row in sketches]
+        if rows:
+            await self.session.execute(insert(SegmentSketch), rows)
+        return len(rows)
+
+    async def find_embeddings(self, text_hashes: Iterable[str], model: str) -> Dict[str, List[float]]:
+        """Vectors already computed by `model` for any of the given exact-duplicate keys."""
+        text_hashes = list(set(text_hashes))
+        if not text_hashes:
+            return {}
+        stmt = (
+            select(SegmentEmbedding.text_hash, SegmentEmbedding.embedding)
+            .where(SegmentEmbedding.model == model, SegmentEmbedding.text_hash.in_(text_hashes))
+            .distinct(SegmentEmbedding.text_hash)
+        )
+        result = await self.session.execute(stmt)
+        return {row.text_hash: list(map(float, row.embedding)) for row in result}
+
+    async def version_duplicates(self, version_id: uuid.UUID, threshold: float = settings.DUPLICATE_SIMILARITY_THRESHOLD) -> List[Dict[str, Any]]:
+        """
+        Near-duplicates of each sketched segment of a version in other documents.
+        Candidates come from LSH band overlap (GIN index on band_hashes) and are
+        verified with the signature similarity estimate.
+        """
+        source = aliased(SegmentSketch)
+        other = aliased(SegmentSketch)
+        stmt = (
+            select(
+                source.segment_index, source.page, source.signature.label("source_signature"),
+                other.document_id, other.version_id, other.page.label("other_page"),
+                other.segment_index.label("other_segment_index"), other.signature,
+                Document.application_name, Document.name,
+            )
+            .join(other, (other.band_hashes.overlap(source.band_hashes)) & (other.document_id != source.document_id))
+            .join(Document, Document.id == other.document_id)
+            .where(source.version_id == version_id)
+        )
+        result = await self.session.execute(stmt)
+
+        # Keep the best match per (segment, other document)
+        best: Dict[tuple, Dict[str, Any]] = {}
+        pages: Dict[int, int] = {}
+        for row in result:
+            score = MinHasher.similarity(
+                np.frombuffer(row.source_signature, dtype=np.uint32),
+                np.frombuffer(row.signature, dtype=np.uint32)
+            )
+            key = (row.segment_index, row.document_id)
+            if score < threshold or (key in best and best[key]["similarity"] >= score):
+                continue
+            pages[row.segment_index] = row.page
+            best[key] = {
+                "document_id": row.document_id,
+                "application_name": row.application_name,
+                "document_name": row.name,
+                "version_id": row.version_id,
+                "page": row.other_page,
+                "segment_index": row.other_segment_index,
+                "similarity": score,
+            }
+
+        duplicates: Dict[int, List[Dict[str, Any]]] = {}
+        for (segment_index, _), match in best.items():
+            duplicates.setdefault(segment_index, []).append(match)
+
+        return [
+            {
+                "segment_index": segment_index,
+                "page": pages[segment_index],
+                "matches": sorted(matches, key=lambda m: -m["similarity"]),
+            }
+            for segment_index, matches in sorted(duplicates.items())
+        ]
+
+    async def similar_documents(self, version_id: uuid.UUID, threshold: float = settings.DUPLICATE_SIMILARITY_THRESHOLD) -> List[Dict[str, Any]]:
+        """Other documents ranked by the share of this version's clauses they contain."""
+        total = (await self.session.execute(
+            select(func.count()).select_from(SegmentSketch).where(SegmentSketch.version_id == version_id)
+        )).scalar() or 0
+        if not total:
+            return []
+
+        shared: Dict[uuid.UUID, Dict[str, Any]] = {}
+        for entry in await self.version_duplicates(version_id, threshold):
+            for match in entry["matches"]:
+                doc = shared.setdefault(match["document_id"], {
+                    "document_id": match["document_id"],
+                    "application_name": match["application_name"],
+                    "document_name": match["document_name"],
+                    "shared_segments": 0,
+                })
+                doc["shared_segments"] += 1
+
+        for doc in shared.values():
+            doc["overlap"] = doc["shared_segments"] / total
+        return sorted(shared.values(), key=lambda d: -d["overlap"])
+
+    async def shared_clauses(self, min_documents: int = 2, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Clusters of near-identical clauses shared by several documents, read
+        from the `shared_clause_clusters` view. Clauses are grouped through
+        their LSH band buckets (see migration 0016); the view is refreshed by
+        the scheduler, so newly indexed versions show up after the next refresh.
+        """
+        stmt = (
+            select(
+                _clusters.c.text_hash, _clusters.c.documents, _clusters.c.document_ids,
+                _clusters.c.variants, _clusters.c.snippet,
+            )
+            .where(_clusters.c.documents >= min_documents)
+            .order_by(desc(_clusters.c.documents))
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return [
+            {
+                "text_hash": row.text_hash,
+                "documents": row.documents,
+                "document_ids": row.document_ids,
+                "variants": row.variants,
+                "snippet": row.snippet,
+            }
+            for row in result
+        ]
+
+    async def refresh_shared_clauses(self) -> None:
+        """Recompute the clause clusters without blocking readers of the view."""
+        await self.session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY shared_clause_clusters"))
@@ -1,15 +1,82 @@
-from google.cloud import storage
-from minio import Minio
 import io
+import os
+import json
+import mmap
+import queue
+import mimetypes
+import asyncio
+import hashlib
+import functools
+from typing import Any, AsyncIterator, Dict, Optional
 from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+class UploadTooLargeError(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the limit of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+class _ChunkPipe(io.RawIOBase):
+    """
+    Bounded hand-off between the event loop (producer) and a blocking SDK
+    upload running in a worker thread (consumer reading via `read`).
+    """
+
+    def __init__(self, maxsize: int = 4):
+        super().__init__()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._buffer = bytearray()
+        self._eof = False
+        self.consumer_done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def put(self, item: Any) -> None:
+        # Blocking; called from an executor thread. Gives up once the consumer has exited.
+        while not self.consumer_done:
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise IOError("Storage upload ended before all data was sent")
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            item = self._queue.get()
+            if item is None:
+                self._eof = True
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                self._buffer.extend(item)
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+def source_key(info: Dict[str, Any]) -> Optional[str]:
+    """Identity of a stored object's content: its SHA-256 when recorded, else its etag."""
+    if info.get("sha256"):
+        return info["sha256"]
+    if info.get("etag"):
+        return f"etag:{info['etag']}"
+    return None
+
 class StorageService:
     def __init__(self):
-        self.use_minio = settings.USE_MINIO
-        if self.use_minio:
+        # Filesystem backend (single node / local dev) takes precedence over object storage
+        self.local_root = os.path.abspath(settings.STORAGE_LOCAL_PATH) if settings.STORAGE_LOCAL_PATH else None
+        self.use_minio = settings.USE_MINIO and not self.local_root
+        if self.local_root:
+            os.makedirs(self.local_root, exist_ok=True)
+        elif self.use_minio:
+            # Object storage SDKs are imported only for the configured backend
+            from minio import Minio
             self.minio_client = Minio(
                 settings.MINIO_ENDPOINT,
                 access_key=settings.MINIO_ACCESS_KEY,
@@ -21,6 +88,7 @@ class StorageService:
             if not self.minio_client.bucket_exists(self.bucket):
                 self.minio_client.make_bucket(self.bucket)
         else:
+            from google.cloud import storage
             self.gcs_client = storage.Client()
             self.bucket = self.gcs_client.bucket(settings.GCS_BUCKET_NAME)
 
@@ -29,7 +97,14 @@ class StorageService:
         Upload content to storage. Returns the path/access URL.
         """
         try:
-            if self.use_minio:
+            if self.local_root:
+                target = self._local_path(path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "wb") as f:
+                    f.write(content)
+                self._write_local_metadata(target, content_type, {})
+                return f"file://{target}"
+            elif self.use_minio:
                 self.minio_client.put_object(
                     self.bucket,
                     path,
@@ -46,18 +121,194 @@ class StorageService:
             logger.error(f"Upload failed: {e}")
             raise e
 
+    async def upload_stream(
+        self,
+        path: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str = "application/octet-stream",
+        max_bytes: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Upload an async stream of chunks as a multipart (MinIO) or resumable
+        (GCS) upload, holding at most a few parts in memory. The SHA-256 of the
+        content is computed on the fly and stored as `sha256` object metadata.
+        Raises UploadTooLargeError (and discards the partial upload) past `max_bytes`.
+        Returns {"url", "size", "sha256"}.
+        """
+        loop = asyncio.get_running_loop()
+        pipe = _ChunkPipe()
+        digest = hashlib.sha256()
+        size = 0
+
+        def consume():
+            try:
+                if self.local_root:
+                    target = self._local_path(path)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    partial = f"{target}.part"
+                    try:
+                        with open(partial, "wb") as f:
+                            while True:
+                                data = pipe.read(settings.STORAGE_PART_SIZE)
+                                if not data:
+                                    break
+                                f.write(data)
+                        os.replace(partial, target)
+                    except BaseException:
+                        if os.path.exists(partial):
+                            os.remove(partial)
+                        raise
+                elif self.use_minio:
+                    self.minio_client.put_object(
+                        self.bucket, path, pipe, -1,
+                        content_type=content_type, part_size=settings.STORAGE_PART_SIZE
+                    )
+                else:
+                    writer = self.bucket.blob(path).open(
+                        "wb", content_type=content_type, chunk_size=settings.STORAGE_PART_SIZE
+                    )
+                    while True:
+                        data = pipe.read(settings.STORAGE_PART_SIZE)
+                        if not data:
+                            break
+                        writer.write(data)
+                    # Only finalize on success; an unclosed resumable upload is discarded
+                    writer.close()
+            finally:
+                pipe.consumer_done = True
+
+        upload = loop.run_in_executor(None, consume)
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                await loop.run_in_executor(None, pipe.put, chunk)
+            await loop.run_in_executor(None, pipe.put, None)
+            await upload
+        except BaseException as e:
+            # Make the consumer fail so the SDK aborts the multipart upload
+            if not pipe.consumer_done:
+                await loop.run_in_executor(None, pipe.put, e)
+            try:
+                await upload
+            except BaseException:
+                pass
+            logger.error(f"Streaming upload failed: {e}")
+            raise
+
+        sha256 = digest.hexdigest()
+        await loop.run_in_executor(None, self._set_metadata, path, content_type, {"sha256": sha256})
+
+        if self.local_root:
+            url = f"file://{self._local_path(path)}"
+        elif self.use_minio:
+            url = f"s3://{self.bucket}/{path}"
+        else:
+            url = f"gs://{settings.GCS_BUCKET_NAME}/{path}"
+        return {"url": url, "size": size, "sha256": sha256}
+
+    def _set_metadata(self, path: str, content_type: str, metadata: Dict[str, str]) -> None:
+        if self.local_root:
+            self._write_local_metadata(self._local_path(path), content_type, metadata)
+        elif self.use_minio:
+            # S3 metadata is immutable; a server-side self-copy replaces it without moving data through us
+            from minio.commonconfig import CopySource, REPLACE
+            self.minio_client.copy_object(
+                self.bucket, path, CopySource(self.bucket, path),
+                metadata={"Content-Type": content_type, **metadata},
+                metadata_directive=REPLACE
+            )
+        else:
+            blob = self.bucket.blob(path)
+            blob.metadata = metadata
+            blob.patch()
+
+    def _local_path(self, path: str) -> str:
+        target = os.path.abspath(os.path.join(self.local_root, path.lstrip("/")))
+        if os.path.commonpath([target, self.local_root]) != self.local_root:
+            raise ValueError(f"Path escapes storage root: {path}")
+        return target
+
+    @staticmethod
+    def _write_local_metadata(target: str, content_type: str, metadata: Dict[str, str]) -> None:
+        # Sidecar file standing in for object metadata
+        with open(f"{target}.meta.json", "w") as f:
+            json.dump({"content_type": content_type, **metadata}, f)
+
+    async def stat(self, path: str) -> Dict[str, Any]:
+        """
+        Object metadata without fetching the content: size, content_type,
+        etag and the `sha256` recorded by upload_stream (None for objects
+        written without it).
+        """
+        path = self._object_name(path)
+        if self.local_root:
+            target = self._local_path(path)
+            st = os.stat(target)
+            metadata = {}
+            if os.path.exists(f"{target}.meta.json"):
+                with open(f"{target}.meta.json") as f:
+                    metadata = json.load(f)
+            return {
+                "size": st.st_size,
+                "content_type": metadata.get("content_type") or mimetypes.guess_type(target)[0],
+                "etag": f"{st.st_size}-{st.st_mtime_ns}",
+                "sha256": metadata.get("sha256"),
+            }
+        elif self.use_minio:
+            obj = self.minio_client.stat_object(self.bucket, path)
+            return {
+                "size": obj.size,
+                "content_type": obj.content_type,
+                "etag": obj.etag,
+                "sha256": obj.metadata.get("x-amz-meta-sha256") if obj.metadata else None,
+            }
+        else:
+            blob = self.bucket.get_blob(path)
+            if blob is None:
+                raise FileNotFoundError(path)
+            return {
+                "size": blob.size,
+                "content_type": blob.content_type,
+                "etag": blob.etag,
+                "sha256": (blob.metadata or {}).get("sha256"),
+            }
+
+    def open_local(self, path: str):
+        """
+        Memory-map an object of the filesystem backend (read-only, zero-copy).
+        Returns None for object-storage backends. The caller should close it.
+        """
+        if not self.local_root:
+            return None
+        with open(self._local_path(self._object_name(path)), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _object_name(self, path: str) -> str:
+        # Strip protocol if present
+        if self.local_root and path.startswith("file://"):
+            return os.path.relpath(path[len("file://"):], self.local_root)
+        if path.startswith("s3://"):
+            return path.replace(f"s3://{self.bucket}/", "")
+        elif path.startswith("gs://"):
+            return path.replace(f"gs://{settings.GCS_BUCKET_NAME}/", "")
+        return path
+
     async def download(self, path: str) -> bytes:
         """
         Download content from storage.
         """
         try:
-            # Strip protocol if present
-            if path.startswith("s3://"):
-                path = path.replace(f"s3://{self.bucket}/", "")
-            elif path.startswith("gs://"):
-                path = path.replace(f"gs://{settings.GCS_BUCKET_NAME}/", "")
+            path = self._object_name(path)
 
-            if self.use_minio:
+            if self.local_root:
+                with open(self._local_path(path), "rb") as f:
+                    return f.read()
+            elif self.use_minio:
                 response = self.minio_client.get_object(self.bucket, path)
                 try:
                     return response.read()
@@ -70,3 +321,88 @@ class StorageService:
         except Exception as e:
             logger.error(f"Download failed: {e}")
             raise e
+
+    async def download_range(self, path: str, start: int, end: int) -> bytes:
+        """
+        Download bytes [start, end) of an object without fetching the rest of it.
+        """
+        if end <= start:
+            return b""
+        try:
+            path = self._object_name(path)
+
+            if self.local_root:
+                with open(self._local_path(path), "rb") as f:
+                    f.seek(start)
+                    return f.read(end - start)
+            elif self.use_minio:
+                response = self.minio_client.get_object(self.bucket, path, offset=start, length=end - start)
+                try:
+                    return response.read()
+                finally:
+                    response.close()
+                    response.release_conn()
+            else:
+                blob = self.bucket.blob(path)
+                # GCS ranges are inclusive of the end byte
+                return blob.download_as_bytes(start=start, end=end - 1)
+        except Exception as e:
+            logger.error(f"Range download failed: {e}")
+            raise e
+
+    async def stream(self, path: str, start: int = 0, end: Optional[int] = None, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        Stream an object (or the byte range [start, end)) in chunks, so large
+        objects never have to be buffered in full.
+        """
+        path = self._object_name(path)
+        loop = asyncio.get_running_loop()
+
+        if self.local_root:
+            with open(self._local_path(path), "rb") as f:
+                f.seek(start)
+                remaining = (end - start) if end is not None else None
+                while remaining is None or remaining > 0:
+                    size = chunk_size if remaining is None else min(chunk_size, remaining)
+                    chunk = await loop.run_in_executor(None, f.read, size)
+                    if not chunk:
+                        break
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                    yield chunk
+        elif self.use_minio:
+            length = (end - start) if end is not None else 0
+            response = await loop.run_in_executor(
+                None,
+                functools.partial(self.minio_client.get_object, self.bucket, path, offset=start, length=length)
+            )
+            try:
+                while True:
+                    chunk = await loop.run_in_executor(None, response.read, chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                response.close()
+                response.release_conn()
+        else:
+            blob = self.bucket.blob(path)
+            if end is None:
+                await loop.run_in_executor(None, blob.reload)
+                end = blob.size or 0
+            position = start
+            while position < end:
+                chunk_end = min(position + chunk_size, end)
+                chunk = await loop.run_in_executor(
+                    None,
+                    functools.partial(blob.download_as_bytes, start=position, end=chunk_end - 1)
+                )
+                if not chunk:
+                    break
+                yield chunk
+                position = chunk_end
+
+@functools.lru_cache(maxsize=1)
+def get_storage_service() -> StorageService:
+    """Process-wide storage client, created on first use rather than at import (it may connect to MinIO)."""
+    return StorageService()
@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Add the parent directory to sys.path to resolve app imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.services.embedding_providers import EMBEDDING_PROVIDERS
+
+WORDS = (
+    "privacy data policy user consent terms service liability shall agree third party "
+    "retention cookies personal information processing controller rights request notice"
+).split()
+
+def synthetic_texts(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))) for _ in range(count)]
+
+async def run(provider, texts, batch_size):
+    """Embed like the pipeline does: fixed-size calls, `provider.concurrency` of them at once."""
+    slots = asyncio.Semaphore(provider.concurrency)
+
+    async def call(batch):
+        async with slots:
+            return await provider.embed_async(batch)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(call(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)))
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(len(r) for r in results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding providers in texts/second on a fixed corpus.")
+    parser.add_argument("--texts", type=int, default=2000, help="Synthetic texts per run")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE, help="Texts per embedding call")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per provider (best is reported)")
+    parser.add_argument("--providers", default=",".join(EMBEDDING_PROVIDERS), help="Comma-separated provider names")
+    args = parser.parse_args()
+
+    print(f"Corpus: {args.texts} texts, {args.batch_size} per call")
+    print(f"{'provider':<12} {'model':<40} {'vectors':>8} {'best s':>8} {'texts/s':>9}")
+
+    for name in args.providers.split(","):
+        provider_cls = EMBEDDING_PROVIDERS.get(name)
+        if provider_cls is None or not provider_cls.is_available():
+            print(f"{name:<12} not installed or not configured")
+            continue
+        provider = provider_cls()
+        # Each run gets fresh texts so server-side or checkpoint caches do not help
+        runs = [
+            asyncio.run(run(provider, synthetic_texts(args.texts, seed=42 + r), args.batch_size))
+            for r in range(args.repeat)
+        ]
+        best, vectors = min(runs)
+        print(f"{name:<12} {provider.model_id:<40} {vectors:>8} {best:>8.2f} {args.texts / best:>9.0f}")
+
+if __name__ == "__main__":
+    main()
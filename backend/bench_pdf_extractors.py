@@ -0,0 +1,94 @@
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+# Add the parent directory to sys.path to resolve app imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.pdf_backends import PDF_BACKENDS
+
+WORDS = (
+    "privacy data policy user consent terms service liability shall agree third party "
+    "retention cookies personal information processing controller rights request notice"
+).split()
+
+def make_pdf(pages) -> bytes:
+    """Minimal text-only PDF (Helvetica, one content stream per page)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    font_id = 3 + 2 * len(pages)
+    for i, lines in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode()
+        )
+        body = "BT /F1 10 Tf 12 TL 50 750 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def synthetic_corpus(documents: int, pages: int, seed: int = 42):
+    rng = random.Random(seed)
+    corpus = []
+    for d in range(documents):
+        doc_pages = [
+            [" ".join(rng.choice(WORDS) for _ in range(14)) for _ in range(55)]
+            for _ in range(pages)
+        ]
+        corpus.append((f"synthetic-{d}.pdf", make_pdf(doc_pages)))
+    return corpus
+
+def run(backend, corpus):
+    pages = chars = 0
+    start = time.perf_counter()
+    for _, content in corpus:
+        for _, text in backend.pages(content):
+            pages += 1
+            chars += len(text)
+    return time.perf_counter() - start, pages, chars
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PDF text backends in pages/second on a fixed corpus.")
+    parser.add_argument("--corpus", help="Directory of PDFs (default: a generated, seeded corpus)")
+    parser.add_argument("--documents", type=int, default=10, help="Synthetic corpus size")
+    parser.add_argument("--pages", type=int, default=50, help="Pages per synthetic document")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend (best is reported)")
+    parser.add_argument("--backends", default=",".join(PDF_BACKENDS), help="Comma-separated backend names")
+    args = parser.parse_args()
+
+    if args.corpus:
+        paths = sorted(glob.glob(os.path.join(args.corpus, "*.pdf")))
+        corpus = [(os.path.basename(p), open(p, "rb").read()) for p in paths]
+    else:
+        corpus = synthetic_corpus(args.documents, args.pages)
+    total_mb = sum(len(c) for _, c in corpus) / 1e6
+    print(f"Corpus: {len(corpus)} documents, {total_mb:.1f} MB")
+    print(f"{'backend':<12} {'pages':>7} {'chars':>10} {'best s':>8} {'pages/s':>9}")
+
+    for name in args.backends.split(","):
+        backend_cls = PDF_BACKENDS.get(name)
+        if backend_cls is None or not backend_cls.is_available():
+            print(f"{name:<12} not installed")
+            continue
+        backend = backend_cls()
+        runs = [run(backend, corpus) for _ in range(args.repeat)]
+        best, pages, chars = min(runs)
+        print(f"{name:<12} {pages:>7} {chars:>10} {best:>8.2f} {pages / best:>9.0f}")
+
+if __name__ == "__main__":
+    main()
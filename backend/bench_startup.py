@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Must not be imported by the API process until a pipeline runs (or a backend is configured)
+HEAVY_MODULES = [
+    "torch", "sentence_transformers", "transformers", "google.generativeai", "google.cloud.storage",
+    "minio", "pdfplumber", "pdfminer", "pypdfium2", "fitz", "pytesseract", "PIL", "lxml", "aiohttp",
+    "app.services.pipeline",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(module: str):
+    before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr}")
+    # ru_maxrss is the peak of all children so far (KiB on Linux); report it once it grows
+    rss_mb = max(before, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+    return json.loads(result.stdout.strip().splitlines()[-1]), rss_mb
+
+def slowest_imports(module: str, count: int):
+    """Top modules by cumulative import time (python -X importtime)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure API startup (import) time and memory, and fail if heavy ML/PDF libraries are imported."
+    )
+    parser.add_argument("--module", default="app.main", help="Module to import (the API entry point)")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to start (best is reported)")
+    parser.add_argument("--budget", type=float, default=None, help="Fail if the best import time exceeds this many seconds")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    best = min(r["seconds"] for r, _ in runs)
+    rss_mb = max(rss for _, rss in runs)
+    loaded = sorted({m for r, _ in runs for m in r["loaded"]})
+
+    print(f"import {args.module}: best {best:.2f} s over {args.repeat} runs, peak RSS {rss_mb:.0f} MB")
+    print(f"{'cumulative ms':>14}  module")
+    for cumulative, name in slowest_imports(args.module, args.top):
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if args.budget is not None and best > args.budget:
+        print(f"FAIL: startup {best:.2f} s exceeds budget {args.budget:.2f} s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
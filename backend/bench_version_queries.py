@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+# Add the parent directory to sys.path to resolve app imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import select, desc, delete, text
+from sqlalchemy.dialects import postgresql
+from app.db.session import engine
+from app.db.models import Document, Version, Execution
+
+BENCH_APP = "__bench__"
+
+SEED_SQL = [
+    ("documents", """
+    INSERT INTO documents (id, application_name, name, url, schedule, keywords, created_at)
+    SELECT gen_random_uuid(), :app, 'doc-' || i, 'https://example.com/' || i || '.pdf', 'weekly', '[]'::jsonb, now()
+    FROM generate_series(1, :docs) AS i
+    """),
+    ("executions", """
+    INSERT INTO executions (id, status, start_time, end_time, logs, steps)
+    SELECT gen_random_uuid(), 'COMPLETED', now() - (i || ' minutes')::interval, now() - (i || ' minutes')::interval + interval '30 seconds', :app, '[]'::jsonb
+    FROM generate_series(1, :executions) AS i
+    """),
+    ("versions", """
+    WITH docs AS (
+        SELECT id, row_number() OVER () - 1 AS n FROM documents WHERE application_name = :app
+    ), execs AS (
+        SELECT id, row_number() OVER () - 1 AS n FROM executions WHERE logs = :app
+    )
+    INSERT INTO versions (id, document_id, timestamp, content_hash, gcs_path, semantic_score, execution_id)
+    SELECT gen_random_uuid(), docs.id, now() - (v.i || ' minutes')::interval, md5(v.i::text), 'bench/' || v.i, random(), execs.id
+    FROM generate_series(0, :versions - 1) AS v(i)
+    JOIN docs ON docs.n = v.i % :docs
+    JOIN execs ON execs.n = v.i % :executions
+    """),
+]
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+async def seed(conn, docs: int, versions: int, executions: int):
+    params = {"app": BENCH_APP, "docs": docs, "versions": versions, "executions": executions}
+    for table, sql in SEED_SQL:
+        start = time.perf_counter()
+        await conn.execute(text(sql), params)
+        print(f"  {table:<12} {time.perf_counter() - start:6.1f}s")
+    await conn.execute(text("ANALYZE documents, versions, executions"))
+
+async def cleanup(conn):
+    bench_docs = select(Document.id).where(Document.application_name == BENCH_APP)
+    await conn.execute(delete(Version).where(Version.document_id.in_(bench_docs)))
+    await conn.execute(delete(Execution).where(Execution.logs == BENCH_APP))
+    await conn.execute(delete(Document).where(Document.application_name == BENCH_APP))
+
+async def explain(conn, label: str, stmt, runs: int = 20):
+    sql = compile_sql(stmt)
+    plan = (await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"))).scalars().all()
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        (await conn.execute(text(sql))).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    print(f"\n=== {label}: median {timings[len(timings) // 2]:.2f} ms, p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms")
+    for line in plan:
+        print(f"    {line}")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Seed versions/executions and check the query plans of hot lookups.")
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--versions", type=int, default=1_000_000)
+    parser.add_argument("--executions", type=int, default=100_000)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse previously seeded benchmark rows")
+    parser.add_argument("--keep", action="store_true", help="do not delete benchmark rows afterwards")
+    args = parser.parse_args()
+
+    async with engine.begin() as conn:
+        if not args.skip_seed:
+            print(f"Seeding {args.docs} documents, {args.versions} versions, {args.executions} executions...")
+            await seed(conn, args.docs, args.versions, args.executions)
+
+    async with engine.connect() as conn:
+        doc_id = (await conn.execute(
+            select(Document.id).where(Document.application_name == BENCH_APP).limit(1)
+        )).scalar_one()
+        page = (await conn.execute(
+            select(Execution.id).order_by(desc(Execution.start_time)).limit(20)
+        )).scalars().all()
+
+        # PipelineService.process_document: previous version of a document
+        await explain(conn, "latest version of a document", (
+            select(Version).where(Version.document_id == doc_id).order_by(desc(Version.timestamp)).limit(1)
+        ))
+        # GET /documents/{id}/versions
+        await explain(conn, "version history of a document", (
+            select(Version).where(Version.document_id == doc_id).order_by(desc(Version.timestamp))
+        ))
+        # GET /executions
+        await explain(conn, "executions page", (
+            select(Execution).order_by(desc(Execution.start_time)).limit(20)
+        ))
+        # GET /executions: selectinload(Execution.versions)
+        await explain(conn, "versions of an executions page", (
+            select(Version).where(Version.execution_id.in_(page))
+        ))
+
+    if not args.keep:
+        async with engine.begin() as conn:
+            print("\nCleaning up benchmark rows...")
+            await cleanup(conn)
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
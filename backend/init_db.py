@@ -1,12 +1,13 @@
-import asyncio
-from app.db.session import engine
-from app.db.base import Base
+import os
+from alembic import command
+from alembic.config import Config
 
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+def init_db():
+    # Schema is managed by Alembic migrations (migrations/versions)
+    command.upgrade(Config(ALEMBIC_INI), "head")
     print("Database initialized")
 
 if __name__ == "__main__":
-    asyncio.run(init_db())
+    init_db()
@@ -0,0 +1,77 @@
+"""initial schema
+
+Exactly the tables previously created by init_db.py via metadata.create_all.
+Existing databases created that way should be stamped with this revision
+(`alembic stamp 0001`) before upgrading; 0002 onwards then adds everything
+introduced since.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'documents',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('application_name', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('schedule', sa.String(), nullable=True),
+        sa.Column('keywords', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('owner_id', sa.String(), nullable=True),
+        sa.Column('owner_email', sa.String(), nullable=True),
+        sa.Column('owner_username', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_documents_application_name', 'documents', ['application_name'])
+    op.create_index('ix_documents_name', 'documents', ['name'])
+    op.create_index('ix_documents_owner_id', 'documents', ['owner_id'])
+
+    op.create_table(
+        'executions',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='executionstatus'), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=True),
+        sa.Column('logs', sa.Text(), nullable=True),
+        sa.Column('steps', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'versions',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('document_id', sa.UUID(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('content_hash', sa.String(), nullable=False),
+        sa.Column('gcs_path', sa.String(), nullable=False),
+        sa.Column('semantic_score', sa.Float(), nullable=True),
+        sa.Column('extracted_text_path', sa.String(), nullable=True),
+        sa.Column('embeddings_path', sa.String(), nullable=True),
+        sa.Column('execution_id', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id']),
+        sa.ForeignKeyConstraint(['execution_id'], ['executions.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('versions')
+    op.drop_table('executions')
+    op.drop_table('documents')
+    sa.Enum(name='executionstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,106 @@
+"""search pages, segment embeddings and sketches
+
+Tables and version columns for page-range content (segment index), the
+precomputed keyword match index, full-text search, semantic search over
+segment embeddings (pgvector) and MinHash near-duplicate sketches.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    op.add_column('versions', sa.Column('segment_index_path', sa.String(), nullable=True))
+    op.add_column('versions', sa.Column('matches_path', sa.String(), nullable=True))
+
+    op.create_table(
+        'search_pages',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('version_id', sa.UUID(), nullable=False),
+        sa.Column('document_id', sa.UUID(), nullable=False),
+        sa.Column('page', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(f"to_tsvector('{settings.SEARCH_LANGUAGE}', content)", persisted=True),
+            nullable=True
+        ),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['version_id'], ['versions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_search_pages_document_id', 'search_pages', ['document_id'])
+    op.create_index('ix_search_pages_version_id', 'search_pages', ['version_id'])
+    op.create_index('ix_search_pages_search_vector', 'search_pages', ['search_vector'], postgresql_using='gin')
+
+    op.create_table(
+        'segment_embeddings',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('version_id', sa.UUID(), nullable=False),
+        sa.Column('document_id', sa.UUID(), nullable=False),
+        sa.Column('page', sa.Integer(), nullable=False),
+        sa.Column('segment_index', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('text_hash', sa.String(length=40), nullable=True),
+        sa.Column('model', sa.String(), nullable=True),
+        sa.Column('embedding', pgvector.sqlalchemy.Vector(dim=settings.EMBEDDING_DIMENSION), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['version_id'], ['versions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_segment_embeddings_document_id', 'segment_embeddings', ['document_id'])
+    op.create_index('ix_segment_embeddings_version_id', 'segment_embeddings', ['version_id'])
+    op.create_index('ix_segment_embeddings_text_hash', 'segment_embeddings', ['text_hash'])
+    op.create_index(
+        'ix_segment_embeddings_embedding_hnsw', 'segment_embeddings', ['embedding'],
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'}
+    )
+
+    op.create_table(
+        'segment_sketches',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('version_id', sa.UUID(), nullable=False),
+        sa.Column('document_id', sa.UUID(), nullable=False),
+        sa.Column('page', sa.Integer(), nullable=False),
+        sa.Column('segment_index', sa.Integer(), nullable=False),
+        sa.Column('text_hash', sa.String(length=40), nullable=False),
+        sa.Column('snippet', sa.Text(), nullable=False),
+        sa.Column('band_hashes', postgresql.ARRAY(sa.BigInteger()), nullable=False),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['version_id'], ['versions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_segment_sketches_document_id', 'segment_sketches', ['document_id'])
+    op.create_index('ix_segment_sketches_version_id', 'segment_sketches', ['version_id'])
+    op.create_index('ix_segment_sketches_text_hash', 'segment_sketches', ['text_hash'])
+    op.create_index('ix_segment_sketches_band_hashes', 'segment_sketches', ['band_hashes'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_table('segment_sketches')
+    op.drop_table('segment_embeddings')
+    op.drop_table('search_pages')
+    op.drop_column('versions', 'matches_path')
+    op.drop_column('versions', 'segment_index_path')
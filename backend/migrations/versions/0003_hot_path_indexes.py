@@ -0,0 +1,50 @@
+"""indexes for hot version/execution lookups
+
+- versions (document_id, timestamp): latest version per document
+  (ORDER BY timestamp DESC LIMIT 1, served by a backward index scan) and the
+  per-document version history.
+- versions (execution_id): versions of an execution (executions list/detail).
+- executions (start_time): executions list ordered by start_time, and the
+  "last 24h" stats count.
+
+Created CONCURRENTLY so the upgrade does not block writes on large tables.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_versions_document_id_timestamp', 'versions', ['document_id', 'timestamp'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_versions_execution_id', 'versions', ['execution_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_executions_start_time', 'executions', ['start_time'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_executions_start_time', table_name='executions', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_versions_execution_id', table_name='versions', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_versions_document_id_timestamp', table_name='versions', postgresql_concurrently=True, if_exists=True)
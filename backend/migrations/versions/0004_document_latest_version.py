@@ -0,0 +1,64 @@
+"""denormalized latest version pointer and summary on documents
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('latest_version_id', sa.UUID(), nullable=True))
+    op.add_column('documents', sa.Column('last_score', sa.Float(), nullable=True))
+    op.add_column('documents', sa.Column('last_hash', sa.String(), nullable=True))
+    op.add_column('documents', sa.Column('last_checked_at', sa.DateTime(), nullable=True))
+    op.add_column('documents', sa.Column('last_changed_at', sa.DateTime(), nullable=True))
+    op.create_foreign_key(
+        'fk_documents_latest_version_id', 'documents', 'versions',
+        ['latest_version_id'], ['id'], ondelete='SET NULL'
+    )
+
+    # Backfill from existing history. last_changed_at is the newest version whose
+    # hash differs from its predecessor (or the first version).
+    op.execute("""
+        WITH ordered AS (
+            SELECT id, document_id, timestamp, content_hash, semantic_score,
+                   lag(content_hash) OVER (PARTITION BY document_id ORDER BY timestamp) AS prev_hash,
+                   row_number() OVER (PARTITION BY document_id ORDER BY timestamp DESC) AS rn
+            FROM versions
+        ), changed AS (
+            SELECT document_id, max(timestamp) AS last_changed_at
+            FROM ordered
+            WHERE prev_hash IS DISTINCT FROM content_hash
+            GROUP BY document_id
+        )
+        UPDATE documents d
+        SET latest_version_id = o.id,
+            last_score = o.semantic_score,
+            last_hash = o.content_hash,
+            last_checked_at = o.timestamp,
+            last_changed_at = c.last_changed_at
+        FROM ordered o
+        LEFT JOIN changed c ON c.document_id = o.document_id
+        WHERE o.rn = 1 AND o.document_id = d.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_documents_latest_version_id', 'documents', type_='foreignkey')
+    op.drop_column('documents', 'last_changed_at')
+    op.drop_column('documents', 'last_checked_at')
+    op.drop_column('documents', 'last_hash')
+    op.drop_column('documents', 'last_score')
+    op.drop_column('documents', 'latest_version_id')
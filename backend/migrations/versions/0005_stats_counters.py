@@ -0,0 +1,94 @@
+"""trigger-maintained row counters for the stats endpoint
+
+Statement-level triggers with transition tables keep one counter row per
+table in step with inserts, deletes and truncates, so GET /stats reads three
+rows instead of counting full tables. A partial index covers running
+executions.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTED_TABLES = ('documents', 'executions', 'versions')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stats_counters',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.create_index(
+        'ix_executions_running', 'executions', ['status'],
+        postgresql_where=sa.text("status = 'RUNNING'")
+    )
+
+    op.execute("""
+        CREATE FUNCTION stats_counters_on_insert() RETURNS trigger AS $$
+        BEGIN
+            UPDATE stats_counters SET value = value + (SELECT count(*) FROM new_rows) WHERE name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION stats_counters_on_delete() RETURNS trigger AS $$
+        BEGIN
+            UPDATE stats_counters SET value = value - (SELECT count(*) FROM old_rows) WHERE name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION stats_counters_on_truncate() RETURNS trigger AS $$
+        BEGIN
+            UPDATE stats_counters SET value = 0 WHERE name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    for table in COUNTED_TABLES:
+        # Lock the table while seeding so no insert slips between the count and the trigger
+        op.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+        op.execute(f"INSERT INTO stats_counters (name, value) SELECT '{table}', count(*) FROM {table}")
+        op.execute(f"""
+            CREATE TRIGGER {table}_count_insert AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION stats_counters_on_insert()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_count_delete AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION stats_counters_on_delete()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_count_truncate AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION stats_counters_on_truncate()
+        """)
+
+
+def downgrade() -> None:
+    for table in COUNTED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_count_truncate ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_count_delete ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_count_insert ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS stats_counters_on_truncate()")
+    op.execute("DROP FUNCTION IF EXISTS stats_counters_on_delete()")
+    op.execute("DROP FUNCTION IF EXISTS stats_counters_on_insert()")
+    op.drop_index('ix_executions_running', table_name='executions')
+    op.drop_table('stats_counters')
@@ -0,0 +1,44 @@
+"""composite indexes for keyset pagination
+
+The executions list pages on (start_time, id) and the documents list on
+(created_at, id); the single-column start_time index is superseded.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_executions_start_time_id', 'executions', ['start_time', 'id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_documents_created_at_id', 'documents', ['created_at', 'id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index('ix_executions_start_time', table_name='executions', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_executions_start_time', 'executions', ['start_time'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index('ix_documents_created_at_id', table_name='documents', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_executions_start_time_id', table_name='executions', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,48 @@
+"""unique (application_name, url) on documents for config import upserts
+
+Fails if duplicate (application_name, url) pairs already exist; merge or
+delete them first.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT application_name, url, count(*) FROM documents "
+        "GROUP BY application_name, url HAVING count(*) > 1 LIMIT 20"
+    )).fetchall()
+    if duplicates:
+        listing = "\n".join(f"  {app} | {url} ({n} rows)" for app, url, n in duplicates)
+        raise RuntimeError(f"Duplicate (application_name, url) documents must be merged first:\n{listing}")
+
+    # Build the index without blocking writes, then promote it to a constraint
+    with op.get_context().autocommit_block():
+        # Leftover from an interrupted concurrent build
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_documents_application_name_url")
+        op.create_index(
+            'uq_documents_application_name_url', 'documents', ['application_name', 'url'],
+            unique=True, postgresql_concurrently=True
+        )
+    op.execute(
+        "ALTER TABLE documents ADD CONSTRAINT uq_documents_application_name_url "
+        "UNIQUE USING INDEX uq_documents_application_name_url"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_documents_application_name_url', 'documents', type_='unique')
@@ -0,0 +1,26 @@
+"""per-document PDF extractor override
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('pdf_extractor', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'pdf_extractor')
@@ -0,0 +1,28 @@
+"""per-document keyword mode and context window
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('keyword_mode', sa.String(), nullable=True))
+    op.add_column('documents', sa.Column('context_pages', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'context_pages')
+    op.drop_column('documents', 'keyword_mode')
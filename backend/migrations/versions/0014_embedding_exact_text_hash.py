@@ -0,0 +1,28 @@
+"""key embedding reuse on the exact text
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 20:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014'
+down_revision: Union[str, None] = '0013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing keys hash the lower-cased token stream, which lets different texts
+    # share a vector. Drop them; those segments are embedded again on their next run.
+    op.execute("UPDATE segment_embeddings SET text_hash = NULL WHERE text_hash IS NOT NULL")
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,98 @@
+"""append-only deltas for the stats counters
+
+The 0005 triggers updated one stats_counters row per table, so every
+transaction inserting a version held that row's lock until it committed and
+concurrent pipelines queued behind each other. The triggers now append a
+delta row instead (inserts never conflict); readers add the pending deltas
+to the counter and the scheduler periodically folds them in.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0015'
+down_revision: Union[str, None] = '0014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COMPACT = """
+    WITH moved AS (DELETE FROM stats_counter_deltas RETURNING name, delta)
+    UPDATE stats_counters c SET value = c.value + m.total
+    FROM (SELECT name, sum(delta) AS total FROM moved GROUP BY name) m
+    WHERE c.name = m.name
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stats_counter_deltas',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('delta', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_counters_on_insert() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO stats_counter_deltas (name, delta) SELECT TG_TABLE_NAME, count(*) FROM new_rows;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_counters_on_delete() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO stats_counter_deltas (name, delta) SELECT TG_TABLE_NAME, -count(*) FROM old_rows;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # TRUNCATE holds an exclusive lock on the table, so no other transaction has pending deltas for it
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_counters_on_truncate() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM stats_counter_deltas WHERE name = TG_TABLE_NAME;
+            UPDATE stats_counters SET value = 0 WHERE name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_counters_on_insert() RETURNS trigger AS $$
+        BEGIN
+            UPDATE stats_counters SET value = value + (SELECT count(*) FROM new_rows) WHERE name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_counters_on_delete() RETURNS trigger AS $$
+        BEGIN
+            UPDATE stats_counters SET value = value - (SELECT count(*) FROM old_rows) WHERE name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_counters_on_truncate() RETURNS trigger AS $$
+        BEGIN
+            UPDATE stats_counters SET value = 0 WHERE name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("LOCK TABLE stats_counter_deltas IN EXCLUSIVE MODE")
+    op.execute(COMPACT)
+    op.drop_table('stats_counter_deltas')
@@ -0,0 +1,60 @@
+"""near-duplicate clause clusters from the sketch band buckets
+
+Sketches sharing an LSH band hash land in the same bucket; each bucket
+spanning several documents is keyed by its smallest text hash and every
+clause joins the smallest key among its buckets, so near-identical clauses
+(which share most bands) fall into one cluster. Clustering reads every sketch, so it is materialized and
+refreshed by the scheduler; the shared clauses endpoint reads the view
+through the documents index.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0016'
+down_revision: Union[str, None] = '0015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE MATERIALIZED VIEW shared_clause_clusters AS
+        WITH members AS (
+            SELECT s.document_id, s.text_hash, b.band_hash
+            FROM segment_sketches s CROSS JOIN LATERAL unnest(s.band_hashes) AS b(band_hash)
+        ), buckets AS (
+            SELECT band_hash, min(text_hash) AS cluster_key
+            FROM members
+            GROUP BY band_hash
+            HAVING count(DISTINCT document_id) >= 2
+        ), assigned AS (
+            SELECT m.text_hash, min(k.cluster_key) AS cluster_key
+            FROM members m JOIN buckets k USING (band_hash)
+            GROUP BY m.text_hash
+        )
+        SELECT a.cluster_key AS text_hash,
+               count(DISTINCT s.document_id) AS documents,
+               array_agg(DISTINCT s.document_id) AS document_ids,
+               count(DISTINCT s.text_hash) AS variants,
+               coalesce(min(s.snippet) FILTER (WHERE s.text_hash = a.cluster_key), min(s.snippet)) AS snippet
+        FROM segment_sketches s
+        JOIN assigned a USING (text_hash)
+        GROUP BY a.cluster_key
+        HAVING count(DISTINCT s.document_id) >= 2
+    """)
+    # Unique index: required by REFRESH ... CONCURRENTLY
+    op.create_index('uq_shared_clause_clusters_text_hash', 'shared_clause_clusters', ['text_hash'], unique=True)
+    op.create_index('ix_shared_clause_clusters_documents', 'shared_clause_clusters', [sa.text('documents DESC')])
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS shared_clause_clusters")
@@ -0,0 +1,38 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add the parent directory to sys.path to resolve app imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import select, delete
+from app.db.session import AsyncSessionLocal
+from app.db.models import Version, SearchPage
+from app.services.search import SearchService
+from app.services.storage import StorageService
+
+async def reindex():
+    """Backfill the full-text search index for versions created before it existed."""
+    storage = StorageService()
+    async with AsyncSessionLocal() as session:
+        indexed = select(SearchPage.version_id).distinct()
+        stmt = select(Version).where(Version.extracted_text_path.isnot(None), Version.id.not_in(indexed))
+        versions = (await session.execute(stmt)).scalars().all()
+        print(f"Reindexing {len(versions)} versions...")
+
+        for version in versions:
+            try:
+                segments = json.loads(await storage.download(version.extracted_text_path))
+            except Exception as e:
+                print(f"Skipping version {version.id}: {e}")
+                continue
+            await session.execute(delete(SearchPage).where(SearchPage.version_id == version.id))
+            pages = await SearchService(session).index_version(version.id, version.document_id, segments)
+            await session.commit()
+            print(f"Version {version.id}: {pages} pages")
+
+    print("Reindex complete.")
+
+if __name__ == "__main__":
+    asyncio.run(reindex())
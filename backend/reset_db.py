@@ -5,17 +5,23 @@ import os
 # Add the parent directory to sys.path to resolve app imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from sqlalchemy import text
 from app.db.session import engine
-from app.db.models import Base, Document, Version, Execution
+from init_db import init_db
 
-async def reset():
-    print("Resetting database...")
+async def drop_schema():
     async with engine.begin() as conn:
         print("Dropping all tables...")
-        await conn.run_sync(Base.metadata.drop_all)
-        print("Creating all tables...")
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("DROP SCHEMA public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+    await engine.dispose()
+
+def reset():
+    print("Resetting database...")
+    asyncio.run(drop_schema())
+    print("Running migrations...")
+    init_db()
     print("Database reset complete.")
 
 if __name__ == "__main__":
-    asyncio.run(reset())
+    reset()
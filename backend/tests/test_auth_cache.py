@@ -0,0 +1,131 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core import cache, security
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import Role, get_current_user
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class CountingLoader:
+    """Async loader that records its calls and can be told to fail."""
+
+    def __init__(self, value="loaded", latency: float = 0.0):
+        self.value = value
+        self.latency = latency
+        self.calls = 0
+        self.errors = []  # exceptions raised by the next calls
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.errors:
+            raise self.errors.pop(0)
+        return f"{self.value}-{self.calls}"
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+def test_entries_expire_after_ttl(clock):
+    ttl_cache = TTLCache(ttl=60)
+    loader = CountingLoader()
+
+    assert asyncio.run(ttl_cache.get_or_load("token", loader)) == "loaded-1"
+    clock.now += 59
+    assert asyncio.run(ttl_cache.get_or_load("token", loader)) == "loaded-1"
+    clock.now += 1
+    assert ttl_cache.get("token") is None
+    assert asyncio.run(ttl_cache.get_or_load("token", loader)) == "loaded-2"
+    assert loader.calls == 2
+
+def test_least_recently_used_entry_is_evicted(clock):
+    ttl_cache = TTLCache(ttl=60, max_size=2)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    assert ttl_cache.get("a") == 1  # "b" is now the least recently used
+
+    ttl_cache.set("c", 3)
+    assert len(ttl_cache) == 2
+    assert (ttl_cache.get("a"), ttl_cache.get("b"), ttl_cache.get("c")) == (1, None, 3)
+
+def test_concurrent_loads_of_one_key_share_a_single_call():
+    ttl_cache = TTLCache(ttl=60)
+    loader = CountingLoader(latency=0.02)
+
+    async def requests():
+        return await asyncio.gather(*(ttl_cache.get_or_load("token", loader) for _ in range(10)))
+
+    assert asyncio.run(requests()) == ["loaded-1"] * 10
+    assert loader.calls == 1
+
+def test_failed_loads_are_not_cached():
+    ttl_cache = TTLCache(ttl=60)
+    loader = CountingLoader(latency=0.02)
+    loader.errors = [RuntimeError("userinfo unavailable")]
+
+    async def requests():
+        return await asyncio.gather(*(ttl_cache.get_or_load("token", loader) for _ in range(3)), return_exceptions=True)
+
+    # Every waiter sees the failure of the shared load, and nothing is stored
+    outcomes = asyncio.run(requests())
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
+    assert loader.calls == 1
+    assert len(ttl_cache) == 0
+
+    assert asyncio.run(ttl_cache.get_or_load("token", loader)) == "loaded-2"
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    token_cache = TTLCache(ttl=60)
+    monkeypatch.setattr(security, "_token_cache", token_cache)
+    return token_cache
+
+def test_dummy_userinfo_tokens_are_validated_once(monkeypatch, token_cache):
+    monkeypatch.setattr(settings, "USERINFO_URL", "http://dummy-userinfo/userinfo")
+    calls = []
+    fetch = security._fetch_user_info
+
+    async def counting_fetch(token: str) -> dict:
+        calls.append(token)
+        await asyncio.sleep(0.02)
+        return await fetch(token)
+    monkeypatch.setattr(security, "_fetch_user_info", counting_fetch)
+
+    async def requests():
+        return await asyncio.gather(
+            *(get_current_user(authorization="Bearer admin") for _ in range(5)),
+            get_current_user(authorization="Bearer viewer"),
+        )
+
+    users = asyncio.run(requests())
+    assert [u.role for u in users] == [Role.ADMIN] * 5 + [Role.VIEWER]
+    assert sorted(calls) == ["admin", "viewer"]
+    # Raw tokens are not used as keys
+    assert "admin" not in token_cache._entries and len(token_cache) == 2
+
+def test_rejected_tokens_are_not_cached(monkeypatch, token_cache):
+    monkeypatch.setattr(settings, "USERINFO_URL", "http://userinfo.local/userinfo")
+    responses = [httpx.Response(401), httpx.Response(200, json={"sub": "user-1", "groups": []})]
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+    monkeypatch.setattr(security, "get_http_client", lambda: client)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_current_user(authorization="Bearer token"))
+    assert error.value.status_code == 401
+    assert len(token_cache) == 0
+
+    # The next request validates again instead of replaying the failure
+    assert asyncio.run(get_current_user(authorization="Bearer token")).id == "user-1"
+    assert responses == []
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+import tenacity
+
+from app.core.config import settings
+from app.services.embedding_providers import HttpProvider, get_embedding_provider
+
+def vector_for(text: str):
+    return [float(len(text)), float(sum(map(ord, text)) % 97)]
+
+class FakeEmbeddingServer:
+    """OpenAI-compatible /embeddings and TEI /embed, served through httpx.MockTransport."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = []
+        self.errors = []  # status codes for the next responses
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append((request.url.path, request.headers.get("authorization"), body))
+        if self.errors:
+            return httpx.Response(self.errors.pop(0), json={"error": "unavailable"})
+        if request.url.path.endswith("/embed"):
+            return httpx.Response(200, json=[vector_for(t) for t in body["inputs"]])
+        # Items deliberately out of order: clients must sort by index
+        data = [{"index": i, "embedding": vector_for(t)} for i, t in enumerate(body["input"])]
+        return httpx.Response(200, json={"data": data[::-1], "model": body["model"]})
+
+    async def respond_async(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        return self.respond(request)
+
+@pytest.fixture(autouse=True)
+def http_settings(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_HTTP_URL", "http://embeddings.local/v1")
+    monkeypatch.setattr(settings, "EMBEDDING_HTTP_API", "openai")
+    monkeypatch.setattr(settings, "EMBEDDING_HTTP_MODEL", "bge-small-en")
+    monkeypatch.setattr(settings, "EMBEDDING_HTTP_API_KEY", "secret")
+    monkeypatch.setattr(settings, "EMBEDDING_HTTP_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "EMBEDDING_HTTP_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "EMBEDDING_HTTP_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(tenacity, "wait_exponential_jitter", lambda **_: tenacity.wait_none())
+
+def texts(count: int):
+    return [f"clause {i} of the privacy policy" for i in range(count)]
+
+def test_openai_api_batches_and_orders_by_index():
+    server = FakeEmbeddingServer()
+    provider = HttpProvider(transport=httpx.MockTransport(server.respond))
+
+    batch = texts(7)
+    assert provider.embed(batch) == [vector_for(t) for t in batch]
+    assert [len(body["input"]) for _, _, body in server.requests] == [3, 3, 1]
+    path, authorization, body = server.requests[0]
+    assert (path, authorization, body["model"]) == ("/v1/embeddings", "Bearer secret", "bge-small-en")
+    assert provider.model_id == "http:bge-small-en"
+
+def test_tei_api(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_HTTP_URL", "http://tei.local")
+    monkeypatch.setattr(settings, "EMBEDDING_HTTP_API", "tei")
+    server = FakeEmbeddingServer()
+    provider = HttpProvider(transport=httpx.MockTransport(server.respond))
+
+    batch = texts(4)
+    assert provider.embed(batch) == [vector_for(t) for t in batch]
+    assert [(path, body["inputs"]) for path, _, body in server.requests] == [("/embed", batch[:3]), ("/embed", batch[3:])]
+
+def test_unknown_api_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_HTTP_API", "grpc")
+    with pytest.raises(ValueError):
+        HttpProvider()
+
+def test_throttled_and_failing_requests_are_retried():
+    server = FakeEmbeddingServer()
+    server.errors = [429, 503]
+    provider = HttpProvider(transport=httpx.MockTransport(server.respond_async))
+
+    batch = texts(2)
+    assert asyncio.run(provider.embed_async(batch)) == [vector_for(t) for t in batch]
+    assert len(server.requests) == 3
+
+def test_client_errors_are_not_retried():
+    server = FakeEmbeddingServer()
+    server.errors = [400]
+    provider = HttpProvider(transport=httpx.MockTransport(server.respond_async))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(provider.embed_async(texts(2)))
+    assert len(server.requests) == 1
+
+def test_exhausted_retries_raise_async_and_return_empty_sync():
+    server = FakeEmbeddingServer()
+    server.errors = [503] * 3
+    provider = HttpProvider(transport=httpx.MockTransport(server.respond_async))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(provider.embed_async(texts(2)))
+    assert len(server.requests) == 3
+
+    server.errors = [503] * 3
+    provider = HttpProvider(transport=httpx.MockTransport(server.respond))
+    assert provider.embed(texts(2)) == []
+
+def test_in_flight_requests_are_bounded_by_concurrency():
+    server = FakeEmbeddingServer(latency=0.02)
+    provider = HttpProvider(transport=httpx.MockTransport(server.respond_async))
+
+    batch = texts(20)
+    assert asyncio.run(provider.embed_async(batch)) == [vector_for(t) for t in batch]
+    assert len(server.requests) == 7
+    assert server.max_in_flight == 2
+
+def test_registry_returns_configured_http_provider():
+    assert isinstance(get_embedding_provider("http"), HttpProvider)
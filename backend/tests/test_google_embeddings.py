@@ -0,0 +1,157 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from tenacity import wait_none
+
+from app.services import google_embeddings
+from app.services.google_embeddings import (
+    EmbeddingBatchError,
+    EmbeddingCheckpoint,
+    GoogleEmbeddingClient,
+    TokenBucket,
+)
+
+MODEL = "models/text-embedding-004"
+
+def vector_for(text: str):
+    # Exact in float32, so vectors read back from the checkpoint compare equal
+    return [float(len(text)), float(sum(map(ord, text)) % 97)]
+
+class FakeGoogle:
+    """In-process batchEmbedContents endpoint that can throttle and fail on demand."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = []
+        self.rate_limited = 0  # next requests answered with 429
+        self.failing = set()  # texts whose batch always gets a 503
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = Starlette(routes=[Route("/{model:path}:batchEmbedContents", self.batch_embed, methods=["POST"])])
+
+    @property
+    def transport(self) -> httpx.ASGITransport:
+        return httpx.ASGITransport(app=self.app)
+
+    async def batch_embed(self, request: Request):
+        texts = [r["content"]["parts"][0]["text"] for r in (await request.json())["requests"]]
+        self.requests.append(texts)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+        if self.rate_limited:
+            self.rate_limited -= 1
+            return JSONResponse({"error": {"code": 429}}, status_code=429)
+        if self.failing.intersection(texts):
+            return JSONResponse({"error": {"code": 503}}, status_code=503)
+        return JSONResponse({"embeddings": [{"values": vector_for(t)} for t in texts]})
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(google_embeddings, "wait_exponential_jitter", lambda **_: wait_none())
+
+def make_client(server: FakeGoogle, checkpoint: EmbeddingCheckpoint, **kwargs) -> GoogleEmbeddingClient:
+    return GoogleEmbeddingClient(
+        "test-key",
+        model=MODEL,
+        base_url="http://fake-google/v1beta",
+        bucket=TokenBucket(rate=10000, capacity=10000),
+        checkpoint=checkpoint,
+        transport=server.transport,
+        **kwargs
+    )
+
+def texts(count: int):
+    return [f"clause {i} of the privacy policy" for i in range(count)]
+
+def test_rate_limited_batches_are_retried():
+    server = FakeGoogle()
+    server.rate_limited = 2
+    client = make_client(server, EmbeddingCheckpoint(MODEL, directory=None), batch_size=4, max_attempts=3)
+
+    batch = texts(4)
+    assert asyncio.run(client.embed(batch)) == [vector_for(t) for t in batch]
+    assert len(server.requests) == 3
+
+def test_gives_up_after_max_attempts():
+    server = FakeGoogle()
+    server.rate_limited = 5
+    client = make_client(server, EmbeddingCheckpoint(MODEL, directory=None), batch_size=4, max_attempts=3)
+
+    with pytest.raises(EmbeddingBatchError) as error:
+        asyncio.run(client.embed(texts(4)))
+    assert (error.value.completed, error.value.total) == (0, 4)
+    assert len(server.requests) == 3
+
+def test_in_flight_batches_are_bounded_by_concurrency():
+    server = FakeGoogle(latency=0.02)
+    client = make_client(server, EmbeddingCheckpoint(MODEL, directory=None), batch_size=2, concurrency=3)
+
+    batch = texts(20)
+    assert asyncio.run(client.embed(batch)) == [vector_for(t) for t in batch]
+    assert len(server.requests) == 10
+    assert server.max_in_flight == 3
+
+def test_partial_failure_raises_and_keeps_completed_batches():
+    server = FakeGoogle()
+    batch = texts(10)
+    server.failing = {batch[7]}
+    checkpoint = EmbeddingCheckpoint(MODEL, directory=None)
+    client = make_client(server, checkpoint, batch_size=3, max_attempts=2)
+
+    with pytest.raises(EmbeddingBatchError) as error:
+        asyncio.run(client.embed(batch))
+
+    # Batches are [0-2], [3-5], [6-8], [9]; only the third fails
+    assert (error.value.completed, error.value.total) == (7, 10)
+    for i, text in enumerate(batch):
+        expected = None if 6 <= i <= 8 else vector_for(text)
+        assert checkpoint.get(EmbeddingCheckpoint.key(text)) == expected
+
+def test_resumes_from_checkpoint_after_restart(tmp_path):
+    server = FakeGoogle()
+    batch = texts(10)
+    server.failing = {batch[7]}
+    client = make_client(server, EmbeddingCheckpoint(MODEL, directory=str(tmp_path)), batch_size=3, max_attempts=1)
+    with pytest.raises(EmbeddingBatchError):
+        asyncio.run(client.embed(batch))
+
+    # A new process: the checkpoint is reloaded from disk and only the failed batch is sent again
+    server.failing = set()
+    server.requests.clear()
+    client = make_client(server, EmbeddingCheckpoint(MODEL, directory=str(tmp_path)), batch_size=3)
+
+    assert asyncio.run(client.embed(batch)) == [vector_for(t) for t in batch]
+    assert server.requests == [batch[6:9]]
+    # Everything was handed back to the caller, so the checkpoint file is gone
+    assert list(tmp_path.iterdir()) == []
+
+def test_discard_compacts_checkpoint_file(tmp_path):
+    server = FakeGoogle()
+    failed, succeeded = texts(6)[:3], texts(6)[3:]
+    server.failing = {failed[0]}
+    checkpoint = EmbeddingCheckpoint(MODEL, directory=str(tmp_path))
+    client = make_client(server, checkpoint, batch_size=1, max_attempts=1)
+
+    # One run fails part-way, a concurrent one on other texts succeeds
+    async def runs():
+        return await asyncio.gather(client.embed(failed), client.embed(succeeded), return_exceptions=True)
+    outcomes = asyncio.run(runs())
+    assert isinstance(outcomes[0], EmbeddingBatchError)
+    assert outcomes[1] == [vector_for(t) for t in succeeded]
+
+    # Only the failed run's completed batches are left on disk
+    (path,) = tmp_path.iterdir()
+    assert len(path.read_text().splitlines()) == 2
+    reloaded = EmbeddingCheckpoint(MODEL, directory=str(tmp_path))
+    assert [reloaded.get(EmbeddingCheckpoint.key(t)) for t in failed] == [None] + [vector_for(t) for t in failed[1:]]
+    assert all(reloaded.get(EmbeddingCheckpoint.key(t)) is None for t in succeeded)
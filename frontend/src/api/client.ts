@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { Document, Execution, ConfigImport, KeywordMatchResponse } from './types';
+import { Document, Execution, PdfExtractor, NormalizationRule, KeywordMode, ConfigImport, KeywordMatchResponse, VersionContentPage, SegmentIndex, SearchResponse, SemanticSearchResponse } from './types';
 
 const api = axios.create({
     baseURL: 'http://localhost:8000/api/v1',
@@ -21,7 +21,7 @@ export interface Stats {
     executions_count: number;
     versions_count: number;
     recent_updates_count: number;
-    active_workers: string;
+    active_workers: number;
 }
 
 export interface DocumentConfig {
@@ -29,12 +29,17 @@ export interface DocumentConfig {
     document_name: string;
     url: string;
     keywords?: string[];
+    keyword_mode?: KeywordMode | null;
+    context_pages?: number | null;
     schedule?: string;
+    pdf_extractor?: PdfExtractor | null;
+    normalization_rules?: NormalizationRule[] | null;
 }
 
 export const executionsApi = {
     run: (docId?: string) => api.post<{ execution_id: string }>(`/executions/run${docId ? `?document_id=${docId}` : ''}`),
-    list: () => api.get<Execution[]>('/executions'),
+    // Next page cursor is returned in the X-Next-Cursor response header
+    list: (cursor?: string) => api.get<Execution[]>('/executions', { params: { cursor } }),
     get: (id: string) => api.get<Execution>(`/executions/${id}`),
 };
 
@@ -44,7 +49,7 @@ export const configApi = {
 
 
 export const documentsApi = {
-    list: () => api.get<Document[]>('/documents'),
+    list: (cursor?: string) => api.get<Document[]>('/documents', { params: { cursor } }),
     get: (id: string) => api.get<Document>(`/documents/${id}`),
     create: (data: any) => api.post('/documents', data),
     update: (id: string, data: any) => api.put(`/documents/${id}`, data),
@@ -54,9 +59,19 @@ export const documentsApi = {
 
 export const versionsApi = {
     getContent: (id: string) => api.get<{ content: string }>(`/versions/${id}/content`),
+    getContentPages: (id: string, pageStart: number, pageEnd: number) =>
+        api.get<VersionContentPage>(`/versions/${id}/content`, { params: { page_start: pageStart, page_end: pageEnd } }),
+    getIndex: (id: string) => api.get<SegmentIndex>(`/versions/${id}/index`),
     getMatches: (id: string) => api.get<KeywordMatchResponse>(`/versions/${id}/matches`),
 };
 
+export const searchApi = {
+    search: (q: string, params?: { limit?: number; offset?: number; document_id?: string; latest_only?: boolean }) =>
+        api.get<SearchResponse>('/search', { params: { q, ...params } }),
+    semantic: (q: string, params?: { limit?: number; document_id?: string }) =>
+        api.get<SemanticSearchResponse>('/search/semantic', { params: { q, ...params } }),
+};
+
 export const statsApi = {
     get: () => api.get<Stats>('/stats'),
 };
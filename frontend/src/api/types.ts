@@ -1,3 +1,10 @@
+export type PdfExtractor = 'pypdfium2' | 'pymupdf' | 'pdfplumber';
+// Plain keywords match as substrings ("substring") or whole words ("word")
+export type KeywordMode = 'substring' | 'word';
+
+// Built-in rule name, or a custom regex mask
+export type NormalizationRule = string | { name?: string; pattern: string; replacement?: string; ignore_case?: boolean };
+
 export interface Document {
     id: string;
     latest_execution_id?: string;
@@ -6,10 +13,19 @@ export interface Document {
     url: string;
     schedule: string;
     keywords?: string[];
+    keyword_mode?: KeywordMode | null;
+    context_pages?: number | null;
+    pdf_extractor?: PdfExtractor | null;
+    normalization_rules?: NormalizationRule[] | null;
     owner_id?: string;
     owner_email?: string;
     owner_username?: string;
     created_at: string;
+    latest_version_id?: string;
+    last_score?: number;
+    last_hash?: string;
+    last_checked_at?: string;
+    last_changed_at?: string;
 }
 
 export interface Version {
@@ -62,3 +78,59 @@ export interface KeywordMatchResponse {
     matches: KeywordMatch[];
     keywords: string[];
 }
+
+export interface VersionContentPage {
+    content: string;
+    page_start?: number;
+    page_end?: number;
+    offset: number;
+    count: number;
+    total_pages?: number;
+    total_segments?: number;
+}
+
+export interface SegmentIndex {
+    total_pages: number;
+    total_segments: number;
+    total_bytes: number;
+    pages: {
+        page: number;
+        byte_start: number;
+        byte_end: number;
+        first_segment: number;
+        segment_count: number;
+    }[];
+}
+
+export interface SearchHit {
+    document_id: string;
+    application_name: string;
+    document_name: string;
+    version_id: string;
+    timestamp: string;
+    page: number;
+    rank: number;
+    snippet: string;
+}
+
+export interface SearchResponse {
+    query: string;
+    hits: SearchHit[];
+}
+
+export interface SemanticSearchHit {
+    document_id: string;
+    application_name: string;
+    document_name: string;
+    version_id: string;
+    timestamp: string;
+    page: number;
+    segment_index: number;
+    score: number;
+    text: string;
+}
+
+export interface SemanticSearchResponse {
+    query: string;
+    hits: SemanticSearchHit[];
+}